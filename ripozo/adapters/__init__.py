@@ -14,3 +14,4 @@ from .siren import SirenAdapter
 from .hal import HalAdapter
 from .basic_json import BasicJSONAdapter
 from .jsonapi import JSONAPIAdapter
+from .ndjson import NDJSONAdapter
@@ -9,12 +9,97 @@ from __future__ import unicode_literals
 from abc import ABCMeta, abstractproperty
 from warnings import warn
 
-from ripozo.utilities import join_url_parts
+from ripozo.utilities import join_url_parts, default_json_encoder
 
-import json
 import six
 
 
+class ChunkedList(object):
+    """
+    Marks an iterable in a response that should be encoded
+    item by item by ``iter_json_chunks`` instead of being
+    materialized as a list first.  The iterable is
+    consumed once.
+    """
+    __slots__ = ('iterable',)
+
+    def __init__(self, iterable):
+        """
+        :param iterable: The items of the json array.
+        """
+        self.iterable = iterable
+
+
+def iter_json_chunks(obj, json_encoder):
+    """
+    A generator that yields the json representation of the
+    obj in chunks.  Dictionaries containing a ``ChunkedList``
+    (at any depth) are written key by key and each item
+    of a ``ChunkedList`` is encoded separately.  Everything
+    else is encoded in a single call to the json_encoder.
+    Joining the chunks gives a document equivalent to
+    ``json_encoder(obj)`` with every ``ChunkedList`` replaced
+    by a list.
+
+    :param object obj: The object to encode.
+    :param function json_encoder: The function that encodes
+        the json serializable parts.
+    :return: A generator of json strings.
+    :rtype: types.GeneratorType
+    """
+    if isinstance(obj, ChunkedList):
+        yield '['
+        separator = ''
+        for item in obj.iterable:
+            yield separator
+            for chunk in iter_json_chunks(item, json_encoder):
+                yield chunk
+            separator = ','
+        yield ']'
+    elif isinstance(obj, dict) and _contains_chunked_list(obj):
+        separator = '{'
+        for key, value in six.iteritems(obj):
+            yield '{0}{1}:'.format(separator, json_encoder(_json_key(key)))
+            for chunk in iter_json_chunks(value, json_encoder):
+                yield chunk
+            separator = ','
+        yield '}'
+    else:
+        yield json_encoder(obj)
+
+
+def _json_key(key):
+    """
+    Converts a dictionary key to a string the
+    way the stdlib json module does.
+
+    :param key: The key of a dictionary.
+    :return: The key as a string.
+    :rtype: unicode
+    """
+    if isinstance(key, six.string_types):
+        return key
+    if isinstance(key, bool):
+        return 'true' if key else 'false'
+    if key is None:
+        return 'null'
+    return six.text_type(key)
+
+
+def _contains_chunked_list(obj):
+    """
+    :param dict obj: The dictionary to check
+    :return: Whether a ChunkedList is anywhere in the dictionary
+    :rtype: bool
+    """
+    for value in six.itervalues(obj):
+        if isinstance(value, ChunkedList):
+            return True
+        if isinstance(value, dict) and _contains_chunked_list(value):
+            return True
+    return False
+
+
 @six.add_metaclass(ABCMeta)
 class AdapterBase(object):
     """
@@ -31,18 +116,32 @@ class AdapterBase(object):
         to in the appropriate manner.  Any of the strings in the list will be
         considered the appropriate format for the adapter on which they are
         specified.
+    :param function json_encoder: A function that takes a json serializable
+        object and returns the json string.  All of the builtin adapters
+        serialize their bodies and exceptions with it.  By default it is
+        ``ripozo.utilities.default_json_encoder`` which uses a faster
+        encoder if one is installed.  Override it on a subclass with a
+        ``staticmethod`` or pass it to the constructor (for example through
+        the dispatcher's ``json_encoder``).
     """
     formats = None
+    json_encoder = staticmethod(default_json_encoder)
 
-    def __init__(self, resource, base_url=''):
+    def __init__(self, resource, base_url='', json_encoder=None):
         """
         Simple sets the resource on the instance.
 
         :param resource: The resource that is being formatted.
         :type resource: rest.viewsets.resource_base.ResourceBase
+        :param unicode base_url: The base url that is prepended
+            to the urls of the resources.
+        :param function json_encoder: Overrides the class's
+            json_encoder for this instance.
         """
         self.base_url = base_url
         self.resource = resource
+        if json_encoder is not None:
+            self.json_encoder = json_encoder
 
     @abstractproperty
     def formatted_body(self):
@@ -58,6 +157,21 @@ class AdapterBase(object):
         """
         raise NotImplementedError
 
+    def formatted_body_chunks(self):
+        """
+        A generator that yields the formatted body in chunks.
+        Joining the chunks gives the same document as
+        ``formatted_body``.  Dispatchers may use this to send
+        a chunked response so that the whole body never needs
+        to be in memory at once.  By default it simply yields
+        the ``formatted_body``.  Adapters that can encode their
+        body incrementally should override it.
+
+        :return: A generator of the parts of the response body.
+        :rtype: types.GeneratorType
+        """
+        yield self.formatted_body
+
     @abstractproperty
     def extra_headers(self):
         """
@@ -102,7 +216,7 @@ class AdapterBase(object):
              'You will need to implement this method in your adapter.',
              PendingDeprecationWarning)
         status_code = getattr(exc, 'status_code', 500)
-        body = json.dumps(dict(status=status_code, message=six.text_type(exc)))
+        body = cls.json_encoder(dict(status=status_code, message=six.text_type(exc)))
         return body, cls.formats[0], status_code
 
     @classmethod
@@ -7,9 +7,9 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-from ripozo.adapters import AdapterBase
+from ripozo.adapters.base import AdapterBase, ChunkedList, iter_json_chunks
+from ripozo.resources.resource_base import ResourceBase
 
-import json
 import six
 
 _CONTENT_TYPE = 'application/json'
@@ -56,7 +56,32 @@ class BasicJSONAdapter(AdapterBase):
         self._append_relationships_to_list(response, self.resource.related_resources)
         self._append_relationships_to_list(response, self.resource.linked_resources)
         response.update(parent_properties)
-        return json.dumps({self.resource.resource_name: response})
+        return self.json_encoder({self.resource.resource_name: response})
+
+    def formatted_body_chunks(self):
+        """
+        Yields the formatted body in chunks.  The properties
+        of the related resources are encoded one at a time.
+
+        :return: A generator of the parts of the response body.
+        :rtype: types.GeneratorType
+        """
+        sources = dict()
+        parent_properties = self.resource.properties.copy()
+        for relationships in (self.resource.related_resources, self.resource.linked_resources):
+            for resource, name, embedded in relationships:
+                if isinstance(resource, ResourceBase):
+                    sources.setdefault(name, []).append((resource,))
+                else:
+                    sources.setdefault(name, []).append(resource)
+        response = dict()
+        for name, related in six.iteritems(sources):
+            properties = (res.properties for resources in related for res in resources)
+            response[name] = ChunkedList(properties)
+        response.update(parent_properties)
+        body = {self.resource.resource_name: response}
+        for chunk in iter_json_chunks(body, self.json_encoder):
+            yield chunk
 
     @staticmethod
     def _append_relationships_to_list(rel_dict, relationships):
@@ -73,7 +98,7 @@ class BasicJSONAdapter(AdapterBase):
         for resource, name, embedded in relationships:
             if name not in rel_dict:
                 rel_dict[name] = []
-            if isinstance(resource, (list, tuple)):
+            if not isinstance(resource, ResourceBase):
                 for res in resource:
                     rel_dict[name].append(res.properties)
                 continue
@@ -94,7 +119,7 @@ class BasicJSONAdapter(AdapterBase):
         :rtype: tuple
         """
         status_code = getattr(exc, 'status_code', 500)
-        body = json.dumps(dict(status=status_code, message=six.text_type(exc)))
+        body = cls.json_encoder(dict(status=status_code, message=six.text_type(exc)))
         return body, cls.formats[0], status_code
 
     @classmethod
@@ -6,9 +6,10 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-from ripozo.adapters import AdapterBase
+from ripozo.adapters.base import AdapterBase, ChunkedList, iter_json_chunks
+from ripozo.resources.resource_base import ResourceBase
 
-import json
+import itertools
 import six
 
 _CONTENT_TYPE = 'application/hal+json'
@@ -30,15 +31,32 @@ class HalAdapter(AdapterBase):
         :rtype: unicode
         """
         response = self._construct_resource(self.resource)
-        return json.dumps(response)
+        return self.json_encoder(response)
 
-    def _construct_resource(self, resource):
+    def formatted_body_chunks(self):
+        """
+        Yields the formatted body in chunks.  The embedded
+        lists of the resource are encoded one resource
+        at a time.
+
+        :return: A generator of the parts of the HAL
+            formatted response body.
+        :rtype: types.GeneratorType
+        """
+        response = self._construct_resource(self.resource, chunked=True)
+        for chunk in iter_json_chunks(response, self.json_encoder):
+            yield chunk
+
+    def _construct_resource(self, resource, chunked=False):
         """
         Constructs a full resource.  This can be used
         for either the primary resource or embedded resources
 
         :param ripozo.resources.resource_base.ResourceBase resource: The resource
             that will be constructed.
+        :param bool chunked: If True, the lists of embedded resources
+            are returned as ``ChunkedList`` instances that construct
+            the embedded resources as they are encoded.
         :return: The resource represented according to the
             Hal specification
         :rtype: dict
@@ -46,7 +64,7 @@ class HalAdapter(AdapterBase):
         resource_url = self.combine_base_url_with_resource_url(resource.url)
         parent_properties = resource.properties.copy()
 
-        embedded, links = self.generate_relationship(resource.related_resources)
+        embedded, links = self.generate_relationship(resource.related_resources, chunked=chunked)
         embedded2, links2 = self.generate_relationship(resource.linked_resources)
         embedded.update(embedded2)
         links.update(links2)
@@ -56,13 +74,15 @@ class HalAdapter(AdapterBase):
         response.update(parent_properties)
         return response
 
-    def generate_relationship(self, relationship_list):
+    def generate_relationship(self, relationship_list, chunked=False):
         """
         Generates an appropriately formated embedded relationship
         in the HAL format.
 
         :param ripozo.viewsets.relationships.relationship.BaseRelationship relationship: The
             relationship that an embedded version is being created for.
+        :param bool chunked: If True, lists of embedded resources
+            are returned as ``ChunkedList`` instances.
         :return: If it is a ListRelationship it will return a list/collection of the
             embedded resources.  Otherwise it returns a dictionary as specified
             by the HAL specification.
@@ -72,7 +92,10 @@ class HalAdapter(AdapterBase):
         embedded_dict = {}
         links_dict = {}
         for relationship, field_name, embedded in relationship_list:
-            rel = self._generate_relationship(relationship, embedded)
+            if chunked and embedded and not isinstance(relationship, ResourceBase):
+                rel = self._chunk_relationship_list(relationship)
+            else:
+                rel = self._generate_relationship(relationship, embedded)
             if not rel:
                 continue
             if embedded:
@@ -93,7 +116,7 @@ class HalAdapter(AdapterBase):
             the relationship(s)
         :rtype: list|dict
         """
-        if isinstance(relationship, list):
+        if not isinstance(relationship, ResourceBase):
             response = []
             for res in relationship:
                 if not res.has_all_pks:
@@ -107,6 +130,22 @@ class HalAdapter(AdapterBase):
         else:
             return dict(href=relationship.url)
 
+    def _chunk_relationship_list(self, relationship):
+        """
+        Lazily constructs a list of embedded resources.
+
+        :param list relationship: The related resources.
+        :return: A ChunkedList of the embedded resources or None
+            if none of the resources have all of their pks.
+        :rtype: ChunkedList
+        """
+        resources = (self._construct_resource(res) for res in relationship if res.has_all_pks)
+        try:
+            first = next(resources)
+        except StopIteration:
+            return None
+        return ChunkedList(itertools.chain((first,), resources))
+
     @classmethod
     def format_exception(cls, exc):
         """
@@ -122,8 +161,8 @@ class HalAdapter(AdapterBase):
         :rtype: tuple
         """
         status_code = getattr(exc, 'status_code', 500)
-        body = json.dumps(dict(status=status_code, message=six.text_type(exc),
-                               _embedded={}, _links={}))
+        body = cls.json_encoder(dict(status=status_code, message=six.text_type(exc),
+                                     _embedded={}, _links={}))
         return body, cls.formats[0], status_code
 
     @classmethod
@@ -7,12 +7,11 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-import json
 
 import six
 
 from ripozo import ResourceBase
-from ripozo.adapters.base import AdapterBase
+from ripozo.adapters.base import AdapterBase, ChunkedList, iter_json_chunks
 from ripozo.exceptions import JSONAPIFormatException
 from ripozo.resources.constructor import ResourceMetaClass
 from ripozo.utilities import join_url_parts
@@ -40,9 +39,22 @@ class JSONAPIAdapter(AdapterBase):
         :rtype: unicode|str
         """
         data = self._construct_data(self.resource, embedded=True)
-        return json.dumps(dict(data=data))
+        return self.json_encoder(dict(data=data))
 
-    def _construct_data(self, resource, embedded=True):
+    def formatted_body_chunks(self):
+        """
+        Yields the formatted body in chunks.  The related
+        resources of the resource are encoded one at a time.
+
+        :return: A generator of the parts of the JSON API
+            formatted response body.
+        :rtype: types.GeneratorType
+        """
+        data = self._construct_data(self.resource, embedded=True, chunked=True)
+        for chunk in iter_json_chunks(dict(data=data), self.json_encoder):
+            yield chunk
+
+    def _construct_data(self, resource, embedded=True, chunked=False):
         """
         Constructs a resource object according to this
         `part of the specification <http://jsonapi.org/format/#document-resource-objects>`_
@@ -50,6 +62,8 @@ class JSONAPIAdapter(AdapterBase):
         :param ResourceBase resource: The resource to format
         :param bool embedded: A flag to indicate whether
             all of the data should be included.
+        :param bool chunked: If True the relationship data
+            are ``ChunkedList`` instances.
         :return: A dictionary representing the resource
             according to the specification
         :rtype: dict
@@ -57,7 +71,7 @@ class JSONAPIAdapter(AdapterBase):
         id_ = self._construct_id(resource)
         data = dict(id=id_, type=resource.resource_name)
         if embedded:
-            data['relationships'] = self._construct_relationships(resource)
+            data['relationships'] = self._construct_relationships(resource, chunked=chunked)
             data['links'] = self._construct_links(resource)
             data['attributes'] = resource.properties
         else:
@@ -102,7 +116,7 @@ class JSONAPIAdapter(AdapterBase):
         id_ = join_url_parts(*id_parts)
         return id_
 
-    def _construct_relationships(self, resource):
+    def _construct_relationships(self, resource, chunked=False):
         """
         Constructs the relationships according to the
         `specification <http://jsonapi.org/format/#document-resource-object-relationships>`_
@@ -111,21 +125,27 @@ class JSONAPIAdapter(AdapterBase):
             that the relationships will be constructed for.
             It will user the `related_resources` attribute
             on the resource to construct the resources
+        :param bool chunked: If True the data of each relationship
+            is a ``ChunkedList`` that constructs the related
+            resource objects as it is encoded.
         :return: The dictionary representing the relationships
             in the appropriate format.
         :rtype: dict
         """
         # TODO docs
-        relationships = dict()
+        sources = dict()
         for resource, name, embedded in resource.related_resources:
-            if name not in relationships:
-                relationships[name] = dict(data=[])
-            data = relationships[name]['data']
+            related = sources.setdefault(name, [])
             if isinstance(resource, ResourceBase):
-                data.append(self._construct_data(resource, embedded=embedded))
+                related.append(((resource,), embedded))
             else:
-                for res in resource:
-                    data.append(self._construct_data(res, embedded=embedded))
+                related.append((resource, embedded))
+        relationships = dict()
+        for name, related in six.iteritems(sources):
+            data = (self._construct_data(res, embedded=embedded)
+                    for resources, embedded in related for res in resources)
+            data = ChunkedList(data) if chunked else list(data)
+            relationships[name] = dict(data=data)
         return relationships
 
     @classmethod
@@ -145,7 +165,7 @@ class JSONAPIAdapter(AdapterBase):
             title=exc.__class__.__name__,
             detail=six.text_type(exc)
         )
-        body = json.dumps(dict(errors=[error]))
+        body = cls.json_encoder(dict(errors=[error]))
         return body, _CONTENT_TYPE, status_code
 
     @classmethod
@@ -155,36 +175,50 @@ class JSONAPIAdapter(AdapterBase):
         to the `specification .<http://jsonapi.org/format/#crud>`_
         Basically, it reformats the attributes and relationships to
         be top level and dot formatted instead of an underlying dictionary.
+        If the request has a raw body that has not been decoded yet,
+        it is unwrapped when it is decoded.
 
         :param RequestContainer request: The request whose request
             body should be updated
         :return: The updated request ready for ripozo.
         :rtype: RequestContainer
         """
-        if request.body_args:
-            try:
-                data = request.body_args['data']
-            except KeyError:
-                raise JSONAPIFormatException('Any request with a request body'
-                                             'must include a "data" attribute.')
-            try:
-                body = data['attributes']
-            except KeyError:
-                raise JSONAPIFormatException('Any request with a request body'
-                                             'must include a "data" attribute '
-                                             'with an "attributes" attribute within it')
-            for name, value in six.iteritems(data.get('relationships', {})):
-                if 'data' not in value or 'id' not in value['data'] or 'type' not in value['data']:
-                    raise JSONAPIFormatException('All relationships must include a "data" '
-                                                 'attribute with "id" and "type" attributes.')
-                ids_dict = cls._parse_id(value['data']['id'], value['data']['type'])
-                attributes = dict()
-                for key, val in six.iteritems(ids_dict):
-                    attributes['{0}.{1}'.format(name, key)] = val
-                body.update(attributes)
-            request.body_args = body
+        request.transform_body(cls._unwrap_body)
         return request
 
+    @classmethod
+    def _unwrap_body(cls, body):
+        """
+        :param dict body: The JSONAPI formatted request body.
+        :return: The attributes and relationships of the
+            data as a flat dictionary.
+        :rtype: dict
+        :raises: JSONAPIFormatException
+        """
+        if not body:
+            return body
+        try:
+            data = body['data']
+        except KeyError:
+            raise JSONAPIFormatException('Any request with a request body'
+                                         'must include a "data" attribute.')
+        try:
+            body = data['attributes']
+        except KeyError:
+            raise JSONAPIFormatException('Any request with a request body'
+                                         'must include a "data" attribute '
+                                         'with an "attributes" attribute within it')
+        for name, value in six.iteritems(data.get('relationships', {})):
+            if 'data' not in value or 'id' not in value['data'] or 'type' not in value['data']:
+                raise JSONAPIFormatException('All relationships must include a "data" '
+                                             'attribute with "id" and "type" attributes.')
+            ids_dict = cls._parse_id(value['data']['id'], value['data']['type'])
+            attributes = dict()
+            for key, val in six.iteritems(ids_dict):
+                attributes['{0}.{1}'.format(name, key)] = val
+            body.update(attributes)
+        return body
+
     @staticmethod
     def _parse_id(id_, resource_name):
         if resource_name not in ResourceMetaClass.registered_resource_names_map:
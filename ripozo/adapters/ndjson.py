@@ -0,0 +1,143 @@
+"""
+Newline delimited json.  Every item of
+a list resource is written as a separate
+json object on its own line.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from ripozo.adapters.base import AdapterBase
+from ripozo.resources.resource_base import ResourceBase
+
+import six
+
+_CONTENT_TYPE = 'application/x-ndjson'
+
+
+class NDJSONAdapter(AdapterBase):
+    """
+    Formats the response as `newline delimited json <http://ndjson.org/>`_.
+    For a list resource (i.e. a resource without pks that has a
+    list relationship such as the response of
+    ``RetrieveList.retrieve_list``) every item of the list is
+    written as its properties on a separate line.
+    The items are encoded one at a time as the list is consumed.
+    The links of a list resource (e.g. the ``next`` and
+    ``previous`` pages) are sent in the ``Link`` header.
+    Any other resource is written as a single line
+    containing its properties and relationships.
+
+    Format:
+
+    .. code-block:: javascript
+
+        {"id": 1, "field": "value"}
+        {"id": 2, "field": "value"}
+    """
+    formats = ['ndjson', _CONTENT_TYPE]
+
+    @property
+    def extra_headers(self):
+        """
+        :return: The Content-Type header and, for a list
+            resource with links, a ``Link`` header
+            (e.g. ``<http://host/things?page=2>; rel="next"``).
+        :rtype: dict
+        """
+        headers = {'Content-Type': _CONTENT_TYPE}
+        if self.resource.no_pks:
+            links = ['<{0}>; rel="{1}"'.format(self.combine_base_url_with_resource_url(link.url),
+                                               name)
+                     for link, name, embedded in self.resource.linked_resources]
+            if links:
+                headers['Link'] = ', '.join(links)
+        return headers
+
+    @property
+    def formatted_body(self):
+        """
+        :return: The json lines of the resource
+        :rtype: unicode
+        """
+        return ''.join(self.formatted_body_chunks())
+
+    def formatted_body_chunks(self):
+        """
+        Yields one line per item in the list relationships
+        of a list resource.  For any other resource (or a list
+        resource without list relationships) a single line
+        is yielded.
+
+        :return: A generator of json lines.
+        :rtype: types.GeneratorType
+        """
+        if self.status_code == 204:
+            return
+        lists = []
+        if self.resource.no_pks:
+            lists = [resource for resource, name, embedded in self.resource.related_resources
+                     if not isinstance(resource, ResourceBase)]
+        if not lists:
+            yield self._encode_line(self._construct_object(self.resource))
+            return
+        for resources in lists:
+            for resource in resources:
+                yield self._encode_line(resource.properties)
+
+    def _encode_line(self, obj):
+        """
+        :param dict obj: The object to encode.
+        :return: The json encoded object with
+            a trailing newline.
+        :rtype: unicode
+        """
+        return '{0}\n'.format(self.json_encoder(obj))
+
+    @staticmethod
+    def _construct_object(resource):
+        """
+        Constructs the json object for a resource that
+        is not a list.  The properties of related resources
+        (and of every item of related lists) are included
+        under the name of the relationship.
+
+        :param ResourceBase resource: The resource
+        :return: The properties and relationships of the resource
+        :rtype: dict
+        """
+        response = dict()
+        for relationships in (resource.related_resources, resource.linked_resources):
+            for related, name, embedded in relationships:
+                if isinstance(related, ResourceBase):
+                    response.setdefault(name, []).append(related.properties)
+                else:
+                    response.setdefault(name, []).extend(item.properties for item in related)
+        response.update(resource.properties)
+        return response
+
+    @classmethod
+    def format_exception(cls, exc):
+        """
+        Formats the exception as a single json line
+        with the status code and the exception message.
+
+        :param Exception exc: The exception to format.
+        :return: A tuple containing: response body, format,
+            http response code
+        :rtype: tuple
+        """
+        status_code = getattr(exc, 'status_code', 500)
+        body = cls.json_encoder(dict(status=status_code, message=six.text_type(exc)))
+        return '{0}\n'.format(body), cls.formats[0], status_code
+
+    @classmethod
+    def format_request(cls, request):
+        """
+        Simply returns request
+
+        :param RequestContainer request: The request to handler
+        :rtype: RequestContainer
+        """
+        return request
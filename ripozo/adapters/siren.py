@@ -6,16 +6,18 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-from ripozo.adapters import AdapterBase
+from ripozo.adapters.base import AdapterBase, ChunkedList, iter_json_chunks
+from ripozo.decorators import _identical
 from ripozo.utilities import titlize_endpoint
-from ripozo.resources.resource_base import create_url
+from ripozo.resources.resource_base import ResourceBase, URLTemplate
 from ripozo.resources.constants import input_categories
 
-import json
 import six
+import weakref
 
 
 _CONTENT_TYPE = 'application/vnd.siren+json'
+_ACTION_TEMPLATES = weakref.WeakKeyDictionary()
 
 
 class SirenAdapter(AdapterBase):
@@ -40,16 +42,36 @@ class SirenAdapter(AdapterBase):
         # 204's are supposed to be empty responses
         if self.status_code == 204:
             return ''
+        return self.json_encoder(self._construct_response(self.get_entities()))
 
-        links = self.generate_links()
+    def formatted_body_chunks(self):
+        """
+        Yields the formatted body in chunks.  The entities are
+        encoded one at a time as they are generated.
+
+        :return: A generator of the parts of the siren
+            formatted response body.
+        :rtype: types.GeneratorType
+        """
+        if self.status_code == 204:
+            return
+        response = self._construct_response(ChunkedList(self._iter_entities()))
+        for chunk in iter_json_chunks(response, self.json_encoder):
+            yield chunk
 
-        entities = self.get_entities()
+    def _construct_response(self, entities):
+        """
+        :param list entities: The siren entities
+        :return: The siren representation of the resource.
+        :rtype: dict
+        """
+        links = self.generate_links()
         response = dict(properties=self.resource.properties, actions=self._actions,
                         links=links, entities=entities)
 
         # need to do this separately since class is a reserved keyword
         response['class'] = [self.resource.resource_name]
-        return json.dumps(response)
+        return response
 
     @property
     def _actions(self):
@@ -59,19 +81,65 @@ class SirenAdapter(AdapterBase):
         :return: The list of actions
         :rtype: list
         """
+        properties = self.resource.properties
         actions = []
-        for endpoint, options in six.iteritems(self.resource.endpoint_dictionary()):
-            options = options[0]
+        for name, title, meth, template, fields in self._action_templates():
+            route = self.combine_base_url_with_resource_url(template.render(properties))
+            actions.append(dict(name=name, title=title, method=meth, href=route,
+                                fields=[dict(field) for field in fields]))
+        return actions
+
+    def _action_templates(self):
+        """
+        Gets the parts of the actions that do not depend on
+        the resource instance as a list of
+        ``(name, title, method, url_template, fields)`` tuples.
+        They are compiled once per adapter class and resource
+        class and recompiled when the endpoint dictionary, the
+        manager of the resource class or the fields of any
+        endpoint (e.g. because the manager's ``fields`` changed)
+        are replaced.  The field dictionaries are shared between
+        responses and must not be modified.
+
+        :return: The action templates for the resource's class
+        :rtype: list
+        """
+        resource_class = type(self.resource)
+        endpoint_dictionary = self.resource.endpoint_dictionary()
+        manager = self.resource.manager
+        endpoints = [(endpoint, options[0]) for endpoint, options
+                     in six.iteritems(endpoint_dictionary)]
+        endpoint_fields = tuple(self._endpoint_fields(options.get('endpoint_func'))
+                                for endpoint, options in endpoints)
+        adapter_templates = _ACTION_TEMPLATES.setdefault(resource_class, {})
+        cached = adapter_templates.get(type(self))
+        if cached is not None and cached[0] is endpoint_dictionary and cached[1] is manager \
+                and len(cached[2]) == len(endpoint_fields) \
+                and all(_identical(old, new) for old, new in zip(cached[2], endpoint_fields)):
+            return cached[3]
+
+        templates = []
+        for endpoint, options in endpoints:
             all_methods = options.get('methods', ('GET',))
             meth = all_methods[0] if all_methods else 'GET'
             base_route = options.get('route', self.resource.base_url)
-            route = create_url(base_route, **self.resource.properties)
-            route = self.combine_base_url_with_resource_url(route)
             fields = self.generate_fields_for_endpoint_funct(options.get('endpoint_func'))
-            actn = dict(name=endpoint, title=titlize_endpoint(endpoint),
-                        method=meth, href=route, fields=fields)
-            actions.append(actn)
-        return actions
+            templates.append((endpoint, titlize_endpoint(endpoint), meth,
+                              URLTemplate.compile(base_route), fields))
+        adapter_templates[type(self)] = (endpoint_dictionary, manager, endpoint_fields, templates)
+        return templates
+
+    def _endpoint_fields(self, endpoint_func):
+        """
+        :param apimethod endpoint_func:
+        :return: The fields of the endpoint_func for
+            the resource's manager.
+        :rtype: tuple
+        """
+        fields_method = getattr(endpoint_func, 'fields', None)
+        if not fields_method:
+            return ()
+        return tuple(fields_method(self.resource.manager))
 
     def generate_fields_for_endpoint_funct(self, endpoint_func):
         """
@@ -83,12 +151,7 @@ class SirenAdapter(AdapterBase):
         :rtype: dict
         """
         return_fields = []
-        fields_method = getattr(endpoint_func, 'fields', None)
-        if not fields_method:
-            return []
-        fields = fields_method(self.resource.manager)
-
-        for field in fields:
+        for field in self._endpoint_fields(endpoint_func):
             if field.arg_type is input_categories.URL_PARAMS:
                 continue
             field_dict = dict(name=field.name, type=field.field_type.__name__,
@@ -117,17 +180,22 @@ class SirenAdapter(AdapterBase):
         :return: A list of entities
         :rtype: list
         """
-        entities = []
+        return list(self._iter_entities())
+
+    def _iter_entities(self):
+        """
+        A generator that yields the related entities
+        in the SIREN format.
+        """
         for resource, name, embedded in self.resource.related_resources:
             for ent in self.generate_entity(resource, name, embedded):
-                entities.append(ent)
-        return entities
+                yield ent
 
     def generate_entity(self, resource, name, embedded):
         """
         A generator that yields entities
         """
-        if isinstance(resource, list):
+        if not isinstance(resource, ResourceBase):
             for res in resource:
                 for ent in self.generate_entity(res, name, embedded):
                     yield ent
@@ -159,7 +227,7 @@ class SirenAdapter(AdapterBase):
         body = {'class': ['exception', exc.__class__.__name__],
                 'actions': [], 'entities': [], 'links': [],
                 'properties': dict(status=status_code, message=six.text_type(exc))}
-        return json.dumps(body), cls.formats[0], status_code
+        return cls.json_encoder(body), cls.formats[0], status_code
 
     @classmethod
     def format_request(cls, request):
@@ -0,0 +1,644 @@
+"""
+Caches used by ripozo.  The in memory caches
+are safe to share between threads.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+
+from ripozo.manager_base import BaseManager
+
+import hashlib
+import threading
+import time
+import uuid
+
+import six
+
+_MISSING = object()
+_SAFE_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+
+@six.add_metaclass(ABCMeta)
+class CacheBackend(object):
+    """
+    The interface of the storage used by the
+    ``ResponseCache``.  Implement it to store the
+    cached responses somewhere other than in process
+    memory (e.g. memcached or redis).  The keys are
+    always strings.
+    """
+
+    @abstractmethod
+    def get(self, key, default=None):
+        """
+        :param unicode key: The key to look up.
+        :param default: Returned if the key is not cached.
+        :return: The cached value or the default.
+        """
+        pass
+
+    @abstractmethod
+    def set(self, key, value):
+        """
+        :param unicode key: The key to set.
+        :param value: The value to cache.
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, key):
+        """
+        :param unicode key: The key to remove.
+        """
+        pass
+
+    @abstractmethod
+    def clear(self):
+        """
+        Removes every entry.
+        """
+        pass
+
+
+class LRUCache(CacheBackend):
+    """
+    A bounded, thread safe, least recently used cache.
+    When the cache is full the least recently used entry
+    is evicted.  Optionally, entries expire ``ttl`` seconds
+    after they were set.
+
+    .. code-block:: python
+
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.get('a')  # 1
+        cache.get('b', 'default')  # 'default'
+
+    :param int maxsize: The maximum number of entries in the cache.
+    :param float ttl: The number of seconds after which an
+        entry expires.  If None, entries never expire.
+    :param int hits: The number of lookups that found an entry.
+    :param int misses: The number of lookups that did not.
+    :param int evictions: The number of entries evicted because
+        the cache was full.
+    """
+
+    def __init__(self, maxsize=128, ttl=None):
+        """
+        :param int maxsize: The maximum number of entries in the cache.
+        :param float ttl: The number of seconds after which an
+            entry expires.  If None, entries never expire.
+        """
+        if maxsize < 1:
+            raise ValueError('The maxsize of an LRUCache must be at least 1')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Gets the value for the key and marks it as
+        the most recently used entry.
+
+        :param key: The key to look up.
+        :param default: Returned if the key is not
+            in the cache or has expired.
+        :return: The cached value or the default
+        """
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+            if entry is _MISSING or (entry[1] is not None and entry[1] <= time.time()):
+                self.misses += 1
+                return default
+            self._data[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        """
+        Sets the value for the key, evicting the least
+        recently used entry if the cache is full.
+
+        :param key: The key to set.
+        :param value: The value to cache.
+        """
+        expires = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (value, expires)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """
+        Removes the key from the cache if it is present.
+
+        :param key: The key to remove
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """
+        Removes every entry from the cache.  The
+        statistics are not reset.
+        """
+        with self._lock:
+            self._data.clear()
+
+    @property
+    def stats(self):
+        """
+        :return: A dictionary of the hits, misses,
+            evictions and current size of the cache.
+        :rtype: dict
+        """
+        return dict(hits=self.hits, misses=self.misses,
+                    evictions=self.evictions, size=len(self))
+
+    def __contains__(self, key):
+        entry = self._data.get(key, _MISSING)
+        return entry is not _MISSING and (entry[1] is None or entry[1] > time.time())
+
+    def __len__(self):
+        return len(self._data)
+
+
+def make_etag(body):
+    """
+    Generates a strong ETag for a response body.
+
+    :param unicode body: The response body.
+    :return: The quoted sha1 hex digest of the body.
+    :rtype: unicode
+    """
+    if isinstance(body, six.text_type):
+        body = body.encode('utf-8')
+    return '"{0}"'.format(hashlib.sha1(body).hexdigest())
+
+
+class CachedResponse(object):
+    """
+    A serialized response.  It has the same interface as an
+    adapter as far as dispatchers are concerned
+    (``formatted_body``, ``formatted_body_chunks``,
+    ``extra_headers`` and ``status_code``) so that
+    ``DispatcherBase.dispatch`` can return it in place of
+    an adapter.  The ``extra_headers`` include the ``ETag``.
+
+    :param unicode formatted_body: The serialized body.
+    :param dict extra_headers: The headers of the response.
+    :param int status_code: The http status code.
+    :param unicode etag: The strong ETag of the body.
+    :param ResourceBase resource: The resource that the body was
+        generated from.  None if the response came from the cache.
+    """
+    __slots__ = ('formatted_body', 'extra_headers', 'status_code', 'etag', 'resource')
+
+    def __init__(self, formatted_body, extra_headers, status_code, etag, resource=None):
+        self.formatted_body = formatted_body
+        self.extra_headers = extra_headers
+        self.status_code = status_code
+        self.etag = etag
+        self.resource = resource
+
+    def formatted_body_chunks(self):
+        """
+        :return: A generator that yields the formatted body.
+        :rtype: types.GeneratorType
+        """
+        yield self.formatted_body
+
+    def not_modified(self):
+        """
+        :return: A 304 response with an empty body and
+            the headers of this response.
+        :rtype: CachedResponse
+        """
+        return CachedResponse('', self.extra_headers, 304, self.etag)
+
+    def __getstate__(self):
+        return self.formatted_body, self.extra_headers, self.status_code, self.etag
+
+    def __setstate__(self, state):
+        self.formatted_body, self.extra_headers, self.status_code, self.etag = state
+        self.resource = None
+
+
+class ResponseCache(object):
+    """
+    Caches the serialized responses of safe (e.g. ``GET``)
+    endpoints.  Pass an instance to a dispatcher to
+    enable it.
+
+    .. code-block:: python
+
+        dispatcher = MyDispatcher(response_cache=ResponseCache(maxsize=1000, ttl=60))
+
+    Responses are cached per resource class, endpoint, adapter,
+    the url parameters and query args of the request and the
+    values of the ``vary`` headers (by default the
+    ``Authorization`` header, so that the response of one user is
+    never served to another).  The preprocessors of the resource
+    class (e.g. authentication) run for every request, including
+    the ones answered from the cache.  Only the endpoint, the
+    postprocessors and the adapter are skipped.  Only
+    responses with a 200 status code are cached.  Any other
+    endpoint (e.g. ``Create``, ``Update`` or ``Delete``)
+    invalidates every cached response of its resource class.
+    The invalidation replaces a generation token of the class
+    that is part of the cache key.  The tokens are stored in the
+    backend, so a write in one process invalidates the responses
+    cached by every process that shares the backend.  The backend
+    only stores the serialized responses, never the resources.
+
+    :param CacheBackend backend: Where the responses are stored.
+        Defaults to an ``LRUCache``.
+    :param tuple vary: The names of the request headers that
+        are part of the cache key.
+    """
+
+    def __init__(self, backend=None, maxsize=1024, ttl=None, vary=('Authorization',)):
+        """
+        :param CacheBackend backend: Where the responses are stored.
+            If not provided an ``LRUCache`` is created.
+        :param int maxsize: The maxsize of the default LRUCache
+        :param float ttl: The ttl in seconds of the default LRUCache
+        :param tuple vary: The names of the request headers that are
+            part of the cache key.  The names are case insensitive.
+        """
+        self.backend = backend if backend is not None else LRUCache(maxsize=maxsize, ttl=ttl)
+        self.vary = tuple(name.lower() for name in vary or ())
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_cacheable(methods):
+        """
+        :param list methods: The http methods of the request
+            or endpoint.
+        :return: Whether responses for the methods may be cached.
+        :rtype: bool
+        """
+        return bool(methods) and all(meth.upper() in _SAFE_METHODS for meth in methods)
+
+    @staticmethod
+    def _generation_key(resource_class):
+        """
+        :param type resource_class: The ResourceBase subclass
+        :return: The backend key of the class's generation.
+        :rtype: unicode
+        """
+        return 'ripozo.generation|{0}.{1}'.format(resource_class.__module__,
+                                                   resource_class.__name__)
+
+    def generation(self, resource_class):
+        """
+        Gets the generation token of the class from the backend.
+        If the backend does not have one (e.g. it was evicted) a
+        new token is stored, so that responses cached under an
+        older token are never served again.
+
+        :param type resource_class: The ResourceBase subclass
+        :return: A token that changes every time the responses
+            of the class are invalidated.
+        :rtype: unicode
+        """
+        key = self._generation_key(resource_class)
+        generation = self.backend.get(key)
+        if generation is None:
+            with self._lock:
+                generation = self.backend.get(key)
+                if generation is None:
+                    generation = uuid.uuid4().hex
+                    self.backend.set(key, generation)
+        return generation
+
+    def invalidate(self, resource_class):
+        """
+        Invalidates every cached response of the
+        resource class.
+
+        :param type resource_class: The ResourceBase subclass
+        """
+        self.backend.set(self._generation_key(resource_class), uuid.uuid4().hex)
+
+    def make_key(self, resource_class, endpoint, adapter_class, request):
+        """
+        Constructs the cache key for a request.
+
+        :param type resource_class: The ResourceBase subclass
+        :param unicode endpoint: The name of the endpoint.
+        :param type adapter_class: The adapter formatting the response.
+        :param RequestContainer request: The request.
+        :return: The cache key
+        :rtype: unicode
+        """
+        varying = []
+        if self.vary:
+            headers = dict((name.lower(), value) for name, value in six.iteritems(request.headers))
+            varying = [headers.get(name) for name in self.vary]
+        parts = '{0}.{1}|{2}|{3}|{4}.{5}|{6!r}|{7!r}|{8!r}'.format(
+            resource_class.__module__, resource_class.__name__,
+            self.generation(resource_class), endpoint,
+            adapter_class.__module__, adapter_class.__name__,
+            sorted(six.iteritems(request.url_params)),
+            sorted(six.iteritems(request.query_args)), varying)
+        return hashlib.sha1(parts.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        :param unicode key: The cache key.
+        :return: The cached response or None
+        :rtype: CachedResponse
+        """
+        return self.backend.get(key)
+
+    def set(self, key, adapter):
+        """
+        Serializes the adapter's response and caches it if
+        the status code is 200.
+
+        :param unicode key: The cache key.
+        :param AdapterBase adapter: The adapter for the response.
+        :return: The serialized response
+        :rtype: CachedResponse
+        """
+        body = adapter.formatted_body
+        etag = make_etag(body)
+        headers = dict(adapter.extra_headers, ETag=etag)
+        response = CachedResponse(body, headers, adapter.status_code, etag,
+                                  resource=adapter.resource)
+        if response.status_code == 200:
+            # The resource graph must not be kept alive by the cache
+            self.backend.set(key, CachedResponse(body, headers, response.status_code, etag))
+        return response
+
+    @staticmethod
+    def etag_matches(request, etag):
+        """
+        Checks whether the ``If-None-Match`` header of
+        the request matches the etag.
+
+        :param RequestContainer request: The request.
+        :param unicode etag: The ETag of the cached response.
+        :rtype: bool
+        """
+        headers = request.headers
+        if_none_match = headers.get('If-None-Match', headers.get('if-none-match'))
+        if not if_none_match:
+            return False
+        for candidate in if_none_match.split(','):
+            candidate = candidate.strip()
+            if candidate.startswith('W/'):
+                candidate = candidate[2:]
+            if candidate == '*' or candidate == etag:
+                return True
+        return False
+
+
+def _normalize_args(args):
+    """
+    :param dict args: The lookup keys or filters.
+    :return: A cache key that does not depend on
+        the order of the items.
+    :rtype: unicode
+    """
+    return repr(sorted(six.iteritems(args or {})))
+
+
+class CachingManager(object):
+    """
+    A read through cache around any manager.  The
+    results of ``retrieve`` are cached by the lookup keys
+    and, if ``cache_lists`` is True, the results of ``retrieve_list``
+    are cached by the filters.  Every other attribute is taken
+    from the wrapped manager.
+
+    .. code-block:: python
+
+        class MyResource(restmixins.CRUDL):
+            manager = CachingManager(MyManager(), maxsize=1000, ttl=30)
+
+    ``create``, ``update`` and ``delete`` (and their bulk versions)
+    remove the cached object for their lookup keys and every cached
+    list.  Objects are cached under the exact lookup keys they were
+    retrieved with.  If an object can be retrieved with different
+    lookup keys, use a ttl to bound how long those entries can be
+    stale.  Callers receive shallow copies of the cached values.
+    Calls with additional arguments (e.g. a ``fields`` projection)
+    bypass the cache.
+
+    It is registered as a virtual subclass of ``BaseManager``.
+
+    :param BaseManager manager: The wrapped manager.
+    :param LRUCache retrieve_cache: The cache of the ``retrieve`` results.
+    :param LRUCache list_cache: The cache of the ``retrieve_list``
+        results.  None if lists are not cached.
+    """
+
+    def __init__(self, manager, maxsize=1024, ttl=None, cache_lists=False):
+        """
+        :param BaseManager manager: The manager to wrap.
+        :param int maxsize: The maximum number of entries in each cache.
+        :param float ttl: The number of seconds after which an
+            entry expires.  If None, entries never expire.
+        :param bool cache_lists: Whether to cache ``retrieve_list``.
+        """
+        self.manager = manager
+        self.retrieve_cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.list_cache = LRUCache(maxsize=maxsize, ttl=ttl) if cache_lists else None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __getattr__(self, item):
+        if item == 'manager':
+            raise AttributeError(item)
+        return getattr(self.manager, item)
+
+    @property
+    def stats(self):
+        """
+        :return: The statistics of the ``retrieve`` cache
+            and the ``retrieve_list`` cache (or None if
+            lists are not cached).
+        :rtype: dict
+        """
+        list_stats = self.list_cache.stats if self.list_cache is not None else None
+        return dict(retrieve=self.retrieve_cache.stats, retrieve_list=list_stats)
+
+    def clear(self):
+        """
+        Removes every cached entry.
+        """
+        self._invalidate()
+        self.retrieve_cache.clear()
+
+    def _invalidate(self, lookup_keys_list=()):
+        """
+        Removes the cached objects for the lookup keys
+        and every cached list.  Results of reads that
+        started before the invalidation are not cached.
+
+        :param list lookup_keys_list: The lookup keys of
+            the objects that changed.
+        """
+        with self._lock:
+            self._generation += 1
+        for lookup_keys in lookup_keys_list:
+            self.retrieve_cache.delete(_normalize_args(lookup_keys))
+        if self.list_cache is not None:
+            self.list_cache.clear()
+
+    def retrieve(self, lookup_keys, *args, **kwargs):
+        """
+        Returns the cached object for the lookup keys
+        or retrieves and caches it.
+
+        :param dict lookup_keys: The keys to find the object.
+        :return: A copy of the properties of the object.
+        :rtype: dict
+        """
+        if args or kwargs:
+            return self.manager.retrieve(lookup_keys, *args, **kwargs)
+        key = _normalize_args(lookup_keys)
+        props = self.retrieve_cache.get(key, _MISSING)
+        if props is _MISSING:
+            generation = self._generation
+            props = self.manager.retrieve(lookup_keys, *args, **kwargs)
+            if generation == self._generation:
+                self.retrieve_cache.set(key, dict(props))
+        return dict(props)
+
+    def retrieve_many(self, lookup_keys_list, *args, **kwargs):
+        """
+        Returns the cached objects and retrieves the
+        others with a single ``retrieve_many`` call.
+
+        :param list lookup_keys_list: The lookup keys of the objects.
+        :return: Copies of the properties in the same order
+            as the lookup keys.  None for missing objects.
+        :rtype: list
+        """
+        keys = [_normalize_args(lookup_keys) for lookup_keys in lookup_keys_list]
+        results = [self.retrieve_cache.get(key, _MISSING) for key in keys]
+        missing = [index for index, props in enumerate(results) if props is _MISSING]
+        if missing:
+            generation = self._generation
+            fetched = self.manager.retrieve_many([lookup_keys_list[index] for index in missing],
+                                                 *args, **kwargs)
+            cache = generation == self._generation
+            for index, props in zip(missing, fetched):
+                results[index] = props
+                if cache and props is not None:
+                    self.retrieve_cache.set(keys[index], dict(props))
+        return [None if props is None or props is _MISSING else dict(props) for props in results]
+
+    def retrieve_list(self, filters, *args, **kwargs):
+        """
+        Returns the cached page for the filters or
+        retrieves and caches it if lists are cached.
+
+        :param dict filters: The filters and pagination args.
+        :return: A tuple of a list of copies of the
+            properties and a copy of the meta.
+        :rtype: tuple
+        """
+        if self.list_cache is None or args or kwargs:
+            return self.manager.retrieve_list(filters, *args, **kwargs)
+        key = _normalize_args(filters)
+        result = self.list_cache.get(key, _MISSING)
+        if result is _MISSING:
+            generation = self._generation
+            result = self.manager.retrieve_list(filters, *args, **kwargs)
+            result = [dict(props) for props in result[0]], dict(result[1])
+            if generation == self._generation:
+                self.list_cache.set(key, result)
+        return [dict(props) for props in result[0]], dict(result[1])
+
+    def create(self, values, *args, **kwargs):
+        """
+        Creates the object and invalidates the cached lists.
+
+        :param dict values: The values of the new object.
+        :return: The properties of the new object.
+        :rtype: dict
+        """
+        props = self.manager.create(values, *args, **kwargs)
+        self._invalidate()
+        return props
+
+    def update(self, lookup_keys, updates, *args, **kwargs):
+        """
+        Updates the object and invalidates it
+        and the cached lists.
+
+        :param dict lookup_keys: The keys to find the object.
+        :param dict updates: The fields to update.
+        :return: The updated properties.
+        :rtype: dict
+        """
+        try:
+            return self.manager.update(lookup_keys, updates, *args, **kwargs)
+        finally:
+            self._invalidate([lookup_keys])
+
+    def delete(self, lookup_keys, *args, **kwargs):
+        """
+        Deletes the object and invalidates it
+        and the cached lists.
+
+        :param dict lookup_keys: The keys to find the object.
+        """
+        try:
+            return self.manager.delete(lookup_keys, *args, **kwargs)
+        finally:
+            self._invalidate([lookup_keys])
+
+    def bulk_create(self, values_list, *args, **kwargs):
+        """
+        Creates the objects and invalidates the cached lists.
+
+        :param list values_list: The values of the new objects.
+        :rtype: list
+        """
+        props = self.manager.bulk_create(values_list, *args, **kwargs)
+        self._invalidate()
+        return props
+
+    def bulk_update(self, updates_list, *args, **kwargs):
+        """
+        Updates the objects and invalidates them
+        and the cached lists.
+
+        :param list updates_list: A list of (lookup_keys, updates) tuples.
+        :rtype: list
+        """
+        try:
+            return self.manager.bulk_update(updates_list, *args, **kwargs)
+        finally:
+            self._invalidate([lookup_keys for lookup_keys, updates in updates_list])
+
+    def bulk_delete(self, lookup_keys_list, *args, **kwargs):
+        """
+        Deletes the objects and invalidates them
+        and the cached lists.
+
+        :param list lookup_keys_list: The lookup keys of the objects.
+        """
+        try:
+            return self.manager.bulk_delete(lookup_keys_list, *args, **kwargs)
+        finally:
+            self._invalidate(lookup_keys_list)
+
+
+BaseManager.register(CachingManager)
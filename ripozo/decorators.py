@@ -9,6 +9,7 @@ from __future__ import unicode_literals
 from functools import wraps, update_wrapper
 import logging
 import warnings
+import weakref
 
 import six
 
@@ -60,6 +61,66 @@ def classproperty(func):
     return ClassPropertyDescriptor(func)
 
 
+class CachedClassPropertyDescriptor(ClassPropertyDescriptor):
+    """
+    A ClassPropertyDescriptor that computes the value once
+    per class.  The cached value is recomputed whenever
+    any of the dependencies (names of attributes on the class)
+    no longer refers to the same object that it did
+    when the value was computed.
+    """
+
+    def __init__(self, fget, dependencies=None):
+        super(CachedClassPropertyDescriptor, self).__init__(fget)
+        self.dependencies = tuple(dependencies or ())
+        self._cache = weakref.WeakKeyDictionary()
+
+    def __get__(self, obj, klass=None):
+        if klass is None:
+            klass = type(obj)
+        current = tuple(getattr(klass, name, None) for name in self.dependencies)
+        cached = self._cache.get(klass)
+        if cached is not None:
+            dependencies, value = cached
+            for old, new in zip(dependencies, current):
+                if old is not new:
+                    break
+            else:
+                return value
+        value = self.fget.__get__(obj, klass)()
+        self._cache[klass] = (current, value)
+        return value
+
+
+def cached_classproperty(*dependencies):
+    """
+    Works exactly like the ``classproperty`` decorator except
+    that the value is only computed once per class.  The
+    value is recomputed if any of the attributes named in
+    dependencies are reassigned on the class.  The value
+    should be immutable (e.g. a tuple) since it is shared.
+
+    .. code-block:: python
+
+        class MyClass(object):
+            _links = ()
+
+            @cached_classproperty('_links')
+            def links(cls):
+                return cls._links + (Relationship('self'),)
+
+    :param list dependencies: The names of the class attributes
+        that the value depends on.
+    :return: A decorator that returns a CachedClassPropertyDescriptor
+    :rtype: function
+    """
+    def decorator(func):
+        if not isinstance(func, (classmethod, staticmethod)):
+            func = classmethod(func)
+        return CachedClassPropertyDescriptor(func, dependencies=dependencies)
+    return decorator
+
+
 class _apiclassmethod(object):
     """
     A special version of classmethod that allows
@@ -83,16 +144,40 @@ class _apiclassmethod(object):
         self.func = func
         if hasattr(func, 'func_name'):
             self.func_name = func.func_name
+        self._bound = weakref.WeakKeyDictionary()
 
     def __get__(self, obj, klass=None):
         """
         A getter that automatically injects the
-        class as the first argument.
+        class as the first argument.  The wrapper is
+        created once per class and reused.
         """
         if klass is None:
             klass = type(obj)
+        try:
+            return self._bound[klass]
+        except KeyError:
+            newfunc = self._bind(weakref.ref(klass))
+            self._bound[klass] = newfunc
+            return newfunc
+        except TypeError:
+            # The class cannot be weakly referenced
+            return self._bind(lambda: klass)
+
+    def _bind(self, klass_ref):
+        """
+        Creates the wrapper for a class.  The wrapper only holds
+        a weak reference to the class so that the cached
+        wrappers do not keep the class alive.
+
+        :param function klass_ref: A function that returns
+            the class (e.g. a ``weakref.ref``).
+        :return: The wrapped function.
+        :rtype: function
+        """
+        func = self.func
 
-        @wraps(self.func)
+        @wraps(func)
         def newfunc(*args):
             """
             Figures out if an instance was called
@@ -100,8 +185,8 @@ class _apiclassmethod(object):
             of the instance.
             """
             if len(args) == 0 or not isinstance(args[0], type):
-                return self.func(klass, *args)
-            return self.func(*args)
+                return func(klass_ref(), *args)
+            return func(*args)
         return newfunc
 
     def __call__(self, cls, *args, **kwargs):
@@ -190,17 +275,124 @@ class apimethod(object):
         @wraps(func)
         def wrapped(cls, request, *args, **kwargs):
             """
-            Runs the preo/postprocessors
+            Runs the preo/postprocessors with the loader
+            of the request as the current loader.
             """
-            for proc in cls.preprocessors:
-                proc(cls, func.__name__, request, *args, **kwargs)
-            resource = func(cls, request, *args, **kwargs)
-            for proc in cls.postprocessors:
-                proc(cls, func.__name__, request, resource, *args, **kwargs)
-            return resource
+            loader = _request_loader(cls, request)
+            if loader is None:
+                return _run_endpoint(func, cls, request, *args, **kwargs)
+            with loader:
+                return _run_endpoint(func, cls, request, *args, **kwargs)
         return wrapped
 
 
+_FETCHING_CLASSES = weakref.WeakKeyDictionary()
+
+
+def _request_loader(cls, request):
+    """
+    Gets the loader that should be current while the
+    endpoint runs.  A loader is only created if the class
+    (or a class it is related to) has relationships that fetch.
+
+    :param type cls: The ResourceBase subclass.
+    :param RequestContainer request: The request.
+    :return: The loader of the request or None.
+    :rtype: ripozo.resources.loader.BatchLoader
+    """
+    loader = getattr(request, '_loader', None)
+    if loader is None and _fetches(cls):
+        loader = getattr(request, 'loader', None)
+    return loader
+
+
+def _fetches(cls):
+    """
+    Whether constructing the resources of the class may fetch
+    related resources.  The result is cached per class until
+    a class is registered or the ``_relationships`` or ``_links``
+    of the class are reassigned.
+
+    :param type cls: The ResourceBase subclass.
+    :rtype: bool
+    """
+    version = getattr(type(cls), 'registry_version', None)
+    declared = (getattr(cls, '_relationships', None), getattr(cls, '_links', None))
+    try:
+        cached = _FETCHING_CLASSES.get(cls)
+    except TypeError:
+        cached = None
+    if cached is not None and cached[0] == version and _identical(cached[1], declared):
+        return cached[2]
+    fetches = _find_fetching(cls, set())
+    try:
+        _FETCHING_CLASSES[cls] = (version, declared, fetches)
+    except TypeError:
+        pass
+    return fetches
+
+
+def _find_fetching(cls, seen):
+    """
+    :param type cls: The ResourceBase subclass.
+    :param set seen: The classes that were already checked.
+    :return: Whether any relationship of the class or
+        of the classes it is related to fetches.
+    :rtype: bool
+    """
+    seen.add(cls)
+    for relationship in tuple(getattr(cls, 'relationships', None) or ()) + \
+            tuple(getattr(cls, 'links', None) or ()):
+        if getattr(relationship, 'fetch', False):
+            return True
+        try:
+            related = relationship.relation
+        except (KeyError, AttributeError):
+            continue
+        if isinstance(related, type) and related not in seen and _find_fetching(related, seen):
+            return True
+    return False
+
+
+def _run_endpoint(func, cls, request, *args, **kwargs):
+    """
+    Runs the preprocessors, the endpoint and
+    the postprocessors.
+
+    :param function func: The undecorated endpoint.
+    :param type cls: The ResourceBase subclass.
+    :param RequestContainer request: The request.
+    :return: The resource returned by the endpoint.
+    :rtype: ResourceBase
+    """
+    for proc in cls.preprocessors:
+        proc(cls, func.__name__, request, *args, **kwargs)
+    resource = func(cls, request, *args, **kwargs)
+    for proc in cls.postprocessors:
+        proc(cls, func.__name__, request, resource, *args, **kwargs)
+    return resource
+
+
+def _values(obj):
+    """
+    :return: The values of a dictionary or an
+        empty tuple for anything else.
+    :rtype: tuple
+    """
+    return tuple(six.itervalues(obj)) if isinstance(obj, dict) else ()
+
+
+def _identical(first, second):
+    """
+    :param tuple first: A tuple of objects.
+    :param tuple second: Another tuple of objects.
+    :return: Whether the tuples contain the same
+        objects in the same order.
+    :rtype: bool
+    """
+    return len(first) == len(second) and all(a is b for a, b in zip(first, second))
+
+
 class translate(object):
     """
     Decorator for validating the inputs to an apimethod
@@ -266,6 +458,7 @@ class translate(object):
         self.skip_required = skip_required
         self.validate = validate
         self.manager_field_validators = manager_field_validators
+        self._plan = None
         if manager_field_validators:
             warnings.warn('The manager_field_validators attribute will be'
                           ' removed in version 2.0.0.  Please use the '
@@ -291,10 +484,7 @@ class translate(object):
             """
             Gets and translates/validates the fields.
             """
-            # TODO This is so terrible.  I really need to fix this.
-            from ripozo.resources.fields.base import translate_fields
-            translate_fields(request, self.fields(cls.manager),
-                             skip_required=self.skip_required, validate=self.validate)
+            self.translation_plan(cls.manager).apply(request)
             return func(cls, request, *args, **kwargs)
 
         action.__manager_field_validators__ = self.manager_field_validators
@@ -309,6 +499,26 @@ class translate(object):
             return self.original_fields + manager.field_validators
         return self.original_fields
 
+    def translation_plan(self, manager):
+        """
+        Gets the compiled ``TranslationPlan`` for the fields.
+        The plan is compiled once unless the fields come
+        from the manager.
+
+        :param ripozo.manager_base.BaseManager manager:
+        :rtype: ripozo.resources.fields.base.TranslationPlan
+        """
+        from ripozo.resources.fields.base import TranslationPlan
+        if self.manager_field_validators:
+            return TranslationPlan(self.fields(manager), skip_required=self.skip_required,
+                                   validate=self.validate)
+        plan = self._plan
+        if plan is None or plan.fields != tuple(self.original_fields):
+            plan = TranslationPlan(self.original_fields, skip_required=self.skip_required,
+                                   validate=self.validate)
+            self._plan = plan
+        return plan
+
 
 class manager_translate(object):
     """
@@ -322,7 +532,7 @@ class manager_translate(object):
     """
 
     def __init__(self, fields=None, skip_required=False,
-                 validate=False, fields_attr='fields'):
+                 validate=False, fields_attr='fields', locations=None):
         """A special case translation that inspects the manager
         to get the relevant fields.  This is purely for ease of use
         and may not be maintained
@@ -337,12 +547,19 @@ class manager_translate(object):
             to access on the manager to get the fields that are necessary.
             e.g. `'create_fields'`, `'list_fields'` or whatever you want.
             The attribute should be a list of strings
+        :param tuple locations: The input categories (e.g.
+            ``input_categories.URL_PARAMS``) that the fields are read
+            from.  Defaults to all of them.  Endpoints that do not read
+            the body args should leave them out so that a raw body is
+            never decoded.
         """
         self.original_fields = fields or []
         self.skip_required = skip_required
         self.validate = validate
         self.fields_attr = fields_attr
+        self.locations = locations
         self.cls = None
+        self._resolved = weakref.WeakKeyDictionary()
 
     def __call__(self, func):
         """
@@ -362,10 +579,7 @@ class manager_translate(object):
             """
             Gets and translates/validates the fields.
             """
-            # TODO This is so terrible.  I really need to fix this.
-            from ripozo.resources.fields.base import translate_fields
-            translate_fields(request, self.fields(cls.manager),
-                             skip_required=self.skip_required, validate=self.validate)
+            self.translation_plan(cls.manager).apply(request)
             return func(cls, request, *args, **kwargs)
 
         action.__manager_field_validators__ = True
@@ -374,12 +588,60 @@ class manager_translate(object):
 
     def fields(self, manager):
         """
-        Gets the fields from the manager
+        Gets the fields from the manager.  The fields are
+        resolved once per manager and resolved again when the
+        ``fields_attr`` fields change or the manager's
+        ``_field_validators`` dictionary or any of the
+        validators in it are replaced (e.g. because its
+        ``fields`` changed).
+
+        :param ripozo.manager_base.BaseManager manager:
+        """
+        return list(self._resolve(manager)[0])
+
+    def translation_plan(self, manager):
+        """
+        Gets the compiled ``TranslationPlan`` for the
+        fields of the manager.  It is cached with the fields.
+
+        :param ripozo.manager_base.BaseManager manager:
+        :rtype: ripozo.resources.fields.base.TranslationPlan
+        """
+        from ripozo.resources.fields.base import TranslationPlan
+        resolved = self._resolve(manager)
+        if resolved[1] is None:
+            resolved[1] = TranslationPlan(resolved[0], skip_required=self.skip_required,
+                                          validate=self.validate, locations=self.locations)
+        return resolved[1]
+
+    def _resolve(self, manager):
+        """
+        Gets the cached fields of the manager or resolves them.
 
         :param ripozo.manager_base.BaseManager manager:
+        :return: A list of the tuple of fields and the compiled
+            plan (None until it is requested).
+        :rtype: list
         """
-        manager_fields = []
-        for field in manager.field_validators:
-            if field.name in getattr(manager, self.fields_attr):
-                manager_fields.append(field)
-        return self.original_fields + manager_fields
+        original_fields = tuple(self.original_fields)
+        names = tuple(getattr(manager, self.fields_attr))
+        try:
+            cached = self._resolved.get(manager)
+        except TypeError:
+            cached = None
+        if cached is not None and cached[0] == original_fields and cached[1] == names:
+            validators = getattr(manager, '_field_validators', None)
+            if cached[2] is validators and _identical(cached[3], _values(validators)):
+                return cached[4]
+
+        allowed = set(names)
+        manager_fields = [field for field in manager.field_validators if field.name in allowed]
+        resolved = [original_fields + tuple(manager_fields), None]
+        # field_validators may have created the _field_validators
+        validators = getattr(manager, '_field_validators', None)
+        try:
+            self._resolved[manager] = (original_fields, names, validators,
+                                       _values(validators), resolved)
+        except TypeError:
+            pass
+        return resolved
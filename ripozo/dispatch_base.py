@@ -10,6 +10,7 @@ from __future__ import unicode_literals
 
 from abc import ABCMeta, abstractmethod, abstractproperty
 
+from ripozo.caching import LRUCache
 from ripozo.exceptions import AdapterFormatAlreadyRegisteredException
 from ripozo.resources.constructor import ResourceMetaClass
 from ripozo.resources.restmixins import AllOptionsResource
@@ -21,6 +22,75 @@ import warnings
 _logger = logging.getLogger(__name__)
 
 
+def parse_accept_header(accept_header):
+    """
+    Parses a raw Accept header into a list of
+    ``(mimetype, quality)`` tuples in the order they
+    appear in the header.  Parameters other than
+    the quality are ignored.  A malformed quality
+    is treated as 0.
+
+    .. code-block:: python
+
+        >>> parse_accept_header('text/html;q=0.5, application/json')
+        [('text/html', 0.5), ('application/json', 1.0)]
+
+    :param unicode accept_header: The raw Accept header
+    :return: The media ranges and their quality values
+    :rtype: list
+    """
+    media_ranges = []
+    for media_range in accept_header.split(','):
+        parts = media_range.split(';')
+        mimetype = parts[0].strip().lower()
+        if not mimetype:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value.strip())
+                except ValueError:
+                    quality = 0.0
+        media_ranges.append((mimetype, quality))
+    return media_ranges
+
+
+def _media_range_sort_key(media_range):
+    """
+    Sort key that orders media ranges by descending
+    quality and specificity.  The sort is stable so
+    ties keep the order of the header.
+    """
+    mimetype, quality = media_range
+    if mimetype == '*/*':
+        specificity = 0
+    elif mimetype.endswith('/*'):
+        specificity = 1
+    else:
+        specificity = 2
+    return -quality, -specificity
+
+
+def _is_excluded(format_name, excluded):
+    """
+    :param unicode format_name: The format of an adapter.
+    :param set excluded: The media ranges that the client
+        explicitly does not accept (``q=0``).  They may be
+        wildcards such as ``application/*``.
+    :return: Whether the format matches one of the excluded ranges.
+    :rtype: bool
+    """
+    if format_name in excluded:
+        return True
+    for media_range in excluded:
+        if media_range == '*/*' or (media_range.endswith('/*') and
+                                    format_name.startswith(media_range[:-1])):
+            return True
+    return False
+
+
 @six.add_metaclass(ABCMeta)
 class DispatcherBase(object):
     """
@@ -36,8 +106,14 @@ class DispatcherBase(object):
     """
     _adapter_formats = None
     _default_adapter = None
+    _accept_cache = None
+    accept_cache_size = 128
+    json_encoder = None
+    response_cache = None
+    _registered_endpoints = None
 
-    def __init__(self, auto_options=True, auto_options_name='AutoOptionsResource'):
+    def __init__(self, auto_options=True, auto_options_name='AutoOptionsResource',
+                 json_encoder=None, response_cache=None):
         """
 
         :param bool auto_options: Automatically builds out an
@@ -46,7 +122,16 @@ class DispatcherBase(object):
         :param unicode auto_options_name: The name of the auto
             options resource class.  Available in cases of
             multiple dispatchers.
+        :param function json_encoder: If provided, the adapters
+            created by this dispatcher serialize their responses
+            with it instead of their own ``json_encoder``.
+        :param ripozo.caching.ResponseCache response_cache: If provided,
+            the serialized responses of safe endpoints are cached
+            and ``dispatch`` answers ``If-None-Match`` requests
+            with a 304.
         """
+        self.json_encoder = json_encoder
+        self.response_cache = response_cache
         self.auto_options = auto_options
         if self.auto_options:
             cls = ResourceMetaClass(str(auto_options_name), (AllOptionsResource,),
@@ -103,6 +188,7 @@ class DispatcherBase(object):
         """
         _logger.info('Setting the default adapter for a Dispatcher as %s', adapter_class)
         self._default_adapter = adapter_class
+        self._clear_accept_cache()
 
     def register_adapters(self, *adapter_classes):
         """
@@ -131,6 +217,7 @@ class DispatcherBase(object):
                 _logger.debug('Registering format %s to be hanlded by the AdapterBase'
                               ' subclass %s', format_name, klass)
                 self.adapter_formats[format_name] = klass
+        self._clear_accept_cache()
 
     def register_resources(self, *classes):
         """
@@ -156,12 +243,17 @@ class DispatcherBase(object):
                 and klass is not self.auto_options_class:
             self.auto_options_class.linked_resource_classes.append(klass)
         self._check_relationships(klass)
-        for endpoint, routes in six.iteritems(klass.endpoint_dictionary()):
-            endpoint = '{0}__{1}'.format(klass.__name__, endpoint)
+        if self._registered_endpoints is None:
+            self._registered_endpoints = {}
+        for endpoint_name, routes in six.iteritems(klass.endpoint_dictionary()):
+            endpoint = '{0}__{1}'.format(klass.__name__, endpoint_name)
             for options in routes:
                 options = options.copy()
                 route = options.pop('route', klass.base_url)
                 methods = options.pop('methods', ['GET'])
+                endpoint_func = options.get('endpoint_func')
+                if endpoint_func is not None:
+                    self._registered_endpoints[endpoint_func] = (klass, endpoint_name, methods)
                 _logger.info('Registering the endpoint %s to handle route %s'
                              ' with the methods %s on a DispatcherBase '
                              'subclass', endpoint, route, methods)
@@ -193,27 +285,84 @@ class DispatcherBase(object):
 
         :param method endpoint_func: The endpoint_func is responsible
             for actually get the ResourceBase response
-        :param list accepted_mimetypes: The mime types accepted by
-            the client.  If none of the mimetypes provided are
-            available the default adapter will be used.
+        :param list|unicode accepted_mimetypes: The mime types accepted by
+            the client or the raw Accept header.  If none of the
+            mimetypes provided are available the default adapter
+            will be used.
         :param RequestContainer request: The request object
         :param list args: a list of args that wll be passed
             to the endpoint_func
         :param dict kwargs: a dictionary of keyword args to
             pass to the endpoint_func
         :return: an instance of an AdapterBase subclass that
-            can be used to find
-        :rtype:
+            can be used to find.  If the dispatcher has a
+            ``response_cache`` it may be a
+            ``ripozo.caching.CachedResponse`` instead.
+        :rtype: AdapterBase
         """
         _logger.info('Dispatching request to endpoint function: %s with args:'
                      ' %s and kwargs:%s', endpoint_func, args, kwargs)
         adapter_class = self.get_adapter_for_type(accepted_mimetypes)
         request = adapter_class.format_request(request)
+        if self.response_cache is not None and self._registered_endpoints:
+            registered = self._registered_endpoints.get(endpoint_func)
+            if registered is not None:
+                return self._dispatch_cached(registered, adapter_class, endpoint_func,
+                                             request, *args, **kwargs)
         result = endpoint_func(request, *args, **kwargs)
-        _logger.info('Using adapter %s to format response for format'
-                     ' type %s', adapter_class, accepted_mimetypes)
-        adapter = adapter_class(result, base_url=self.base_url)
-        return adapter
+        return self._construct_adapter(adapter_class, result)
+
+    def _construct_adapter(self, adapter_class, result):
+        """
+        :param type adapter_class: The AdapterBase subclass
+        :param ResourceBase result: The resource to format
+        :return: The adapter for the result
+        :rtype: AdapterBase
+        """
+        _logger.info('Using adapter %s to format response', adapter_class)
+        if self.json_encoder is not None:
+            return adapter_class(result, base_url=self.base_url, json_encoder=self.json_encoder)
+        return adapter_class(result, base_url=self.base_url)
+
+    def _dispatch_cached(self, registered, adapter_class, endpoint_func, request, *args, **kwargs):
+        """
+        Dispatches a request through the response cache.
+        Safe requests are answered from the cache if possible
+        (with a 304 if the ``If-None-Match`` header matches the
+        ETag) and their serialized responses are cached.  The
+        preprocessors of the resource class are run before a
+        cached response is returned.  Any other request
+        invalidates the cached responses of the endpoint's
+        resource class.
+
+        :param tuple registered: The resource class, endpoint name
+            and methods of the endpoint_func.
+        :param type adapter_class: The AdapterBase subclass
+        :param method endpoint_func: The endpoint_func
+        :param RequestContainer request: The formatted request
+        :return: A CachedResponse or the adapter
+        :rtype: ripozo.caching.CachedResponse|AdapterBase
+        """
+        cache = self.response_cache
+        klass, endpoint_name, methods = registered
+        request_methods = [request.method] if getattr(request, 'method', None) else methods
+        if not cache.is_cacheable(request_methods):
+            result = endpoint_func(request, *args, **kwargs)
+            cache.invalidate(klass)
+            return self._construct_adapter(adapter_class, result)
+
+        key = cache.make_key(klass, endpoint_name, adapter_class, request)
+        response = cache.get(key)
+        if response is None:
+            result = endpoint_func(request, *args, **kwargs)
+            response = cache.set(key, self._construct_adapter(adapter_class, result))
+        else:
+            # e.g. authentication must still reject the request
+            for proc in klass.preprocessors:
+                proc(klass, endpoint_name, request, *args, **kwargs)
+        if response.status_code == 200 and cache.etag_matches(request, response.etag):
+            return response.not_modified()
+        return response
 
     def get_adapter_for_type(self, accept_mimetypes):
         """
@@ -222,17 +371,116 @@ class DispatcherBase(object):
         return the SirenAdapter.  Returns the default adapter
         If it cannot not find an adapter for the format_type.
 
-        :param list accept_mimetypes: A list of the mime types accepted
-            by the client.
+        If accept_mimetypes is a string it is parsed as a raw
+        Accept header (e.g. ``'application/hal+json;q=0.9, */*;q=0.1'``).
+        The quality values and the ``*/*`` and ``type/*`` wildcards
+        are respected and a type with ``q=0`` (or matching a wildcard
+        with ``q=0`` such as ``application/*;q=0``) is only chosen
+        if the client names it explicitly or if it is the default
+        adapter and no other adapter is acceptable.
+        The adapter for every distinct header is cached in a bounded
+        cache of ``accept_cache_size`` entries.  The cache is
+        cleared whenever the adapters or the default adapter change.
+
+        :param list|unicode accept_mimetypes: A list of the mime types
+            accepted by the client in order of preference or the raw
+            Accept header.
         :return: A BaseAdapter subclass for the best matched
             accept type.
         :rtype: type
         """
+        if isinstance(accept_mimetypes, six.string_types):
+            if self._accept_cache is None:
+                self._accept_cache = LRUCache(maxsize=self.accept_cache_size)
+            adapter_class = self._accept_cache.get(accept_mimetypes)
+            if adapter_class is None:
+                adapter_class = self._negotiate_adapter(accept_mimetypes)
+                self._accept_cache.set(accept_mimetypes, adapter_class)
+            return adapter_class
         for mimetype in accept_mimetypes:
             if mimetype in self.adapter_formats:
                 return self.adapter_formats.get(mimetype)
         return self.default_adapter
 
+    def _negotiate_adapter(self, accept_header):
+        """
+        Finds the adapter class for a raw Accept header.
+        The media ranges are tried in order of their quality,
+        then their specificity and then their position in
+        the header.
+
+        :param unicode accept_header: The raw Accept header
+        :return: The best matching adapter class or the default
+            adapter if none match.
+        :rtype: type
+        """
+        media_ranges = parse_accept_header(accept_header)
+        excluded = set(mimetype for mimetype, quality in media_ranges if quality <= 0)
+        for mimetype, quality in sorted(media_ranges, key=_media_range_sort_key):
+            if quality <= 0:
+                break
+            if mimetype == '*/*':
+                adapter_class = self._match_any(excluded)
+                if adapter_class is not None:
+                    return adapter_class
+            elif mimetype.endswith('/*'):
+                adapter_class = self._match_wildcard(mimetype[:-1], excluded)
+                if adapter_class is not None:
+                    return adapter_class
+            elif mimetype in self.adapter_formats:
+                return self.adapter_formats[mimetype]
+        return self.default_adapter
+
+    def _match_wildcard(self, prefix, excluded):
+        """
+        Finds an adapter with a format that starts with the
+        prefix (e.g. ``'application/'``).  The default adapter is
+        preferred if it has a matching format.
+
+        :param unicode prefix: The type of the media range
+            including the slash.
+        :param set excluded: The media ranges that the client
+            explicitly does not accept.
+        :return: The matching adapter class or None
+        :rtype: type
+        """
+        def _matches(format_name):
+            return format_name.startswith(prefix) and not _is_excluded(format_name, excluded)
+
+        default = self.default_adapter
+        if default is not None and any(_matches(name) for name in default.formats):
+            return default
+        for format_name in sorted(self.adapter_formats):
+            if _matches(format_name):
+                return self.adapter_formats[format_name]
+        return None
+
+    def _match_any(self, excluded):
+        """
+        Finds an adapter for the ``*/*`` media range.  The
+        default adapter is preferred unless the client explicitly
+        does not accept one of its formats.
+
+        :param set excluded: The media ranges that the client
+            explicitly does not accept.
+        :return: The first acceptable adapter class or None
+        :rtype: type
+        """
+        candidates = [self.default_adapter]
+        candidates.extend(self.adapter_formats[name] for name in sorted(self.adapter_formats))
+        for adapter_class in candidates:
+            if adapter_class is not None and not any(_is_excluded(name, excluded)
+                                                     for name in adapter_class.formats):
+                return adapter_class
+        return None
+
+    def _clear_accept_cache(self):
+        """
+        Clears the cached adapters for the Accept headers.
+        """
+        if self._accept_cache is not None:
+            self._accept_cache.clear()
+
     @staticmethod
     def _check_relationships(klass):
         """
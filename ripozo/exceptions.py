@@ -61,6 +61,17 @@ class TranslationException(ValidationException):
     pass
 
 
+class BodyParseException(RestException):
+    """
+    This exception is raised when the raw body of a
+    request cannot be decoded.  The status code is 415
+    if there is no decoder for the content type of the
+    request and 400 if the body is malformed.
+    """
+    def __init__(self, message, status_code=400, *args, **kwargs):
+        super(BodyParseException, self).__init__(message, status_code=status_code, *args, **kwargs)
+
+
 class DispatchException(RestException):
     """
     An exception for when something is wrong with the Dispatcher
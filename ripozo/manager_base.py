@@ -9,15 +9,31 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from abc import ABCMeta, abstractmethod
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
 
 from ripozo.decorators import classproperty
+from ripozo.exceptions import NotFoundException, ValidationException
+from ripozo.utilities import json_default
 
+import binascii
+import json
 import logging
 import six
 
 _logger = logging.getLogger(__name__)
 
 
+class Cursor(namedtuple('Cursor', ['direction', 'values'])):
+    """
+    A decoded pagination cursor.  The direction is either
+    ``'next'`` or ``'previous'`` and the values are the values
+    of the ``cursor_fields`` of the row that the page starts
+    after (or before for ``'previous'``).
+    """
+    __slots__ = ()
+
+
 @six.add_metaclass(ABCMeta)
 class BaseManager(object):
     """
@@ -35,10 +51,24 @@ class BaseManager(object):
         to return in a list retrieval
     :param unicode pagination_next: The meta parameter to return that
         specifies the next query parameters
+    :param unicode pagination_cursor_query_arg: The name of the query
+        parameter that contains the opaque cursor when using cursor
+        (keyset) pagination.
     :param int paginate_by: The number of results to return by default.
         This gets overridden by pagination_count_query_arg
+    :param int max_paginate_by: The maximum number of results that may be
+        requested through the pagination_count_query_arg.  If None, there
+        is no maximum.
     :param list order_by: A list of the fields to order the results by.
         This may be restricted in certain databases
+    :param tuple cursor_pks: The primary keys of the model.  They are
+        appended to the order_by fields to build unique cursors.
+    :param unicode fields_query_arg: The name of the query parameter
+        that lists the fields a client wants returned.
+    :param bool supports_projection: Set to True if ``retrieve`` and
+        ``retrieve_list`` accept a ``fields`` keyword argument with
+        the tuple of fields to return.  Otherwise, the rest mixins
+        remove the other fields after retrieving the whole model.
     :param list _fields: A list of the fields that are able to be manipulated
         or retrieved by the manager.  These are the default fields if
         _create_fields, _list_fields, or _update_fields are not defined.
@@ -57,8 +87,13 @@ class BaseManager(object):
     pagination_count_query_arg = 'count'
     pagination_next = 'next'
     pagination_prev = 'previous'
+    pagination_cursor_query_arg = 'cursor'
     paginate_by = 10000
+    max_paginate_by = None
     order_by = None
+    cursor_pks = ('id',)
+    fields_query_arg = 'fields'
+    supports_projection = False
     model = None
     arg_parser = None
     _field_validators = None
@@ -80,6 +115,9 @@ class BaseManager(object):
         Retrieve a single model and nothing more as a python dictionary
 
         :param dict lookup_keys: The lookup keys for the model and the associated values
+        :param tuple fields: Passed as a keyword argument only if the
+            manager ``supports_projection`` and the client requested
+            a subset of the fields.
         :return: The dictionary of arguments that should be returned by the serializer
         :return: A tuple with the first object being a dictionary of key value
             pairs according to the fields list and
@@ -93,7 +131,17 @@ class BaseManager(object):
         """
         Retrieves a list of dictionaries containing the fields for the associated model
 
+        The list may be a lazy iterable (e.g. a generator reading
+        from a server side cursor).  The rows are then consumed once,
+        while the response is formatted, and are never materialized
+        as a list by ripozo when formatted with
+        ``AdapterBase.formatted_body_chunks``.  The meta, including the
+        pagination links, must be complete when this method returns.
+
         :param dictlookup_keys: The lookup keys for the model and the associated values
+        :param tuple fields: Passed as a keyword argument only if the
+            manager ``supports_projection`` and the client requested
+            a subset of the fields.
         :return: The dictionary of arguments that should be returned by the serializer
         :return: A a list of dictionaries of key value pairs according to the fields list
         :rtype: list
@@ -124,6 +172,74 @@ class BaseManager(object):
         """
         pass
 
+    def retrieve_many(self, lookup_keys_list, *args, **kwargs):
+        """
+        Retrieves many models at once.  It is used by the
+        request loader to batch the lookups of relationships
+        created with ``fetch=True``.  By default it calls
+        ``retrieve`` for every item.  Override it to retrieve
+        all of the models in a single query.
+
+        :param list lookup_keys_list: A list of the lookup keys
+            of the models.
+        :return: A list of the properties of the models in the
+            same order as the lookup keys.  None for models
+            that could not be found.
+        :rtype: list
+        """
+        results = []
+        for lookup_keys in lookup_keys_list:
+            try:
+                results.append(self.retrieve(lookup_keys, *args, **kwargs))
+            except NotFoundException:
+                results.append(None)
+        return results
+
+    def bulk_create(self, values_list, *args, **kwargs):
+        """
+        Creates a model for every values dictionary in
+        the values_list.  By default it simply calls ``create``
+        for each one.  Override it to use the native batch
+        inserts of the persistence mechanism.
+
+        :param list values_list: A list of the values
+            dictionaries to create the models from.
+        :return: A list of the dictionaries of the created models
+            in the same order as the values_list
+        :rtype: list
+        """
+        return [self.create(values, *args, **kwargs) for values in values_list]
+
+    def bulk_update(self, updates_list, *args, **kwargs):
+        """
+        Updates multiple models.  By default it simply calls
+        ``update`` for each one.  Override it to use the native
+        batch updates of the persistence mechanism.
+
+        :param list updates_list: A list of ``(lookup_keys, updates)``
+            tuples.  The lookup_keys find the model to update and
+            the updates are the fields to update and their new values.
+        :return: A list of the dictionaries of the updated models
+            in the same order as the updates_list
+        :rtype: list
+        """
+        return [self.update(lookup_keys, updates, *args, **kwargs)
+                for lookup_keys, updates in updates_list]
+
+    def bulk_delete(self, lookup_keys_list, *args, **kwargs):
+        """
+        Deletes multiple models.  By default it simply
+        calls ``delete`` for each one.  Override it to use the
+        native batch deletes of the persistence mechanism.
+
+        :param list lookup_keys_list: A list of the lookup keys
+            dictionaries of the models to delete.
+        :return: nothing.
+        :rtype: NoneType
+        """
+        for lookup_keys in lookup_keys_list:
+            self.delete(lookup_keys, *args, **kwargs)
+
     @classmethod
     def get_field_type(cls, name):
         """
@@ -220,7 +336,18 @@ class BaseManager(object):
         # get the pagination count or else use the default
         filters = filters.copy()
         pagination_count = filters.pop(self.pagination_count_query_arg, self.paginate_by)
-        pagination_count = int(pagination_count)
+        try:
+            pagination_count = int(pagination_count)
+        except (TypeError, ValueError):
+            raise ValidationException('The {0} query argument must be an integer'
+                                      ''.format(self.pagination_count_query_arg))
+        if pagination_count < 1:
+            raise ValidationException('The {0} query argument must be at least 1'
+                                      ''.format(self.pagination_count_query_arg))
+        if self.max_paginate_by is not None and pagination_count > self.max_paginate_by:
+            raise ValidationException('The {0} query argument may not be greater '
+                                      'than {1}'.format(self.pagination_count_query_arg,
+                                                        self.max_paginate_by))
         _logger.debug('Paginating list by %s', pagination_count)
         return pagination_count, filters
 
@@ -236,6 +363,134 @@ class BaseManager(object):
         last_pagination_pk = filters.pop(self.pagination_pk_query_arg, None)
         return last_pagination_pk, filters
 
+    def get_projection(self, filters):
+        """
+        Get the fields requested with the ``fields_query_arg``
+        from the args.  The value is either a list of field
+        names or a comma separated string.
+
+        :param dict filters: All of the args
+        :return: tuple of (projection, updated_filters).  The
+            projection is a tuple of the requested field names
+            or None if the client did not request specific fields.
+        :rtype: tuple
+        :raises: ValidationException
+        """
+        filters = filters.copy()
+        projection = filters.pop(self.fields_query_arg, None)
+        if projection is None:
+            return None, filters
+        if isinstance(projection, six.string_types):
+            projection = projection.split(',')
+        fields = []
+        for field in projection:
+            field = field.strip()
+            if field and field not in fields:
+                fields.append(field)
+        valid_fields = set(self.fields)
+        invalid = [field for field in fields if field not in valid_fields]
+        if invalid:
+            raise ValidationException('The {0} query argument contains the unknown '
+                                      'fields: {1}'.format(self.fields_query_arg,
+                                                           ', '.join(invalid)))
+        return tuple(fields) or None, filters
+
+    @property
+    def cursor_fields(self):
+        """
+        The fields that a cursor is built from.  These are the
+        ``order_by`` fields followed by the ``cursor_pks`` that
+        are not already in the ``order_by``.  Ordering by all
+        of them must give a total order of the rows.
+
+        :rtype: tuple
+        """
+        order_by = tuple(self.order_by or ())
+        return order_by + tuple(pk for pk in self.cursor_pks if pk not in order_by)
+
+    def encode_cursor(self, row, direction='next'):
+        """
+        Builds an opaque cursor from the ``cursor_fields`` of
+        a row.  The cursor is url safe base64 encoded json.
+
+        :param dict row: The row that the page should start
+            after (or end before if the direction is previous)
+        :param unicode direction: Either ``'next'`` or ``'previous'``
+        :return: The opaque cursor
+        :rtype: unicode
+        """
+        values = [row.get(field) for field in self.cursor_fields]
+        payload = json.dumps([direction, values], separators=(',', ':'), default=json_default)
+        cursor = urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return cursor.rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """
+        Decodes a cursor created by ``encode_cursor``.
+
+        :param unicode cursor: The opaque cursor
+        :return: The decoded cursor
+        :rtype: Cursor
+        :raises: ValidationException
+        """
+        try:
+            cursor = cursor.encode('ascii') if isinstance(cursor, six.text_type) else cursor
+            padding = b'=' * (-len(cursor) % 4)
+            direction, values = json.loads(urlsafe_b64decode(cursor + padding).decode('utf-8'))
+        except (TypeError, ValueError, UnicodeError, binascii.Error, AttributeError):
+            raise ValidationException('Invalid pagination cursor: {0}'.format(cursor))
+        if direction not in ('next', 'previous') or not isinstance(values, list) \
+                or len(values) != len(self.cursor_fields):
+            raise ValidationException('Invalid pagination cursor: {0}'.format(cursor))
+        return Cursor(direction, tuple(values))
+
+    def get_pagination_cursor(self, filters):
+        """
+        Get the decoded pagination cursor from the args.
+
+        :param dict filters: All of the args
+        :return: tuple of (cursor, updated_filters).  The cursor is
+            None if the args do not contain one.
+        :rtype: tuple
+        :raises: ValidationException
+        """
+        filters = filters.copy()
+        cursor = filters.pop(self.pagination_cursor_query_arg, None)
+        if cursor is None:
+            return None, filters
+        return self.decode_cursor(cursor), filters
+
+    def get_cursor_links(self, rows, pagination_count, cursor=None, has_more=False):
+        """
+        Builds the ``next`` and ``previous`` links for the meta
+        of a page retrieved with cursor pagination.  Return
+        them as the links in the meta from ``retrieve_list``
+        (e.g. ``return rows, dict(links=links)``).
+
+        :param list rows: The rows of the page in order.
+        :param int pagination_count: The page size.
+        :param Cursor cursor: The cursor the page was retrieved with.
+        :param bool has_more: Whether there are more rows beyond
+            the page in the direction of the cursor.
+        :return: A dictionary of the links and their query args.
+        :rtype: dict
+        """
+        links = {}
+        if not rows:
+            return links
+        backwards = cursor is not None and cursor.direction == 'previous'
+        has_next = not backwards and has_more or backwards
+        has_previous = backwards and has_more or not backwards and cursor is not None
+        if has_next:
+            links[self.pagination_next] = {
+                self.pagination_cursor_query_arg: self.encode_cursor(rows[-1], 'next'),
+                self.pagination_count_query_arg: pagination_count}
+        if has_previous:
+            links[self.pagination_prev] = {
+                self.pagination_cursor_query_arg: self.encode_cursor(rows[0], 'previous'),
+                self.pagination_count_query_arg: pagination_count}
+        return links
+
     def dot_field_list_to_dict(self, fields=None):
         """
         Converts a list of dot delimited fields (and related fields)
@@ -11,6 +11,11 @@ import warnings
 
 _logger = logging.getLogger(__name__)
 
+_FROZEN_ATTRIBUTES = ('resource_name', 'base_url_sans_pks', 'base_url',)
+_URL_ATTRIBUTES = ('namespace', 'pks', 'append_slash',) + _FROZEN_ATTRIBUTES
+_MISSING = object()
+_ENDPOINT_DICTIONARY_CACHE = str('_endpoint_dictionary_cache')
+
 
 class ResourceMetaClass(type):
     """
@@ -24,10 +29,32 @@ class ResourceMetaClass(type):
         base_urls
     :param dict registered_names_map:  A dictionary mapping the names
         of the classes to the actual instances of this meta class
+    :param int registry_version: Incremented every time a class
+        is registered.  Allows caches of registry lookups (e.g.
+        ``Relationship.relation``) to detect overwritten entries.
+
+    The ``resource_name``, ``base_url_sans_pks`` and ``base_url``
+    of every class are computed once when the class is created
+    and stored as plain class attributes.  Whatever a class declares
+    for those attributes (a value or a ``classproperty``) is kept
+    as the declaration that the frozen value is computed from.
+    Assigning to ``namespace``, ``pks``, ``append_slash`` or any
+    of the frozen attributes recomputes the values for the class
+    and all of its subclasses.
+
+    Additionally, ``_compact_instances`` is set on every class.  It
+    indicates whether instances of the class have no ``__dict__``
+    because every class in its mro declares ``__slots__``.
+
+    The endpoint dictionary of a class is cached on the class
+    the first time it is generated.  Modifying any attribute of
+    a class drops the cached endpoint dictionary for the
+    class and all of its subclasses.
     """
     registered_resource_classes = {}
     registered_names_map = {}
     registered_resource_names_map = {}
+    registry_version = 0
 
     def __new__(mcs, name, bases, attrs):
         """
@@ -39,7 +66,13 @@ class ResourceMetaClass(type):
         :rtype: type
         """
         _logger.debug('ResourceMetaClass "%s" class being created', name)
+        for attr_name in _FROZEN_ATTRIBUTES:
+            if attr_name in attrs:
+                attrs[_declared_name(attr_name)] = attrs[attr_name]
         klass = super(ResourceMetaClass, mcs).__new__(mcs, name, bases, attrs)
+        klass._freeze_url_metadata()
+        compact = not any('__dict__' in vars(base) for base in klass.__mro__)
+        super(ResourceMetaClass, klass).__setattr__('_compact_instances', compact)
         if attrs.get('__abstract__', False) is True:  # Don't register endpoints of abstract classes
             _logger.debug('ResourceMetaClass "%s" is abstract.  Not being registered', name)
             return klass
@@ -64,5 +97,105 @@ class ResourceMetaClass(type):
             warnings.warn('A class with the name {0} has already been registered.'
                           'Overwriting that class'.format(klass.__name__), UserWarning)
         mcs.registered_names_map[klass.__name__] = klass
+        mcs.registry_version += 1
         resource_name = getattr(klass, 'resource_name', klass.__name__)
         mcs.registered_resource_names_map[resource_name] = klass
+
+    def __setattr__(cls, name, value):
+        """
+        Sets the attribute on the class.  If the attribute
+        is part of the url metadata then the frozen url
+        metadata is recomputed for the class and its subclasses.
+        """
+        super(ResourceMetaClass, cls).__setattr__(name, value)
+        if name in _FROZEN_ATTRIBUTES:
+            super(ResourceMetaClass, cls).__setattr__(_declared_name(name), value)
+        cls._class_modified(name in _URL_ATTRIBUTES)
+
+    def __delattr__(cls, name):
+        """
+        Deletes the attribute from the class.  Deleting
+        a frozen attribute deletes its declaration so
+        that it is inherited again.
+        """
+        if name in _FROZEN_ATTRIBUTES and _declared_name(name) in cls.__dict__:
+            super(ResourceMetaClass, cls).__delattr__(_declared_name(name))
+        super(ResourceMetaClass, cls).__delattr__(name)
+        cls._class_modified(name in _URL_ATTRIBUTES)
+
+    def _freeze_url_metadata(cls):
+        """
+        Computes the ``resource_name``, ``base_url_sans_pks``
+        and ``base_url`` from their declarations and stores
+        them as plain class attributes.  They are computed in
+        that order since each may depend on the previous one.
+        """
+        for name in _FROZEN_ATTRIBUTES:
+            declaration = _find_declaration(cls, _declared_name(name))
+            if declaration is _MISSING:
+                continue
+            if hasattr(declaration, '__get__'):
+                declaration = declaration.__get__(None, cls)
+            super(ResourceMetaClass, cls).__setattr__(name, declaration)
+
+    def _class_modified(cls, url_changed):
+        """
+        Drops the cached endpoint dictionary for this class
+        and every one of its subclasses.  If the url metadata
+        changed, it additionally recomputes the frozen url
+        metadata and updates the registries for registered classes.
+
+        :param bool url_changed: Whether an attribute that the
+            url metadata depends on was modified.
+        """
+        if _ENDPOINT_DICTIONARY_CACHE in cls.__dict__:
+            super(ResourceMetaClass, cls).__delattr__(_ENDPOINT_DICTIONARY_CACHE)
+        if url_changed:
+            old_name = cls.__dict__.get('resource_name')
+            cls._freeze_url_metadata()
+            registry = type(cls)
+            if cls in registry.registered_resource_classes:
+                registry.registered_resource_classes[cls] = cls.base_url
+                resource_name = getattr(cls, 'resource_name', cls.__name__)
+                if registry.registered_resource_names_map.get(old_name) is cls:
+                    registry.registered_resource_names_map.pop(old_name)
+                registry.registered_resource_names_map[resource_name] = cls
+        for subclass in cls.__subclasses__():
+            subclass._class_modified(url_changed)
+
+    def _cache_endpoint_dictionary(cls, endpoint_dictionary):
+        """
+        Caches the endpoint dictionary on the class without
+        treating it as a modification of the class.
+
+        :param ReadOnlyDict endpoint_dictionary: The generated
+            endpoint dictionary for this class.
+        """
+        super(ResourceMetaClass, cls).__setattr__(_ENDPOINT_DICTIONARY_CACHE, endpoint_dictionary)
+
+
+def _declared_name(name):
+    """
+    :param unicode name: The name of the frozen attribute
+    :return: The name of the attribute that holds the
+        declaration for the frozen attribute.
+    :rtype: str
+    """
+    return str('_declared_{0}'.format(name))
+
+
+def _find_declaration(klass, name):
+    """
+    Finds the raw attribute in the class's mro without
+    invoking any descriptors.
+
+    :param type klass: The class whose mro will be searched.
+    :param unicode name: The name of the attribute
+    :return: The raw attribute or ``_MISSING`` if it
+        could not be found.
+    :rtype: object
+    """
+    for base in klass.__mro__:
+        if name in base.__dict__:
+            return base.__dict__[name]
+    return _MISSING
@@ -9,8 +9,13 @@ from __future__ import unicode_literals
 
 import warnings
 
+from ripozo.resources.constants import input_categories
 from ripozo.resources.fields.validations import validate_type, validate_size,\
     translate_iterable_to_single, validate_required, basic_validation
+from ripozo.resources.request import RequestContainer, _mutable
+
+_LOCATIONS = (input_categories.URL_PARAMS, input_categories.QUERY_ARGS,
+              input_categories.BODY_ARGS,)
 
 
 class BaseField(object):
@@ -139,23 +144,174 @@ def translate_fields(request, fields=None, skip_required=False, validate=False):
         usually required.
     :param bool validate: A flag that indicates whether the field validations
         should be run.  If not, it will just translate the fields.
-    :return: Returns the translated url_params, query_args and body_args
+    :return: Returns copies of the url_params, query_args and body_args
+        as they were before the translation.
     :rtype: tuple
     :raises: RestException
     :raises: ValidationException
     :raises: TranslationException
     """
-    updated_url_params = request.url_params
-    updated_query_args = request.query_args
-    updated_body_args = request.body_args
-    fields = fields or []
-    for field in fields:
-        field_name_in_request = field.name in request
-        if not field_name_in_request and skip_required:
-            continue
-        field_value = field.translate(request.get(field.name, None, location=field.arg_type),
-                                      skip_required=skip_required, validate=validate)
-        if field_name_in_request:
-            request.set(field.name, field_value, location=field.arg_type)
-
+    # read only requests return views that the plan would modify
+    updated_url_params = _mutable(request.url_params)
+    updated_query_args = _mutable(request.query_args)
+    updated_body_args = _mutable(request.body_args)
+    TranslationPlan(fields, skip_required=skip_required, validate=validate).apply(request)
     return updated_url_params, updated_query_args, updated_body_args
+
+
+class TranslationPlan(object):
+    """
+    A list of fields compiled for translating requests.
+    The location of every field is resolved once, so that
+    applying the plan to a ``RequestContainer`` reads and
+    writes the request's dictionaries directly.  Applying
+    a plan is equivalent to ``translate_fields`` with the
+    same arguments (the fields are translated in the same
+    order and raise the same exceptions).
+
+    A plan restricted to some ``locations`` (e.g. the url_params
+    and query_args) only looks for the fields without an
+    ``arg_type`` in those locations.  If the body args are not
+    one of them, applying the plan never decodes a raw body.
+
+    :param tuple fields: The fields to translate.
+    :param bool skip_required: Whether the required
+        fields are optional.
+    :param bool validate: Whether the fields are validated.
+    :param tuple locations: The input categories that the
+        fields are read from or None for all of them.
+    """
+    __slots__ = ('fields', 'skip_required', 'validate', 'locations',
+                 '_steps', '_search', '_reads_body',)
+
+    def __init__(self, fields=None, skip_required=False, validate=False, locations=None):
+        """
+        :param list fields: The fields to translate.
+        :param bool skip_required: Whether the required
+            fields are optional.
+        :param bool validate: Whether the fields are validated.
+        :param tuple locations: The input categories (e.g.
+            ``input_categories.URL_PARAMS``) that the fields are
+            read from.  Defaults to all of them.
+        """
+        self.fields = tuple(fields or ())
+        self.skip_required = skip_required
+        self.validate = validate
+        self.locations = tuple(locations) if locations is not None else None
+        if self.locations is None:
+            self._search = (0, 1, 2)
+        else:
+            self._search = tuple(index for index, location in enumerate(_LOCATIONS)
+                                 if location in self.locations)
+        steps = []
+        for field in self.fields:
+            location = field.arg_type
+            if not location:
+                index = None
+            elif location in _LOCATIONS:
+                index = _LOCATIONS.index(location)
+            else:
+                index = -1
+            steps.append((field, field.name, index))
+        self._steps = tuple(steps)
+        self._reads_body = 2 in self._search or any(step[2] == 2 for step in steps)
+
+    def apply(self, request):
+        """
+        Translates (and validates) the fields in the
+        request in place.
+
+        :param RequestContainer request: The request to translate.
+        :raises: RestException
+        :raises: ValidationException
+        :raises: TranslationException
+        """
+        if type(request) is not RequestContainer:
+            return self._apply_generic(request)
+        sources = (request._url_params, request._query_args, request._body_args)
+        if sources[2] is None:
+            if self._reads_body:
+                # the generic path only decodes a raw body if it has to
+                return self._apply_generic(request)
+            sources = (sources[0], sources[1], {})
+        skip_required = self.skip_required
+        validate = self.validate
+        search = tuple(sources[index] for index in self._search)
+        for field, name, index in self._steps:
+            source = _find_source(search, name)
+            in_request = source is not None
+            if not in_request and skip_required:
+                continue
+            if index is None:
+                value = source[name] if in_request else None
+            elif index < 0:
+                value = None
+            else:
+                value = sources[index].get(name)
+            value = field.translate(value, skip_required=skip_required, validate=validate)
+            if not in_request:
+                continue
+            if index is None:
+                source[name] = value
+            elif index < 0:
+                request.set(name, value, location=field.arg_type)
+            else:
+                sources[index][name] = value
+
+    def _apply_generic(self, request):
+        """
+        Translates the fields through the public interface of
+        the request.  Used for objects that are not exactly a
+        ``RequestContainer`` (e.g. subclasses) and for requests
+        whose raw body has not been decoded.
+
+        :param RequestContainer request: The request to translate.
+        """
+        locations = self.locations
+        for field, name, index in self._steps:
+            if locations is None:
+                field_name_in_request = name in request
+            else:
+                field_name_in_request = any(name in getattr(request, location)
+                                            for location in locations)
+            if not field_name_in_request and self.skip_required:
+                continue
+            location = field.arg_type
+            if locations is not None and not location and field_name_in_request:
+                location = _find_location(request, locations, name)
+            field_value = None
+            if field_name_in_request or locations is None or location:
+                field_value = request.get(name, None, location=location)
+            field_value = field.translate(field_value, skip_required=self.skip_required,
+                                          validate=self.validate)
+            if field_name_in_request:
+                request.set(name, field_value, location=location)
+
+
+def _find_location(request, locations, name):
+    """
+    :param RequestContainer request: The request.
+    :param tuple locations: The input categories to search.
+    :param unicode name: The name of the parameter.
+    :return: The first location in the url_params, query_args
+        and body_args order that contains the name.
+    :rtype: unicode
+    """
+    for location in _LOCATIONS:
+        if location in locations and name in getattr(request, location):
+            return location
+    return None
+
+
+def _find_source(sources, name):
+    """
+    :param tuple sources: The url_params, query_args and
+        body_args dictionaries in that order.
+    :param unicode name: The name of the parameter.
+    :return: The first dictionary that contains the name or None.
+    :rtype: dict
+    """
+    for source in sources:
+        if name in source:
+            return source
+    return None
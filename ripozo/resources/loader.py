@@ -0,0 +1,132 @@
+"""
+Request scoped batching of the lookups made
+while constructing related resources.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+
+import logging
+import threading
+
+import six
+
+_logger = logging.getLogger(__name__)
+
+_state = threading.local()
+
+
+def get_current_loader():
+    """
+    :return: The loader of the request that is currently
+        being handled in this thread or None.
+    :rtype: BatchLoader
+    """
+    return getattr(_state, 'loader', None)
+
+
+class BatchLoader(object):
+    """
+    Collects the lookup keys of the related objects that need
+    to be retrieved while constructing the resources of a request
+    and retrieves them with a single ``retrieve_many`` call per
+    manager.  Every object is retrieved at most once per loader
+    (an identity map).
+
+    A loader is available on every ``RequestContainer`` as
+    ``request.loader`` and is made current (``get_current_loader``)
+    while an apimethod runs and while the resources it
+    returned construct their relationships.  It is used by
+    relationships created with ``fetch=True``.  The apimethod
+    only creates the loader of a request if its class, or a class
+    it is related to, has such a relationship.
+
+    .. code-block:: python
+
+        with request.loader:
+            loader = get_current_loader()
+            loader.queue(manager, dict(id=1))
+            loader.queue(manager, dict(id=2))
+            loader.load(manager, dict(id=1))  # retrieves both
+
+    :param int batches: The number of ``retrieve_many``
+        calls made by this loader.
+    """
+
+    def __init__(self):
+        self.batches = 0
+        self._loaded = {}
+        self._pending = {}
+        self._previous = []
+
+    def __enter__(self):
+        self._previous.append(get_current_loader())
+        _state.loader = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _state.loader = self._previous.pop()
+
+    @staticmethod
+    def _key(lookup_keys):
+        """
+        :param dict lookup_keys: The lookup keys of an object
+        :return: A hashable key that does not depend
+            on the order of the items.
+        :rtype: tuple
+        """
+        return tuple(sorted(six.iteritems(lookup_keys)))
+
+    def queue(self, manager, lookup_keys):
+        """
+        Adds the lookup keys to the next batch of the
+        manager unless the object was already loaded.
+
+        :param BaseManager manager: The manager of the object.
+        :param dict lookup_keys: The lookup keys of the object.
+        """
+        key = self._key(lookup_keys)
+        if key in self._loaded.get(manager, ()):
+            return
+        self._pending.setdefault(manager, OrderedDict())[key] = lookup_keys
+
+    def load(self, manager, lookup_keys):
+        """
+        Gets the properties of the object.  If the object
+        has not been loaded yet, it is retrieved together with
+        every other object queued for the manager.
+
+        :param BaseManager manager: The manager of the object.
+        :param dict lookup_keys: The lookup keys of the object.
+        :return: The properties of the object or None
+            if it does not exist.
+        :rtype: dict
+        """
+        key = self._key(lookup_keys)
+        loaded = self._loaded.get(manager)
+        if loaded is None or key not in loaded:
+            self.queue(manager, lookup_keys)
+            self._dispatch(manager)
+            loaded = self._loaded[manager]
+        return loaded[key]
+
+    def _dispatch(self, manager):
+        """
+        Retrieves every queued object of the manager.
+
+        :param BaseManager manager: The manager.
+        """
+        pending = self._pending.pop(manager, None)
+        if not pending:
+            return
+        _logger.debug('Retrieving %s objects with %s', len(pending), manager)
+        self.batches += 1
+        results = manager.retrieve_many(list(pending.values()))
+        loaded = self._loaded.setdefault(manager, {})
+        for key, props in zip(pending, results):
+            loaded[key] = props
+        for key in pending:
+            loaded.setdefault(key, None)
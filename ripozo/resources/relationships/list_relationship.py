@@ -7,14 +7,21 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from ripozo.resources.loader import get_current_loader
 from ripozo.resources.relationships.relationship import Relationship
-from ripozo.utilities import get_or_pop
+from ripozo.utilities import get_or_pop, OneShotIterable
+
+import itertools
 
 
 class ListRelationship(Relationship):
     """
     Special case for a list of relationships.
+
+    :param int batch_size: The number of items of a lazy iterable
+        that are queued in the request loader at once.
     """
+    batch_size = 100
 
     def construct_resource(self, properties):
         """
@@ -22,19 +29,101 @@ class ListRelationship(Relationship):
         yields Resource instances.  These related ResourceBase subclass
         will be asked to construct an instance with the keyword argument
         properties equal to each item in the list of properties provided to
-        this function.
+        this function.  The related class is resolved once and
+        all of the resources are built in a single pass by
+        ``ResourceBase._construct_many``.
+
+        If there is a current request loader, the lookups of the
+        embedded resources' relationships created with ``fetch=True``
+        are queued before any of them is constructed so that they
+        are retrieved in a single batch.  If this relationship
+        fetches, every item is retrieved in a single batch as well.
+
+        If the items are a lazy iterable (e.g. the rows of a streaming
+        manager) instead of a list or tuple, a ``OneShotIterable`` is
+        returned that constructs the resources as it is consumed.  The
+        lookups are then batched ``batch_size`` items at a time.  It can
+        only be iterated over once (a second iteration raises a
+        ``RuntimeError``), so processors must not iterate over it
+        before the adapter does.
 
         :param dict properties: A dictionary of the properties
             on the parent model.  The list_name provided in the construction
             of an instance of this class is used to find the list that will be
             iterated over to generate the resources.
-        :return: A generator that yields the relationships.
-        :rtype: types.GeneratorType
+        :return: A list of the resources, or an iterable that yields
+            them if the items are a lazy iterable.
+        :rtype: list|ripozo.utilities.OneShotIterable
         """
         objects = get_or_pop(properties, self.name, [], pop=self.remove_properties)
-        resources = []
+        if not objects:
+            return []
+        loader = get_current_loader()
+        if not isinstance(objects, (list, tuple)):
+            return OneShotIterable(self._iter_resources(objects, loader))
+        return self._construct_list(objects, loader)
+
+    def _iter_resources(self, objects, loader):
+        """
+        Lazily constructs the resources for an iterable of
+        properties ``batch_size`` items at a time.
+
+        :param objects: An iterable of the properties.
+        :param BatchLoader loader: The request loader or None.
+        :return: A generator of the resources.
+        :rtype: types.GeneratorType
+        """
+        iterator = iter(objects)
+        while True:
+            batch = list(itertools.islice(iterator, self.batch_size))
+            if not batch:
+                return
+            if loader is None:
+                resources = self._construct_list(batch, None)
+            else:
+                with loader:
+                    resources = self._construct_list(batch, loader)
+            for resource in resources:
+                yield resource
+
+    def _construct_list(self, objects, loader):
+        """
+        Constructs the resources for a list of properties.
+
+        :param list objects: The properties of the resources.
+        :param BatchLoader loader: The request loader or None.
+        :return: The resources.
+        :rtype: list
+        """
+        relation = self.relation
+        if self.fetch:
+            if loader is not None:
+                self.prime({self.name: objects}, loader)
+            objects = [self._fetch(relation, obj) for obj in objects]
+        if self.embedded and loader is not None:
+            fetching = [rel for rel in relation.relationships or () if rel.fetch]
+            for relationship in fetching:
+                for obj in objects:
+                    relationship.prime(obj, loader)
+        return relation._construct_many(objects, query_args=self.query_args,
+                                        include_relationships=self.embedded)
+
+    def prime(self, properties, loader):
+        """
+        Queues the lookups of every related object in the
+        loader without modifying the properties.  Does nothing
+        if this relationship does not fetch.
+
+        :param dict properties: The properties of the parent.
+        :param BatchLoader loader: The request loader.
+        """
+        if not self.fetch:
+            return
+        objects = properties.get(self.name)
+        if not isinstance(objects, (list, tuple)):
+            return
+        relation = self.relation
         for obj in objects:
-            res = self.relation(properties=obj, query_args=self.query_args,
-                                include_relationships=self.embedded)
-            resources.append(res)
-        return resources
+            lookup_keys = self._lookup_keys(relation, obj)
+            if lookup_keys is not None:
+                loader.queue(relation.manager, lookup_keys)
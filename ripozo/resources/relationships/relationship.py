@@ -7,8 +7,9 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-from ripozo.exceptions import RestException
+from ripozo.exceptions import NotFoundException, RestException
 from ripozo.resources.constructor import ResourceMetaClass
+from ripozo.resources.loader import get_current_loader
 from ripozo.utilities import get_or_pop
 
 import logging
@@ -26,10 +27,11 @@ class Relationship(object):
     to return the whole resource, a link, etc...
     """
     _resource_meta_class = ResourceMetaClass
+    _relation_cache = None
 
     def __init__(self, name, property_map=None, relation=None, embedded=False,
                  required=False, no_pks=False, query_args=None, templated=False,
-                 remove_properties=True):
+                 remove_properties=True, fetch=False):
         """
         :param unicode name:
         :param dict property_map: A map of the parent's property name
@@ -59,6 +61,11 @@ class Relationship(object):
         :param bool remove_properties: If True, then the properties in the
             child relationship will be removed. Otherwise, the properties
             will simply be copied to the relationship
+        :param bool fetch: If True, the properties of the related
+            resource are retrieved from the related class's manager
+            using its pks.  The lookups are batched per request
+            by the ``request.loader`` and need the manager to
+            implement ``retrieve_many`` efficiently.
         """
         self.query_args = query_args or tuple()
         self.property_map = property_map or {}
@@ -69,6 +76,7 @@ class Relationship(object):
         self.no_pks = no_pks
         self.templated = templated
         self.remove_properties = remove_properties
+        self.fetch = fetch
 
     @property
     def relation(self):
@@ -81,12 +89,24 @@ class Relationship(object):
         dictionary (By default the self._resource_meta_class is
         the ResourceMetaClass).
 
+        The class is cached after the first successful lookup.
+        The cache is discarded whenever a class is registered
+        (which may overwrite the entry) or the registry is
+        replaced.
+
         :return: The ResourceBase subclass that describes the
             related resource
         :rtype: type
         :raises: KeyError
         """
-        return self._resource_meta_class.registered_names_map[self._relation]
+        meta = self._resource_meta_class
+        names_map = meta.registered_names_map
+        cache = self._relation_cache
+        if cache is not None and cache[0] is names_map and cache[1] == meta.registry_version:
+            return cache[2]
+        relation = names_map[self._relation]
+        self._relation_cache = (names_map, meta.registry_version, relation)
+        return relation
 
     def construct_resource(self, properties):
         """
@@ -99,23 +119,88 @@ class Relationship(object):
             to this related resource
         :rtype: rest.viewsets.resource_base.ResourceBase
         """
-        _logger.debug('Constructing resource %s of type %s', self.name, self.relation)
+        relation = self.relation
+        _logger.debug('Constructing resource %s of type %s', self.name, relation)
         related_properties = self._map_pks(properties)
+        if self.fetch and related_properties and not self.templated:
+            related_properties = self._fetch(relation, related_properties)
         resource = None
         if related_properties or self.templated:
             include_relationships = self.embedded and not self.templated
-            resource = self.relation(properties=related_properties,
-                                     query_args=self.query_args,
-                                     include_relationships=include_relationships,
-                                     no_pks=self.no_pks)
+            resource = relation(properties=related_properties,
+                                query_args=self.query_args,
+                                include_relationships=include_relationships,
+                                no_pks=self.no_pks)
         if self.required and (not resource or not resource.has_all_pks):
             raise RestException('The relationship {0} could not construct a valid {1}'
                                 ' with all of its pks.  Properties'
-                                ' {2}'.format(self.name, self.relation, related_properties))
+                                ' {2}'.format(self.name, relation, related_properties))
         elif not resource or self._should_return_none(resource):
             return None
         return resource
 
+    def prime(self, properties, loader):
+        """
+        Queues the lookup of the related object in the loader
+        without modifying the properties.  This lets the loader
+        retrieve the related objects of many parents at once.
+        Does nothing if this relationship does not fetch.
+
+        :param dict properties: The properties of the parent.
+        :param BatchLoader loader: The request loader.
+        """
+        if not self.fetch or self.templated:
+            return
+        relation = self.relation
+        lookup_keys = self._lookup_keys(relation, self._map_pks(properties, pop=False))
+        if lookup_keys is not None:
+            loader.queue(relation.manager, lookup_keys)
+
+    @staticmethod
+    def _lookup_keys(relation, related_properties):
+        """
+        :param type relation: The related ResourceBase subclass.
+        :param dict related_properties: The mapped properties.
+        :return: The pks of the related object or None if
+            any of them is missing.
+        :rtype: dict
+        """
+        lookup_keys = {}
+        for pk in relation.pks:
+            if related_properties.get(pk) is None:
+                return None
+            lookup_keys[pk] = related_properties[pk]
+        return lookup_keys
+
+    def _fetch(self, relation, related_properties):
+        """
+        Retrieves the properties of the related object through
+        the current loader, or directly from the manager if
+        there is no current loader.  The mapped properties take
+        precedence over the retrieved ones.
+
+        :param type relation: The related ResourceBase subclass.
+        :param dict related_properties: The mapped properties.
+        :return: The properties of the related resource.
+        :rtype: dict
+        """
+        lookup_keys = self._lookup_keys(relation, related_properties)
+        if lookup_keys is None:
+            return related_properties
+        loader = get_current_loader()
+        if loader is not None:
+            fetched = loader.load(relation.manager, lookup_keys)
+        else:
+            try:
+                fetched = relation.manager.retrieve(lookup_keys)
+            except NotFoundException:
+                fetched = None
+        if fetched is None:
+            return related_properties
+        fetched = dict(fetched)
+        fetched.update(related_properties)
+        return fetched
+
     def _should_return_none(self, resource):
         """
         Helper method  for construct_resource.
@@ -145,7 +230,7 @@ class Relationship(object):
         properties.pop(self.name, None)
         return properties
 
-    def _map_pks(self, parent_properties):
+    def _map_pks(self, parent_properties, pop=None):
         """
         Takes a dictionary of the values of the parent
         resources properties.  It then maps those properties
@@ -159,18 +244,22 @@ class Relationship(object):
             resource's properties.  The key is the name of the
             property and the value is the parent resources value
             for that property
+        :param bool pop: Whether to remove the properties from the
+            parent.  Defaults to ``self.remove_properties``
         :return: A dictionary of the related resources properties.
             The key is the name of the related resource's property
             and the value is the value of that resource's property.
         :rtype: :py:class:`dict`
         :raises: KeyError
         """
+        if pop is None:
+            pop = self.remove_properties
         properties = {}
         for parent_prop, prop in six.iteritems(self.property_map):
-            val = get_or_pop(parent_properties, parent_prop, pop=self.remove_properties)
+            val = get_or_pop(parent_properties, parent_prop, pop=pop)
             if val is not None:
                 properties[prop] = val
-        name_values = get_or_pop(parent_properties, self.name, pop=self.remove_properties)
+        name_values = get_or_pop(parent_properties, self.name, pop=pop)
         if name_values:
             properties.update(name_values)
         return properties
@@ -6,7 +6,63 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from ripozo.exceptions import BodyParseException
 from ripozo.resources.constants import input_categories
+from ripozo.resources.loader import BatchLoader
+from ripozo.utilities import ReadOnlyDict
+
+import json
+import six
+
+
+def _mutable(value):
+    """
+    :param dict value: A dictionary or a read only view
+        of one.
+    :return: The dictionary or a mutable copy of the view.
+    :rtype: dict
+    """
+    if isinstance(value, ReadOnlyDict):
+        return value.copy()
+    return value
+
+
+def decode_json_body(raw_body, charset=None):
+    """
+    Decodes a json request body.
+
+    :param bytes raw_body: The raw body of the request.
+    :param unicode charset: The charset of the Content-Type
+        header or None.
+    :return: The decoded body
+    :rtype: dict
+    :raises: BodyParseException
+    """
+    try:
+        if isinstance(raw_body, six.binary_type):
+            raw_body = raw_body.decode(charset or 'utf-8')
+        body = json.loads(raw_body)
+    except (ValueError, LookupError) as exc:
+        raise BodyParseException('The request body is not valid json: {0}'.format(exc))
+    if not isinstance(body, dict):
+        raise BodyParseException('The request body must be a json object')
+    return body
+
+
+def _parse_content_type(content_type):
+    """
+    :param unicode content_type: A Content-Type header.
+    :return: The lower case mimetype and the charset
+        parameter (or None).
+    :rtype: tuple
+    """
+    parts = content_type.split(';')
+    charset = None
+    for param in parts[1:]:
+        key, _, value = param.partition('=')
+        if key.strip().lower() == 'charset':
+            charset = value.strip().strip('"') or None
+    return parts[0].strip().lower(), charset
 
 
 class RequestContainer(object):
@@ -16,9 +72,45 @@ class RequestContainer(object):
     place and to make a generically accessible object.
     It should be assumed that no parameter is required
     and no property is guaranteed.
+
+    By default the ``url_params``, ``query_args``, ``body_args``
+    and ``headers`` properties return a copy of the dictionary
+    every time they are accessed.  Requests created with
+    ``read_only=True`` (or classes that set ``read_only = True``)
+    return read only views (``ripozo.utilities.ReadOnlyDict``)
+    of the dictionaries instead.  Call ``copy()`` on a view
+    to get a mutable copy.  The views do not copy, so the
+    managers receiving them must not modify them.  The rest
+    mixins pass mutable copies of the body args to the
+    ``create``, ``update`` and bulk manager methods.
+
+    Dispatchers may pass the ``raw_body`` of the request instead
+    of the ``body_args``.  It is decoded with the decoder for its
+    Content-Type in ``body_decoders`` the first time the body is
+    needed, so endpoints that never read the body (or reject the
+    request before reading it) do not decode it.  Mimetypes with
+    a ``+json`` suffix (e.g. ``application/vnd.api+json``) use the
+    ``application/json`` decoder unless they have their own.
+    A decoder is called with the raw body and the charset of the
+    Content-Type (or None) and returns a dictionary.
+
+    .. code-block:: python
+
+        class MyRequest(RequestContainer):
+            body_decoders = dict(RequestContainer.body_decoders,
+                                 **{'application/x-yaml': decode_yaml})
+
+    :param bool read_only: Whether the properties return
+        read only views instead of copies.
+    :param dict body_decoders: The decoders keyed by
+        lower case mimetype.
     """
+    read_only = False
+    body_decoders = {'application/json': decode_json_body}
 
-    def __init__(self, url_params=None, query_args=None, body_args=None, headers=None, method=None):
+    def __init__(self, url_params=None, query_args=None, body_args=None,
+                 headers=None, method=None, read_only=None, raw_body=None,
+                 content_type=None):
         """
         Create a new request container.  Typically this is constructed
         in the dispatcher.
@@ -32,60 +124,157 @@ class RequestContainer(object):
         :param dict headers: A dictionary of the headers and their values
         :param unicode method: The method that was used to make
             the request.
+        :param bool read_only: Whether the properties return read only
+            views of the dictionaries instead of copies.  Defaults to
+            the ``read_only`` class attribute.
+        :param bytes raw_body: The undecoded body of the request.  It
+            is only used if the body_args are not given.
+        :param unicode content_type: The Content-Type of the raw body.
+            Defaults to the Content-Type header.
         """
-        self._url_params = url_params or {}
-        self._query_args = query_args or {}
-        self._body_args = body_args or {}
-        self._headers = headers or {}
+        self._url_params = _mutable(url_params or {})
+        self._query_args = _mutable(query_args or {})
+        if content_type is not None:
+            headers = dict(headers or {})
+            headers['Content-Type'] = content_type
+        self._headers = _mutable(headers or {})
+        self._raw_body = raw_body
+        self._body_transforms = []
+        if body_args or not raw_body:
+            self._body_args = _mutable(body_args or {})
+        else:
+            # decoded by _decode_body when it is first needed
+            self._body_args = None
         self.method = method
+        self._loader = None
+        if read_only is not None:
+            self.read_only = read_only
+
+    def _view(self, mapping):
+        """
+        :param dict mapping: One of the dictionaries of the request.
+        :return: A read only view of the dictionary if the request
+            is read only, otherwise a copy of it.
+        :rtype: dict
+        """
+        if self.read_only:
+            return ReadOnlyDict(mapping)
+        return mapping.copy()
 
     @property
     def url_params(self):
         """
-        :return: A copy of the url_params dictionary
+        :return: A copy of the url_params dictionary or a read only
+            view of it if the request is ``read_only``
         :rtype: dict
         """
-        return self._url_params.copy()
+        return self._view(self._url_params)
 
     @url_params.setter
     def url_params(self, value):
-        self._url_params = value
+        self._url_params = _mutable(value)
 
     @property
     def query_args(self):
         """
-        :return: A copy of the query_args
+        :return: A copy of the query_args or a read only
+            view of it if the request is ``read_only``
         :rtype: dict
         """
-        return self._query_args.copy()
+        return self._view(self._query_args)
 
     @query_args.setter
     def query_args(self, value):
-        self._query_args = value
+        self._query_args = _mutable(value)
 
     @property
     def body_args(self):
         """
-        :return: a copy of the body_args
+        :return: a copy of the body_args or a read only
+            view of it if the request is ``read_only``
         :rtype: dict
         """
-        return self._body_args.copy()
+        return self._view(self._decode_body())
 
     @body_args.setter
     def body_args(self, value):
-        self._body_args = value
+        self._body_args = _mutable(value)
+        self._body_transforms = []
+
+    @property
+    def raw_body(self):
+        """
+        :return: The undecoded body that the request
+            was created with or None.
+        :rtype: bytes
+        """
+        return self._raw_body
+
+    def _decode_body(self):
+        """
+        Decodes the raw body and applies the pending
+        transforms if that has not been done yet.
+
+        :return: The body args dictionary.
+        :rtype: dict
+        :raises: BodyParseException
+        """
+        if self._body_args is not None:
+            return self._body_args
+        mimetype, charset = _parse_content_type(self.content_type or '')
+        decoder = self.body_decoders.get(mimetype)
+        if decoder is None and mimetype.endswith('+json'):
+            decoder = self.body_decoders.get('application/json')
+        if decoder is None:
+            raise BodyParseException('Unsupported Content-Type "{0}"'.format(self.content_type),
+                                     status_code=415)
+        body = decoder(self._raw_body, charset)
+        for transform in self._body_transforms:
+            body = transform(body)
+        self._body_args = _mutable(body)
+        self._body_transforms = []
+        return self._body_args
+
+    def transform_body(self, transform):
+        """
+        Replaces the body args with the result of calling the
+        transform with them.  If the raw body has not been decoded
+        yet, the transform is applied when it is decoded so that
+        adapters can reformat the body without decoding it.
+
+        :param function transform: A function that takes the
+            body args dictionary and returns the new one.
+        """
+        if self._body_args is None:
+            self._body_transforms.append(transform)
+        else:
+            self._body_args = _mutable(transform(self._body_args))
 
     @property
     def headers(self):
         """
-        :return: A copy of the headers dict
+        :return: A copy of the headers dict or a read only
+            view of it if the request is ``read_only``
         :rtype: dict
         """
-        return self._headers.copy()
+        return self._view(self._headers)
 
     @headers.setter
     def headers(self, value):
-        self._headers = value
+        self._headers = _mutable(value)
+
+    @property
+    def loader(self):
+        """
+        The request scoped loader that batches the lookups
+        of relationships created with ``fetch=True``.  It is
+        created the first time it is accessed.
+
+        :rtype: BatchLoader
+        """
+        if self._loader is None:
+            self._loader = BatchLoader()
+        return self._loader
 
     @property
     def content_type(self):
@@ -115,11 +304,11 @@ class RequestContainer(object):
         :raises: KeyError
         """
         if not location and name in self._url_params or location == input_categories.URL_PARAMS:
-            return self.url_params.get(name)
+            return self._url_params.get(name)
         elif not location and name in self._query_args or location == input_categories.QUERY_ARGS:
             return self._query_args.get(name)
-        elif not location and name in self._body_args or location == input_categories.BODY_ARGS:
-            return self._body_args.get(name, default)
+        elif not location and name in self._decode_body() or location == input_categories.BODY_ARGS:
+            return self._decode_body().get(name, default)
         return default
 
     def set(self, name, value, location=None):
@@ -142,8 +331,8 @@ class RequestContainer(object):
         elif not location and name in self._query_args or location == input_categories.QUERY_ARGS:
             self._query_args[name] = value
             return
-        elif not location and name in self._body_args or location == input_categories.BODY_ARGS:
-            self._body_args[name] = value
+        elif not location and name in self._decode_body() or location == input_categories.BODY_ARGS:
+            self._decode_body()[name] = value
             return
         raise KeyError('Location was not specified and the parameter {0} '
                        'could not be found on the request object'.format(name))
@@ -151,13 +340,15 @@ class RequestContainer(object):
     def __contains__(self, item):
         """
         Checks if the item is available in any of
-        the url_params, body_args, or query_args
+        the url_params, query_args, or body_args.
+        The body is only decoded if the item is not
+        in the url_params or query_args.
 
         :param unicode item: The key to look for in the
             various parameter dictionaries.
         :return: Whether the object was actually found.
         :rtype: bool
         """
-        if item in self._url_params or item in self._body_args or item in self._query_args:
+        if item in self._url_params or item in self._query_args or item in self._decode_body():
             return True
         return False
@@ -9,9 +9,11 @@ import re
 
 from collections import namedtuple
 
+from ripozo.caching import LRUCache
 from ripozo.decorators import classproperty
-from ripozo.resources.constructor import ResourceMetaClass
-from ripozo.utilities import convert_to_underscore, join_url_parts
+from ripozo.resources.constructor import ResourceMetaClass, _ENDPOINT_DICTIONARY_CACHE
+from ripozo.resources.loader import get_current_loader
+from ripozo.utilities import convert_to_underscore, join_url_parts, ReadOnlyDict
 
 import inspect
 import logging
@@ -21,6 +23,7 @@ _logger = logging.getLogger(__name__)
 
 
 _URL_PART_FINDER = re.compile(r'<([^>]+)>')
+_EMPTY_META = ReadOnlyDict({})
 
 
 @six.add_metaclass(ResourceMetaClass)
@@ -78,8 +81,33 @@ class ResourceBase(object):
         creating a new resource on a list resource.
     :param bool append_slash: A flag that indicates whether the base urls
         should include a trailing slash or not.
+
+    The ``resource_name``, ``base_url_sans_pks`` and ``base_url`` are
+    computed once by the ``ResourceMetaClass`` when the class is created
+    and are stored as plain class attributes.  They are recomputed
+    whenever ``namespace``, ``pks``, ``append_slash`` or ``resource_name``
+    is assigned on the class.
+
+    ResourceBase and the rest mixins use ``__slots__``.  Subclasses
+    that do not declare ``__slots__`` get a normal instance ``__dict__``
+    and may add any attributes.  Subclasses can opt in to a compact
+    instance layout by declaring ``__slots__`` themselves (e.g.
+    ``__slots__ = ()``).  Instances of compact classes have no
+    ``__dict__`` and share immutable empty defaults for the
+    ``errors``, ``meta`` and ``query_args`` when they are not
+    provided.  This considerably reduces the memory and time
+    required for constructing large lists of resources.
+
+    .. code-block:: python
+
+        class MyResource(restmixins.CRUDL):
+            __slots__ = ()
+            manager = MyManager()
     """
     __abstract__ = True
+    __slots__ = ('_properties', 'status_code', 'errors', 'meta', 'query_args', '_url',
+                 'no_pks', 'route_extension', '_related_resources', '_linked_resources',
+                 '_loader', '__weakref__',)
     _relationships = None
     append_slash = False
     pks = tuple()
@@ -115,24 +143,224 @@ class ResourceBase(object):
         :param unicode route_extension: A part of the url to append to
             the url.  This is helpful in constructing the correct url
             for apimethods with a route defined.
+
+        The related_resources and linked_resources are constructed
+        the first time they (or the properties) are accessed.  Since
+        constructing the related resources removes the related
+        properties from the properties, reading the properties
+        constructs the related resources as well.  Resources with
+        a required relationship construct them immediately so that
+        a missing relationship raises an exception here.  The current
+        request loader (``ripozo.resources.loader.get_current_loader``)
+        is kept so that the relationships constructed later are
+        still batched with the rest of the request.
         """
-        self.properties = properties or {}
+        self._properties = properties or {}
         self.status_code = status_code
-        self.errors = errors or []
-        self.meta = meta or {}
-        self.query_args = query_args or {}
+        if self._compact_instances:
+            self.errors = errors or ()
+            self.meta = meta or _EMPTY_META
+            self.query_args = query_args or ()
+        else:
+            self.errors = errors or []
+            self.meta = meta or {}
+            self.query_args = query_args or {}
         self._url = None
         self.no_pks = no_pks
         self.route_extension = route_extension
 
         if include_relationships:
-            self.related_resources = self._generate_links(self.relationships, self.properties)
+            self._related_resources = None
+            self._linked_resources = None
+            self._loader = get_current_loader()
+            for relationship in self.relationships or ():
+                if relationship.required:
+                    self._construct_related_resources()
+                    break
+        else:
+            self._related_resources = []
+            self._linked_resources = []
+            self._loader = None
+
+    def _relationships_pending(self):
+        """
+        :return: Whether the related resources still need to
+            be constructed.  False before ``__init__`` has run
+            (e.g. a subclass that sets the properties before
+            calling ``super().__init__``).
+        :rtype: bool
+        """
+        return getattr(self, '_related_resources', ()) is None
+
+    @property
+    def properties(self):
+        """
+        :return: The properties of the resource.  The properties
+            used by the related resources have been removed.
+        :rtype: dict
+        """
+        if self._relationships_pending():
+            self._construct_related_resources()
+        return self._properties
+
+    @properties.setter
+    def properties(self, value):
+        if self._relationships_pending():
+            self._construct_related_resources()
+        self._properties = value
+
+    @property
+    def related_resources(self):
+        """
+        :return: A list of the related resources as
+            ``(resource, name, embedded)`` tuples.
+        :rtype: list
+        """
+        if self._relationships_pending():
+            self._construct_related_resources()
+        return self._related_resources
+
+    @related_resources.setter
+    def related_resources(self, value):
+        if self._relationships_pending():
+            self._construct_related_resources()
+        self._related_resources = value
 
+    @property
+    def linked_resources(self):
+        """
+        :return: A list of the linked resources as
+            ``(resource, name, embedded)`` tuples.
+        :rtype: list
+        """
+        if self._linked_resources is None:
             meta_links = self.meta.get('links', {}).copy()
-            self.linked_resources = self._generate_links(self.links, meta_links)
+            self._linked_resources = self._generate_links_with_loader(self.links, meta_links)
+        return self._linked_resources
+
+    @linked_resources.setter
+    def linked_resources(self, value):
+        self._linked_resources = value
+
+    @classmethod
+    def _construct_many(cls, properties_list, query_args=None,
+                        include_relationships=True):
+        """
+        Constructs an instance for every properties dictionary
+        in the properties_list.  This is equivalent to calling
+        ``cls(properties=props, query_args=query_args,
+        include_relationships=include_relationships)`` for each
+        item but the class level lookups (the relationships, the
+        instance layout and the constructor) are only performed
+        once.  Subclasses that override ``__init__`` or ``__new__``
+        are constructed by calling the class normally.
+
+        :param list properties_list: An iterable of the properties
+            dictionaries.
+        :param list|tuple query_args: The query args of every
+            constructed resource.
+        :param bool include_relationships: Whether the resources
+            should include their relationships and links.
+        :return: A list of the constructed resources if the
+            properties_list is a list or tuple.  Otherwise, a generator
+            that constructs each resource as the properties_list
+            is consumed.
+        :rtype: list|types.GeneratorType
+        """
+        resources = cls._iter_construct_many(properties_list, query_args=query_args,
+                                             include_relationships=include_relationships,
+                                             loader=get_current_loader())
+        if isinstance(properties_list, (list, tuple)):
+            return list(resources)
+        return resources
+
+    @classmethod
+    def _iter_construct_many(cls, properties_list, query_args=None,
+                             include_relationships=True, loader=None):
+        """
+        The generator behind ``_construct_many``.
+
+        :param list properties_list: An iterable of the properties
+            dictionaries.
+        :param list|tuple query_args: The query args of every
+            constructed resource.
+        :param bool include_relationships: Whether the resources
+            should include their relationships and links.
+        :param BatchLoader loader: The loader the resources keep
+            for constructing their relationships.
+        :return: A generator of the constructed resources.
+        :rtype: types.GeneratorType
+        """
+        if not _default_construction(cls):
+            for props in properties_list:
+                if loader is None or loader is get_current_loader():
+                    yield cls(properties=props, query_args=query_args,
+                              include_relationships=include_relationships)
+                    continue
+                with loader:
+                    resource = cls(properties=props, query_args=query_args,
+                                   include_relationships=include_relationships)
+                yield resource
+            return
+
+        if cls._compact_instances:
+            errors, meta, query_args = (), _EMPTY_META, query_args or ()
+        else:
+            errors, meta = None, None
+            query_args = query_args or None
+        construct_now = False
+        related_default = []
+        if include_relationships:
+            related_default = None
+            construct_now = any(rel.required for rel in cls.relationships or ())
         else:
-            self.related_resources = []
-            self.linked_resources = []
+            loader = None
+        new = object.__new__
+        for props in properties_list:
+            resource = new(cls)
+            resource._properties = props or {}
+            resource.status_code = 200
+            resource.errors = errors if errors is not None else []
+            resource.meta = meta if meta is not None else {}
+            resource.query_args = query_args if query_args is not None else {}
+            resource._url = None
+            resource.no_pks = False
+            resource.route_extension = ''
+            resource._loader = loader
+            if related_default is None:
+                resource._related_resources = None
+                resource._linked_resources = None
+                if construct_now:
+                    resource._construct_related_resources()
+            else:
+                resource._related_resources = []
+                resource._linked_resources = []
+            yield resource
+
+    def _construct_related_resources(self):
+        """
+        Constructs the related resources from the properties.
+        This removes the related properties from the properties
+        if the relationship specifies to remove them.
+        """
+        self._related_resources = self._generate_links_with_loader(self.relationships,
+                                                                   self._properties)
+
+    def _generate_links_with_loader(self, relationship_list, links_properties):
+        """
+        Calls ``_generate_links`` with the loader that was current
+        when this resource was constructed as the current loader.
+
+        :param list relationship_list:
+        :param dict links_properties:
+        :return: A list of ResourceBase objects
+        :rtype: list
+        """
+        loader = self._loader
+        if loader is None or loader is get_current_loader():
+            return self._generate_links(relationship_list, links_properties)
+        with loader:
+            return self._generate_links(relationship_list, links_properties)
 
     @staticmethod
     def _generate_links(relationship_list, links_properties):
@@ -210,8 +438,8 @@ class ResourceBase(object):
         """
         if not self._url:
             base_url = self.base_url_sans_pks if self.no_pks else self.base_url
-            base_url = join_url_parts(base_url, self.route_extension)
-            url = create_url(base_url, **self.item_pks).strip('/')
+            template = _get_route_template(base_url, self.route_extension)
+            url = template.render(self.item_pks).strip('/')
             url = '/{0}'.format(url) if not self.append_slash else '/{0}/'.format(url)
             query_string = self.query_string
             if query_string:
@@ -274,12 +502,20 @@ class ResourceBase(object):
         """
         A dictionary of the endpoints with the
         method as the key and the route options as the
-        value
+        value.  The dictionary is generated once per class
+        and is regenerated only when the class (or one of
+        its parents) is modified.  Both the dictionary and
+        the route options are read only.
 
         :return: dictionary of endpoints
-        :rtype: dict
+        :rtype: ReadOnlyDict
         """
-        return _generate_endpoint_dict(cls)
+        try:
+            return cls.__dict__[_ENDPOINT_DICTIONARY_CACHE]
+        except KeyError:
+            endpoint_dictionary = _generate_endpoint_dict(cls)
+            cls._cache_endpoint_dictionary(endpoint_dictionary)
+            return endpoint_dictionary
 
     @classproperty
     def links(cls):
@@ -321,6 +557,20 @@ class ResourceBase(object):
         return convert_to_underscore(cls.__name__)
 
 
+def _default_construction(cls):
+    """
+    :param type cls: The ResourceBase subclass.
+    :return: Whether the class is constructed by
+        ``ResourceBase.__init__`` and ``object.__new__``.
+        The functions are compared since python 2 creates
+        a new unbound method on every attribute access.
+    :rtype: bool
+    """
+    return (six.get_unbound_function(cls.__init__) is
+            six.get_unbound_function(ResourceBase.__init__) and
+            cls.__new__ is object.__new__)
+
+
 def _generate_endpoint_dict(cls):
     """
     Generates a dictionary of the endpoints on the class
@@ -339,10 +589,10 @@ def _generate_endpoint_dict(cls):
         for route, endpoint, options in method.routes:
             base_url = cls.base_url_sans_pks if options.get('no_pks', False) else cls.base_url
             route = join_url_parts(base_url, route)
-            all_routes.append(dict(route=route, endpoint_func=method, **options))
+            all_routes.append(ReadOnlyDict(dict(route=route, endpoint_func=method, **options)))
         _logger.info('Registering routes: %s as key %s', all_routes, name)
-        endpoint_dictionary[name] = all_routes
-    return endpoint_dictionary
+        endpoint_dictionary[name] = tuple(all_routes)
+    return ReadOnlyDict(endpoint_dictionary)
 
 
 def _get_apimethods(cls):
@@ -375,6 +625,88 @@ def _apimethod_predicate(obj):
     return getattr(obj, 'rest_route', False) or getattr(obj, '__rest_route__', False)
 
 
+class URLTemplate(object):
+    """
+    A url template (e.g. ``'/api/resource/<id>'``) that has
+    been parsed into its literal and placeholder segments.
+    Rendering a template is a single join and does not
+    require any regular expressions.
+
+    Templates should be retrieved using :py:meth:`URLTemplate.compile`
+    which keeps the most recently used parsed templates
+    (``cache_size``) so that a template string is only parsed
+    again if it was evicted.
+
+    .. code-block:: python
+
+        >>> template = URLTemplate.compile('/api/resource/<id>')
+        >>> template.render(dict(id=1))
+        '/api/resource/1'
+
+    :param unicode template: The original url template.
+    :param tuple placeholders: The names of the placeholders
+        in the order that they appear in the template.
+    """
+    cache_size = 1024
+    _compiled_templates = LRUCache(maxsize=cache_size)
+
+    def __init__(self, template):
+        """
+        Parses the template into its segments.  You should
+        generally use :py:meth:`URLTemplate.compile` instead.
+
+        :param unicode template: The url template to parse.
+        """
+        self.template = template
+        parts = _URL_PART_FINDER.split(template)
+        self.placeholders = tuple(parts[1::2])
+        self._segments = tuple((literal, name, '<{0}>'.format(name))
+                               for literal, name in zip(parts[0::2], self.placeholders))
+        self._tail = parts[-1]
+
+    @classmethod
+    def compile(cls, template):
+        """
+        Gets the parsed template for the template string.
+        Templates are cached in a bounded cache so subsequent
+        calls with the same template string will generally
+        not parse the template again.
+
+        :param unicode template: The url template.
+        :return: The parsed template.
+        :rtype: URLTemplate
+        """
+        compiled = cls._compiled_templates.get(template)
+        if compiled is None:
+            compiled = cls(template)
+            cls._compiled_templates.set(template, compiled)
+        return compiled
+
+    def render(self, values):
+        """
+        Renders the template.  Every placeholder whose name is
+        a key in the values dictionary is replaced with
+        the corresponding value.  Placeholders without a value
+        are left as they are.
+
+        :param dict values: The template variables and their
+            associated values.
+        :return: The rendered url
+        :rtype: unicode
+        """
+        if not self._segments:
+            return self.template
+        parts = []
+        for literal, name, placeholder in self._segments:
+            parts.append(literal)
+            if name in values:
+                parts.append(six.text_type(values[name]))
+            else:
+                parts.append(placeholder)
+        parts.append(self._tail)
+        return ''.join(parts)
+
+
 def create_url(base_url, **kwargs):
     """
     Generates a fully qualified url.  It iterates
@@ -389,10 +721,31 @@ def create_url(base_url, **kwargs):
     :return: A complete url.
     :rtype: unicode
     """
-    for key, value in six.iteritems(kwargs):
-        to_replace = '<{0}>'.format(key)
-        base_url = re.sub(to_replace, six.text_type(value), base_url)
-    return base_url
+    return URLTemplate.compile(base_url).render(kwargs)
+
+
+_ROUTE_TEMPLATES = LRUCache(maxsize=URLTemplate.cache_size)
+
+
+def _get_route_template(base_url, route_extension):
+    """
+    Gets the compiled template for the base_url joined
+    with the route_extension.  The joined template is cached
+    (in a bounded cache) so that ``join_url_parts`` is generally
+    only called once per base_url and route_extension combination.
+
+    :param unicode base_url: The base url for the resource
+    :param unicode route_extension: The route_extension to
+        append to the base_url
+    :return: The compiled url template
+    :rtype: URLTemplate
+    """
+    key = (base_url, route_extension)
+    template = _ROUTE_TEMPLATES.get(key)
+    if template is None:
+        template = URLTemplate.compile(join_url_parts(base_url, route_extension))
+        _ROUTE_TEMPLATES.set(key, template)
+    return template
 
 
 _RelatedTuple = namedtuple('_RelatedTuple', 'resource, name, embedded')
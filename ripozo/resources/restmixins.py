@@ -7,9 +7,14 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from ripozo.exceptions import ValidationException
+from ripozo.resources.constants.input_categories import URL_PARAMS, QUERY_ARGS
+from ripozo.resources.fields.base import TranslationPlan
 from ripozo.resources.relationships.relationship import Relationship
 from ripozo.resources.relationships.list_relationship import ListRelationship
-from ripozo.decorators import apimethod, classproperty, translate, manager_translate
+from ripozo.decorators import apimethod, classproperty, cached_classproperty, \
+    translate, manager_translate
+from ripozo.resources.request import RequestContainer, _mutable
 from ripozo.resources.resource_base import ResourceBase
 
 import logging
@@ -17,6 +22,9 @@ import six
 
 _logger = logging.getLogger(__name__)
 
+# The locations translated by the endpoints that do not read the body
+_NO_BODY = (URL_PARAMS, QUERY_ARGS,)
+
 
 class AllOptionsResource(ResourceBase):
     """
@@ -25,6 +33,7 @@ class AllOptionsResource(ResourceBase):
     to be used as a pointer to other resources.
     """
     __abstract__ = True
+    __slots__ = ()
     namespace = ''
     resource_name = ''
     linked_resource_classes = tuple()
@@ -80,6 +89,7 @@ class Create(ResourceBase):
     adding the create ability to your resource.
     """
     __abstract__ = True
+    __slots__ = ()
 
     @apimethod(methods=['POST'], no_pks=True)
     @manager_translate(validate=True, fields_attr='create_fields')
@@ -96,11 +106,11 @@ class Create(ResourceBase):
         :rtype: Update
         """
         _logger.debug('Creating a resource using manager %s', cls.manager)
-        props = cls.manager.create(request.body_args)
+        props = cls.manager.create(_mutable(request.body_args))
         meta = dict(links=dict(created=props))
         return cls(properties=props, meta=meta, status_code=201)
 
-    @classproperty
+    @cached_classproperty('_links')
     def links(cls):
         """
         Appends the "created" link to the _links
@@ -126,9 +136,10 @@ class Retrieve(ResourceBase):
     This is for a single resource retrieval
     """
     __abstract__ = True
+    __slots__ = ()
 
     @apimethod(methods=['GET'])
-    @manager_translate()
+    @manager_translate(locations=_NO_BODY)
     def retrieve(cls, request):
         """
         Retrieves an individual resource.
@@ -141,7 +152,12 @@ class Retrieve(ResourceBase):
         :raises: NotFoundException
         """
         _logger.debug('Retrieving a resource using the manager %s', cls.manager)
-        props = cls.manager.retrieve(request.url_params)
+        projection = _get_projection(cls, request.query_args)[0]
+        if projection is None:
+            props = cls.manager.retrieve(request.url_params)
+        else:
+            props = cls.manager.retrieve(request.url_params, **_projection_kwargs(cls, projection))
+            props = _project(props, projection)
         return cls(properties=props, status_code=200)
 
 
@@ -154,12 +170,16 @@ class RetrieveList(ResourceBase):
     and an individual resource.
     """
     __abstract__ = True
+    __slots__ = ()
 
     @apimethod(methods=['GET'], no_pks=True)
-    @manager_translate(fields_attr='list_fields')
+    @manager_translate(fields_attr='list_fields', locations=_NO_BODY)
     def retrieve_list(cls, request):
         """
         A resource that contains the other resources as properties.
+        The rows returned by the manager may be a lazy iterable.
+        They are not materialized here, so the resources are
+        constructed as an adapter consumes them.
 
         :param RequestContainer request: The request in the standardized
             ripozo style.
@@ -168,13 +188,19 @@ class RetrieveList(ResourceBase):
         :rtype: RetrieveList
         """
         _logger.debug('Retrieving list of resources using manager %s', cls.manager)
-        props, meta = cls.manager.retrieve_list(request.query_args)
+        projection, filters = _get_projection(cls, request.query_args)
+        if projection is None:
+            props, meta = cls.manager.retrieve_list(filters)
+        else:
+            props, meta = cls.manager.retrieve_list(filters, **_projection_kwargs(cls, projection))
+            props = _project_rows(props, projection)
+            meta = _project_links(cls, meta, request.query_args[cls.manager.fields_query_arg])
         return_props = {cls.resource_name: props}
         return_props.update(request.query_args)
         return cls(properties=return_props, meta=meta,
                    status_code=200, query_args=cls.manager.fields, no_pks=True)
 
-    @classproperty
+    @cached_classproperty('_links', 'manager')
     def links(cls):
         """
         Appends the "next" and "previous" links to the
@@ -199,6 +225,10 @@ class RetrieveList(ResourceBase):
             fields = tuple(actual_class.manager.fields)
             fields += (actual_class.manager.pagination_pk_query_arg,
                        actual_class.manager.pagination_count_query_arg)
+            for query_arg in ('pagination_cursor_query_arg', 'fields_query_arg'):
+                query_arg = getattr(actual_class.manager, query_arg, None)
+                if query_arg:
+                    fields += (query_arg,)
         else:
             fields = tuple()
         return (Relationship('next', relation=actual_class.__name__,
@@ -213,8 +243,9 @@ class RetrieveRetrieveList(RetrieveList, Retrieve):
     and individual resources.  Allow both list
     retrieval and individual retrieval.
     """
+    __slots__ = ()
 
-    @classproperty
+    @cached_classproperty('_relationships', 'resource_name')
     def relationships(cls):
         """
         Appends the ListRelationship relationship that corresponds
@@ -234,6 +265,7 @@ class Update(ResourceBase):
     update of your resource.
     """
     __abstract__ = True
+    __slots__ = ()
 
     @apimethod(methods=['PATCH'])
     @manager_translate(fields_attr='update_fields', validate=True, skip_required=True)
@@ -249,7 +281,7 @@ class Update(ResourceBase):
         :rtype: Create
         """
         _logger.debug('Updating a resource using the manager %s', cls.manager)
-        props = cls.manager.update(request.url_params, request.body_args)
+        props = cls.manager.update(request.url_params, _mutable(request.body_args))
         return cls(properties=props, status_code=200)
 
 
@@ -258,9 +290,10 @@ class Delete(ResourceBase):
     Adds the ability to delete your resource.
     """
     __abstract__ = True
+    __slots__ = ()
 
     @apimethod(methods=['DELETE'])
-    @manager_translate()
+    @manager_translate(locations=_NO_BODY)
     def delete(cls, request):
         """
 
@@ -275,20 +308,255 @@ class Delete(ResourceBase):
         return cls(properties=props)
 
 
+def _get_projection(cls, query_args):
+    """
+    Gets the fields requested by the client.  The pks
+    of the class are always part of the projection so
+    that the urls of the resources can be constructed.
+
+    :param type cls: The ResourceBase subclass.
+    :param dict query_args: The query args of the request.
+    :return: A tuple of the projection (or None) and
+        the query args without the fields query arg.
+    :rtype: tuple
+    :raises: ValidationException
+    """
+    query_arg = getattr(cls.manager, 'fields_query_arg', None)
+    if not isinstance(query_arg, six.string_types) or query_arg not in query_args:
+        return None, query_args
+    projection, query_args = cls.manager.get_projection(query_args)
+    if projection is not None:
+        projection = tuple(pk for pk in cls.pks if pk not in projection) + projection
+    return projection, query_args
+
+
+def _projection_kwargs(cls, projection):
+    """
+    :param type cls: The ResourceBase subclass.
+    :param tuple projection: The requested fields.
+    :return: The keyword arguments to pass the projection
+        to the manager if it supports projections.
+    :rtype: dict
+    """
+    if getattr(cls.manager, 'supports_projection', False) is True:
+        return dict(fields=projection)
+    return {}
+
+
+def _project(props, projection):
+    """
+    :param dict props: The properties returned by the manager.
+    :param tuple projection: The requested fields.  Only
+        the first part of dotted fields is used.
+    :return: The properties that were requested.
+    :rtype: dict
+    """
+    names = set(field.split('.', 1)[0] for field in projection)
+    return dict((key, value) for key, value in six.iteritems(props) if key in names)
+
+
+def _project_rows(rows, projection):
+    """
+    :param list rows: The rows returned by the manager.  It
+        may be a lazy iterable.
+    :param tuple projection: The requested fields.
+    :return: The projected rows.  A generator if the rows
+        are not a list or tuple.
+    :rtype: list|types.GeneratorType
+    """
+    projected = (_project(row, projection) for row in rows)
+    if isinstance(rows, (list, tuple)):
+        return list(projected)
+    return projected
+
+
+def _project_links(cls, meta, fields):
+    """
+    Adds the fields query arg to the pagination
+    links so that the other pages have the same fields.
+
+    :param type cls: The ResourceBase subclass.
+    :param dict meta: The meta returned by the manager.
+    :param fields: The value of the fields query arg.
+    :return: The updated meta.
+    :rtype: dict
+    """
+    links = meta.get('links') if meta else None
+    if not links:
+        return meta
+    query_arg = cls.manager.fields_query_arg
+    meta = dict(meta)
+    meta['links'] = dict((name, dict(args, **{query_arg: fields}))
+                         for name, args in six.iteritems(links))
+    return meta
+
+
+def _translate_body_list(cls, request, field_names, skip_required=False):
+    """
+    Gets the list of items in the body of a bulk request and
+    translates and validates each of them with the manager's
+    fields.  The list is expected under the resource_name
+    of the class (e.g. ``{"resource": [{...}, {...}]}``).
+
+    :param type cls: The ResourceBase subclass
+    :param RequestContainer request: The bulk request
+    :param list field_names: The names of the manager's fields
+        to translate and validate each item with.
+    :param bool skip_required: Whether the required fields
+        may be omitted.
+    :return: The translated items
+    :rtype: list
+    :raises: ValidationException
+    """
+    items = request.body_args.get(cls.resource_name)
+    if not isinstance(items, (list, tuple)):
+        raise ValidationException('The request body must contain a list of '
+                                  'objects named "{0}"'.format(cls.resource_name))
+    fields = [field for field in cls.manager.field_validators if field.name in field_names]
+    plan = TranslationPlan(fields, skip_required=skip_required, validate=True)
+    translated = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValidationException('Every item in "{0}" must be an '
+                                      'object'.format(cls.resource_name))
+        # a mutable copy that is translated in place and may be
+        # modified later (e.g. _pop_lookup_keys) even if requests
+        # are read only
+        values = dict(item)
+        plan.apply(RequestContainer(body_args=values, read_only=False))
+        translated.append(values)
+    return translated
+
+
+def _pop_lookup_keys(cls, item):
+    """
+    Removes the pks from the item.
+
+    :param type cls: The ResourceBase subclass
+    :param dict item: An item of a bulk request
+    :return: The lookup keys of the item
+    :rtype: dict
+    :raises: ValidationException
+    """
+    lookup_keys = {}
+    for pk in cls.pks:
+        if pk not in item:
+            raise ValidationException('Every item in "{0}" must include '
+                                      'the "{1}" field'.format(cls.resource_name, pk))
+        lookup_keys[pk] = item.pop(pk)
+    return lookup_keys
+
+
+class BulkCreate(ResourceBase):
+    """
+    Adds the ability to create many resources in
+    a single request.  The body must contain a list
+    of the resources to create under the resource_name
+    (e.g. ``{"resource": [{"name": "a"}, {"name": "b"}]}``).
+    Every item is validated before the manager's
+    ``bulk_create`` is called once with all of them.
+    """
+    __abstract__ = True
+    __slots__ = ()
+
+    @apimethod(route='/bulk', methods=['POST'], no_pks=True)
+    def bulk_create(cls, request):
+        """
+        Creates the resources using the cls.manager.bulk_create
+        method.
+
+        :param RequestContainer request: The request in the standardized
+            ripozo style.
+        :return: An instance of the class with the created
+            resources' properties as a list under the resource_name
+        :rtype: BulkCreate
+        :raises: ValidationException
+        """
+        _logger.debug('Bulk creating resources using manager %s', cls.manager)
+        values_list = _translate_body_list(cls, request, cls.manager.create_fields)
+        props = cls.manager.bulk_create(values_list)
+        return cls(properties={cls.resource_name: props}, status_code=201, no_pks=True)
+
+
+class BulkUpdate(ResourceBase):
+    """
+    Adds the ability to partially update many resources
+    in a single request.  Every item in the list under the
+    resource_name in the body must include the pks of the
+    resource to update.  Every item is validated before the
+    manager's ``bulk_update`` is called once with all of them.
+    """
+    __abstract__ = True
+    __slots__ = ()
+
+    @apimethod(route='/bulk', methods=['PATCH'], no_pks=True)
+    def bulk_update(cls, request):
+        """
+        Updates the resources using the cls.manager.bulk_update
+        method.
+
+        :param RequestContainer request: The request in the standardized
+            ripozo style.
+        :return: An instance of the class with the updated
+            resources' properties as a list under the resource_name
+        :rtype: BulkUpdate
+        :raises: ValidationException
+        """
+        _logger.debug('Bulk updating resources using manager %s', cls.manager)
+        field_names = set(cls.manager.update_fields) | set(cls.pks)
+        items = _translate_body_list(cls, request, field_names, skip_required=True)
+        updates_list = [(_pop_lookup_keys(cls, item), item) for item in items]
+        props = cls.manager.bulk_update(updates_list)
+        return cls(properties={cls.resource_name: props}, status_code=200, no_pks=True)
+
+
+class BulkDelete(ResourceBase):
+    """
+    Adds the ability to delete many resources in a
+    single request.  The body must contain a list of
+    the pks of the resources to delete under the
+    resource_name (e.g. ``{"resource": [{"id": 1}, {"id": 2}]}``).
+    """
+    __abstract__ = True
+    __slots__ = ()
+
+    @apimethod(route='/bulk', methods=['DELETE'], no_pks=True)
+    def bulk_delete(cls, request):
+        """
+        Deletes the resources using the cls.manager.bulk_delete
+        method.
+
+        :param RequestContainer request: The request in the standardized
+            ripozo style.
+        :return: An instance of the class
+        :rtype: BulkDelete
+        :raises: ValidationException
+        """
+        _logger.debug('Bulk deleting resources using manager %s', cls.manager)
+        items = _translate_body_list(cls, request, cls.pks)
+        lookup_keys_list = [_pop_lookup_keys(cls, item) for item in items]
+        cls.manager.bulk_delete(lookup_keys_list)
+        return cls(no_pks=True)
+
+
 class RetrieveUpdate(Retrieve, Update):
     __abstract__ = True
+    __slots__ = ()
 
 
 class RetrieveUpdateDelete(Retrieve, Update, Delete):
     __abstract__ = True
+    __slots__ = ()
 
 
 class CreateRetrieve(Create, Retrieve):
     __abstract__ = True
+    __slots__ = ()
 
 
 class CreateRetrieveUpdate(Create, Retrieve, Update):
     __abstract__ = True
+    __slots__ = ()
 
 
 class CRUD(Create, Retrieve, Update, Delete):
@@ -297,6 +565,7 @@ class CRUD(Create, Retrieve, Update, Delete):
     In other words the single resource operations
     """
     __abstract__ = True
+    __slots__ = ()
 
 
 class CRUDL(Create, RetrieveRetrieveList, Update, Delete):
@@ -306,8 +575,15 @@ class CRUDL(Create, RetrieveRetrieveList, Update, Delete):
     Requires that the manager is set on the class.
     """
     __abstract__ = True
+    __slots__ = ()
 
-    @classproperty
+    @cached_classproperty('_links', 'manager')
     def links(cls):
+        """
+        The links defined on the class plus the "created",
+        "next" and "previous" links.
+
+        :rtype: tuple
+        """
         links = cls._links or tuple()
         return links + Create.get_base_links(cls) + RetrieveRetrieveList.get_base_links(cls)
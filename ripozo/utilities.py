@@ -11,8 +11,92 @@ from functools import wraps
 
 import datetime
 import decimal
+import json
 import re
 import six
+import types
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import rapidjson
+except ImportError:  # pragma: no cover
+    rapidjson = None
+
+
+try:
+    from types import MappingProxyType as ReadOnlyDict
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+    class ReadOnlyDict(Mapping):
+        """
+        A read only view of a dictionary.  It does not copy
+        the dictionary, it simply prevents it from being modified
+        through the view.  This is only used in python versions
+        without ``types.MappingProxyType``.
+        """
+        __slots__ = ('_mapping',)
+
+        def __init__(self, mapping):
+            self._mapping = mapping
+
+        def __getitem__(self, key):
+            return self._mapping[key]
+
+        def __iter__(self):
+            return iter(self._mapping)
+
+        def __len__(self):
+            return len(self._mapping)
+
+        def __contains__(self, key):
+            return key in self._mapping
+
+        def __repr__(self):
+            return 'ReadOnlyDict({0!r})'.format(self._mapping)
+
+        def copy(self):
+            """
+            :return: A mutable shallow copy of the underlying dictionary
+            :rtype: dict
+            """
+            return self._mapping.copy()
+
+
+class OneShotIterable(object):
+    """
+    Wraps a lazy iterable (e.g. a generator of resources) that
+    can only be consumed once.  Iterating it a second time
+    raises a ``RuntimeError`` instead of silently yielding
+    nothing.
+
+    :param iterable: The lazy iterable.
+    """
+    __slots__ = ('_iterable',)
+
+    def __init__(self, iterable):
+        self._iterable = iterable
+
+    def __iter__(self):
+        iterable = self._iterable
+        if iterable is None:
+            raise RuntimeError('This lazy iterable was already consumed.  It can '
+                               'only be iterated over once.  Use a list to iterate '
+                               'over the items more than once.')
+        self._iterable = None
+        return iter(iterable)
+
+    @property
+    def consumed(self):
+        """
+        :return: Whether the iterable was iterated over.
+        :rtype: bool
+        """
+        return self._iterable is None
 
 
 _FIRST_CAP_RE = re.compile('(.)([A-Z][a-z]+)')
@@ -156,6 +240,98 @@ def make_json_safe(obj):
     return obj
 
 
+def json_default(obj):
+    """
+    The ``default`` handler for the json encoders.  It
+    serializes the objects that json does not support natively
+    the same way as ``make_json_safe``: datetimes, dates, times
+    and timedeltas become strings and decimals become floats.
+    Read only dictionaries become dictionaries and sets,
+    generators and one shot iterables (e.g. the lazy rows of
+    a streaming manager) become lists.
+
+    :param object obj: The object that could not be serialized.
+    :return: A json serializable representation of the object.
+    :rtype: object
+    :raises: TypeError
+    """
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time, datetime.timedelta)):
+        return six.text_type(obj)
+    elif isinstance(obj, decimal.Decimal):
+        return float(obj)
+    elif isinstance(obj, ReadOnlyDict):
+        return dict(obj)
+    elif isinstance(obj, (set, frozenset, types.GeneratorType, OneShotIterable)):
+        return list(obj)
+    raise TypeError('{0!r} is not JSON serializable'.format(obj))
+
+
+def stdlib_json_encoder(obj):
+    """
+    Serializes an object to a json string with the standard
+    library ``json`` module and ``json_default``.  Use it as the
+    ``json_encoder`` to get the same output regardless of the
+    installed packages.
+
+    :param object obj: The object to serialize.
+    :return: The json string
+    :rtype: unicode
+    """
+    return json.dumps(obj, default=json_default)
+
+
+def _orjson_encoder(obj):
+    try:
+        return orjson.dumps(obj, default=json_default,
+                            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+                            ).decode('utf-8')
+    except TypeError:
+        # e.g. integers that do not fit in 64 bits
+        return stdlib_json_encoder(obj)
+
+
+def _rapidjson_encoder(obj):
+    try:
+        return rapidjson.dumps(obj, default=json_default)
+    except (TypeError, ValueError):
+        return stdlib_json_encoder(obj)
+
+
+if orjson is not None:
+    _json_encoder = _orjson_encoder
+elif rapidjson is not None:  # pragma: no cover
+    _json_encoder = _rapidjson_encoder
+else:  # pragma: no cover
+    _json_encoder = stdlib_json_encoder
+
+
+def default_json_encoder(obj):
+    """
+    Serializes an object to a json string.  It uses ``orjson``
+    or ``rapidjson`` if one of them is installed and falls
+    back to the standard library ``json`` otherwise.  Objects
+    that are not natively serializable are handled by
+    ``json_default``.
+
+    The output depends on the backend.  Compared with
+    ``stdlib_json_encoder``, ``orjson`` writes ``NaN`` and
+    ``Infinity`` as ``null``, does not escape non ascii
+    characters and does not put spaces after the separators.
+    ``rapidjson`` does not put spaces after the separators
+    either.
+    Since the bodies differ, so do the ETags of a
+    ``ripozo.caching.ResponseCache``.  Pass
+    ``stdlib_json_encoder`` as the ``json_encoder`` if the
+    responses must be identical on hosts with different
+    packages installed.
+
+    :param object obj: The object to serialize.
+    :return: The json string
+    :rtype: unicode
+    """
+    return _json_encoder(obj)
+
+
 def get_or_pop(dictionary, key, default=None, pop=False):
     """A simple helper for getting or popping a property
     from a dictionary depending on the ```pop``` parameter.
@@ -4,6 +4,8 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from ripozo import restmixins, RequestContainer, ResourceBase
+from ripozo.exceptions import ValidationException
+from ripozo.resources.fields.common import StringField
 
 from ripozo_tests.helpers.inmemory_manager import InMemoryManager
 
@@ -57,6 +59,15 @@ class TestCreate(TestBase):
         actual_obj = self.manager.objects[resource_id]
         self.assertDictEqual(actual_obj, resource.properties)
 
+    def test_create_read_only(self):
+        """Tests that the manager can modify the
+        values of a read only request"""
+        body = dict(first=1, second=2)
+        req = RequestContainer(body_args=body, read_only=True)
+        resource = self.resource_class.create(req)
+        self.assertIn(resource.properties['id'], self.manager.objects)
+        self.assertDictEqual(body, dict(first=1, second=2))
+
     def test_create_link(self):
         body = dict(first=1, second=2)
         req = RequestContainer(body_args=body)
@@ -93,6 +104,15 @@ class TestCreate(TestBase):
 
 
 
+    def test_create_validator_replaced(self):
+        """Tests that replacing a field validator
+        of the manager is used by the next request"""
+        self.resource_class.create(RequestContainer(body_args=dict(first='a')))
+        self.manager._field_validators['first'] = StringField('first', minimum=5)
+        req = RequestContainer(body_args=dict(first='a'))
+        self.assertRaises(ValidationException, self.resource_class.create, req)
+
+
 class TestRetrieve(TestBase):
     resource_base = restmixins.Retrieve
 
@@ -104,6 +124,22 @@ class TestRetrieve(TestBase):
         resource = self.resource_class.retrieve(req)
         self.assertDictEqual(resource.properties, model)
 
+    def test_retrieve_raw_body_not_decoded(self):
+        """Tests that the raw body of a retrieve request is not decoded"""
+        model = self.create_resources(count=1)[0]
+        req = RequestContainer(url_params=dict(id=model['id']), raw_body=b'not json{',
+                               content_type='application/json')
+        resource = self.resource_class.retrieve(req)
+        self.assertDictEqual(resource.properties, model)
+        self.assertIsNone(req._body_args)
+
+    def test_retrieve_read_only(self):
+        """Tests retrieving with a read only request"""
+        model = self.create_resources(count=1)[0]
+        req = RequestContainer(url_params=dict(id=model['id']), read_only=True)
+        resource = self.resource_class.retrieve(req)
+        self.assertDictEqual(resource.properties, model)
+
 
 class TestRetrieveList(TestBase):
     resource_base = restmixins.RetrieveList
@@ -116,6 +152,18 @@ class TestRetrieveList(TestBase):
         for res in resource.properties[resource.resource_name]:
             self.assertIn(res, self.manager.objects.values())
 
+    def test_retrieve_list_read_only(self):
+        """Tests that the pagination query args
+        can be read from a read only request"""
+        self.create_resources(count=3)
+        query_args = dict(count=2, fields='first')
+        req = RequestContainer(query_args=query_args, read_only=True)
+        resource = self.resource_class.retrieve_list(req)
+        next_link = [link.resource for link in resource.linked_resources if link.name == 'next'][0]
+        self.assertEqual(next_link.get_query_arg_dict()['count'], 2)
+        self.assertEqual(next_link.get_query_arg_dict()['fields'], 'first')
+        self.assertDictEqual(query_args, dict(count=2, fields='first'))
+
     def test_url(self):
         req = RequestContainer()
         resource = self.resource_class.retrieve_list(req)
@@ -133,6 +181,15 @@ class TestRetrieveList(TestBase):
         resp = restmixins.RetrieveList.get_base_links(R)
         self.assertTupleEqual(resp[0].query_args, tuple())
 
+    def test_get_base_links_cursor(self):
+        """
+        Tests that the cursor query arg is
+        part of the pagination links.
+        """
+        resp = restmixins.RetrieveList.get_base_links(self.resource_class)
+        for link in resp:
+            self.assertIn(self.manager.pagination_cursor_query_arg, link.query_args)
+
     def test_paginate(self):
         all_models = self.create_resources(count=10)
         req = RequestContainer()
@@ -267,6 +324,15 @@ class TestDelete(TestBase):
         self.assertDictEqual(resource.properties, {})
         self.assertNotIn(id_, self.manager.objects)
 
+    def test_delete_raw_body_not_decoded(self):
+        """Tests that the raw body of a delete request is not decoded"""
+        model = self.create_resources(count=1)[0]
+        req = RequestContainer(url_params=dict(id=model['id']), raw_body=b'not json{',
+                               content_type='application/json')
+        self.resource_class.delete(req)
+        self.assertNotIn(model['id'], self.manager.objects)
+        self.assertIsNone(req._body_args)
+
     def test_delete_manager_fields(self):
         """
         Tests that the manager fields
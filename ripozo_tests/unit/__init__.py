@@ -1 +1 @@
-from . import dispatch, managers, resources, decorators, exceptions, tests_utilities, tests
\ No newline at end of file
+from . import caching, dispatch, managers, resources, decorators, exceptions, tests_utilities, tests
\ No newline at end of file
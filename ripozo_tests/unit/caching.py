@@ -0,0 +1,328 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from ripozo.caching import LRUCache, ResponseCache, CachedResponse, CacheBackend, \
+    CachingManager, make_etag, _normalize_args as _normalize
+from ripozo.manager_base import BaseManager
+from ripozo.resources.request import RequestContainer
+
+import mock
+import unittest2
+
+
+class TestLRUCache(unittest2.TestCase):
+    """
+    Tests for the LRUCache
+    """
+
+    def test_get_set(self):
+        """
+        Tests getting and setting values and
+        the hit and miss statistics.
+        """
+        cache = LRUCache(maxsize=2)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('a', 'default'), 'default')
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.stats, dict(hits=1, misses=2, evictions=0, size=1))
+        cache.delete('a')
+        self.assertNotIn('a', cache)
+        cache.set('b', 2)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_eviction(self):
+        """
+        Tests that the least recently used
+        entry is evicted.
+        """
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(len(cache), 2)
+
+    def test_ttl(self):
+        """
+        Tests that entries expire after the ttl.
+        """
+        cache = LRUCache(maxsize=2, ttl=10)
+        with mock.patch('ripozo.caching.time.time', return_value=100):
+            cache.set('a', 1)
+        with mock.patch('ripozo.caching.time.time', return_value=109):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('ripozo.caching.time.time', return_value=110):
+            self.assertNotIn('a', cache)
+            self.assertIsNone(cache.get('a'))
+
+    def test_invalid_maxsize(self):
+        """
+        Tests that the maxsize must be positive.
+        """
+        self.assertRaises(ValueError, LRUCache, maxsize=0)
+
+
+class TestResponseCache(unittest2.TestCase):
+    """
+    Tests for the ResponseCache and CachedResponse
+    """
+
+    def get_adapter(self, body='{}', status_code=200):
+        return mock.Mock(formatted_body=body, status_code=status_code,
+                         extra_headers={'Content-Type': 'application/json'})
+
+    def test_make_etag(self):
+        """
+        Tests that etags are quoted and depend on the body
+        """
+        etag = make_etag('{"a": 1}')
+        self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+        self.assertEqual(etag, make_etag('{"a": 1}'))
+        self.assertNotEqual(etag, make_etag('{"a": 2}'))
+
+    def test_set_get(self):
+        """
+        Tests that 200 responses are cached with an ETag
+        and other responses are not.
+        """
+        cache = ResponseCache(maxsize=10)
+        response = cache.set('key', self.get_adapter())
+        self.assertIsInstance(response, CachedResponse)
+        self.assertEqual(response.extra_headers['ETag'], make_etag('{}'))
+        self.assertEqual(response.extra_headers['Content-Type'], 'application/json')
+        cached = cache.get('key')
+        self.assertEqual(cached.formatted_body, response.formatted_body)
+        self.assertEqual(cached.extra_headers, response.extra_headers)
+        self.assertIsNone(cached.resource)
+        self.assertEqual(list(response.formatted_body_chunks()), ['{}'])
+        cache.set('other', self.get_adapter(status_code=404))
+        self.assertIsNone(cache.get('other'))
+
+    def test_make_key(self):
+        """
+        Tests that the key depends on the request
+        and the generation of the resource class.
+        """
+        cache = ResponseCache()
+        klass = type(str('Klass'), (object,), {})
+        adapter = type(str('Adapter'), (object,), {})
+        request = RequestContainer(url_params=dict(id=1), query_args=dict(a=[1]))
+        key = cache.make_key(klass, 'retrieve', adapter, request)
+        self.assertEqual(key, cache.make_key(klass, 'retrieve', adapter,
+                                             RequestContainer(url_params=dict(id=1),
+                                                              query_args=dict(a=[1]))))
+        self.assertNotEqual(key, cache.make_key(klass, 'retrieve', adapter,
+                                                RequestContainer(url_params=dict(id=2))))
+        self.assertNotEqual(key, cache.make_key(klass, 'other', adapter, request))
+        generation = cache.generation(klass)
+        self.assertEqual(generation, cache.generation(klass))
+        cache.invalidate(klass)
+        self.assertNotEqual(generation, cache.generation(klass))
+        self.assertNotEqual(key, cache.make_key(klass, 'retrieve', adapter, request))
+
+    def test_shared_backend(self):
+        """
+        Tests that the generations are stored in the backend
+        so that an invalidation by one cache (e.g. in another
+        process) is seen by every cache sharing the backend.
+        """
+        klass = type(str('Klass'), (object,), {})
+        adapter = type(str('Adapter'), (object,), {})
+        backend = LRUCache(maxsize=10)
+        first, second = ResponseCache(backend=backend), ResponseCache(backend=backend)
+        key = first.make_key(klass, 'retrieve', adapter, RequestContainer())
+        self.assertEqual(key, second.make_key(klass, 'retrieve', adapter, RequestContainer()))
+        second.invalidate(klass)
+        self.assertNotEqual(key, first.make_key(klass, 'retrieve', adapter, RequestContainer()))
+
+        key = first.make_key(klass, 'retrieve', adapter, RequestContainer())
+        backend.delete(first._generation_key(klass))
+        self.assertNotEqual(key, second.make_key(klass, 'retrieve', adapter, RequestContainer()))
+
+    def test_make_key_vary(self):
+        """
+        Tests that the vary headers are part of the key
+        and that other headers are not.
+        """
+        klass = type(str('Klass'), (object,), {})
+        adapter = type(str('Adapter'), (object,), {})
+
+        def key(cache, **headers):
+            return cache.make_key(klass, 'retrieve', adapter, RequestContainer(headers=headers))
+
+        cache = ResponseCache()
+        self.assertNotEqual(key(cache, Authorization='a'), key(cache, Authorization='b'))
+        self.assertNotEqual(key(cache, Authorization='a'), key(cache))
+        self.assertEqual(key(cache, Authorization='a'), key(cache, authorization='a'))
+        self.assertEqual(key(cache, Other='a'), key(cache, Other='b'))
+
+        cache = ResponseCache(vary=('Other',))
+        self.assertEqual(key(cache, Authorization='a'), key(cache, Authorization='b'))
+        self.assertNotEqual(key(cache, Other='a'), key(cache, Other='b'))
+
+    def test_etag_matches(self):
+        """
+        Tests the If-None-Match header parsing
+        """
+        etag = make_etag('{}')
+        self.assertFalse(ResponseCache.etag_matches(RequestContainer(), etag))
+        for header in [etag, '"other", {0}'.format(etag), 'W/{0}'.format(etag), '*']:
+            request = RequestContainer(headers={'If-None-Match': header})
+            self.assertTrue(ResponseCache.etag_matches(request, etag))
+        request = RequestContainer(headers={'If-None-Match': '"other"'})
+        self.assertFalse(ResponseCache.etag_matches(request, etag))
+
+    def test_not_modified(self):
+        """
+        Tests the 304 response
+        """
+        response = CachedResponse('{}', {'ETag': '"x"'}, 200, '"x"')
+        not_modified = response.not_modified()
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.formatted_body, '')
+        self.assertEqual(not_modified.extra_headers, {'ETag': '"x"'})
+
+    def test_is_cacheable(self):
+        self.assertTrue(ResponseCache.is_cacheable(['GET']))
+        self.assertTrue(ResponseCache.is_cacheable(['get', 'HEAD']))
+        self.assertFalse(ResponseCache.is_cacheable(['GET', 'POST']))
+        self.assertFalse(ResponseCache.is_cacheable([]))
+
+    def test_custom_backend(self):
+        """
+        Tests that a custom backend is used
+        """
+        backend = mock.Mock(spec=CacheBackend)
+        backend.get.return_value = None
+        cache = ResponseCache(backend=backend)
+        cache.set('key', self.get_adapter())
+        self.assertEqual(backend.set.call_count, 1)
+        self.assertIsNone(cache.get('key'))
+
+
+class TestCachingManager(unittest2.TestCase):
+    """
+    Tests for the CachingManager
+    """
+
+    def setUp(self):
+        self.manager = mock.MagicMock(fields=('id', 'name',))
+        self.manager.retrieve.side_effect = lambda lookup_keys: dict(lookup_keys, name='a')
+        self.manager.retrieve_list.return_value = [dict(id=1)], dict(links=dict())
+
+    def test_proxy(self):
+        """
+        Tests that the manager is a BaseManager and
+        other attributes come from the wrapped manager.
+        """
+        manager = CachingManager(self.manager)
+        self.assertIsInstance(manager, BaseManager)
+        self.assertTupleEqual(manager.fields, ('id', 'name',))
+
+    def test_retrieve(self):
+        """
+        Tests that retrieve is only called once
+        per lookup keys and returns copies.
+        """
+        manager = CachingManager(self.manager)
+        first = manager.retrieve(dict(id=1))
+        first['name'] = 'changed'
+        self.assertDictEqual(manager.retrieve(dict(id=1)), dict(id=1, name='a'))
+        self.assertEqual(self.manager.retrieve.call_count, 1)
+        manager.retrieve(dict(id=2))
+        self.assertEqual(self.manager.retrieve.call_count, 2)
+        self.assertEqual(manager.stats['retrieve'], dict(hits=1, misses=2, evictions=0, size=2))
+        self.manager.retrieve.side_effect = None
+        self.manager.retrieve.return_value = dict(id=1)
+        self.assertDictEqual(manager.retrieve(dict(id=1), fields=('id',)), dict(id=1))
+        self.assertEqual(self.manager.retrieve.call_count, 3)
+        self.assertIsNone(manager.stats['retrieve_list'])
+
+    def test_retrieve_exception(self):
+        """
+        Tests that exceptions are not cached.
+        """
+        self.manager.retrieve.side_effect = KeyError
+        manager = CachingManager(self.manager)
+        self.assertRaises(KeyError, manager.retrieve, dict(id=1))
+        self.assertRaises(KeyError, manager.retrieve, dict(id=1))
+        self.assertEqual(self.manager.retrieve.call_count, 2)
+
+    def test_retrieve_list(self):
+        """
+        Tests that lists are only cached if enabled.
+        """
+        manager = CachingManager(self.manager)
+        manager.retrieve_list(dict(name='a'))
+        manager.retrieve_list(dict(name='a'))
+        self.assertEqual(self.manager.retrieve_list.call_count, 2)
+
+        manager = CachingManager(self.manager, cache_lists=True)
+        rows, meta = manager.retrieve_list(dict(name='a', count=1))
+        rows[0]['id'] = 2
+        rows, meta = manager.retrieve_list(dict(count=1, name='a'))
+        self.assertListEqual(rows, [dict(id=1)])
+        self.assertEqual(self.manager.retrieve_list.call_count, 3)
+
+    def test_write_invalidation(self):
+        """
+        Tests that writes invalidate the affected
+        objects and every list.
+        """
+        manager = CachingManager(self.manager, cache_lists=True)
+        for method, args in [('create', (dict(id=3),)),
+                             ('update', (dict(id=1), dict(name='b'))),
+                             ('delete', (dict(id=1),)),
+                             ('bulk_create', ([dict(id=3)],)),
+                             ('bulk_update', ([(dict(id=1), dict(name='b'))],)),
+                             ('bulk_delete', ([dict(id=1)],))]:
+            manager.clear()
+            manager.retrieve(dict(id=1))
+            manager.retrieve(dict(id=2))
+            manager.retrieve_list(dict())
+            getattr(manager, method)(*args)
+            getattr(self.manager, method).assert_called_once_with(*args)
+            self.assertNotIn(_normalize(dict()), manager.list_cache)
+            self.assertIn(_normalize(dict(id=2)), manager.retrieve_cache)
+            self.assertEqual(_normalize(dict(id=1)) in manager.retrieve_cache,
+                             method in ('create', 'bulk_create'))
+
+    def test_retrieve_many(self):
+        """
+        Tests that only the objects that are not
+        cached are retrieved.
+        """
+        self.manager.retrieve_many.side_effect = lambda keys: [
+            dict(k, name='b') if k['id'] != 4 else None for k in keys]
+        manager = CachingManager(self.manager)
+        manager.retrieve(dict(id=1))
+        results = manager.retrieve_many([dict(id=1), dict(id=2), dict(id=4)])
+        self.assertListEqual(results, [dict(id=1, name='a'), dict(id=2, name='b'), None])
+        self.manager.retrieve_many.assert_called_once_with([dict(id=2), dict(id=4)])
+        self.assertDictEqual(manager.retrieve(dict(id=2)), dict(id=2, name='b'))
+        self.assertEqual(self.manager.retrieve.call_count, 1)
+
+    def test_write_during_read(self):
+        """
+        Tests that a read that started before
+        a write is not cached.
+        """
+        manager = CachingManager(self.manager)
+
+        def retrieve(lookup_keys):
+            manager.update(lookup_keys, dict(name='b'))
+            return dict(lookup_keys, name='a')
+
+        self.manager.retrieve.side_effect = retrieve
+        manager.retrieve(dict(id=1))
+        self.assertEqual(len(manager.retrieve_cache), 0)
@@ -3,14 +3,17 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import gc
 import mock
 import six
 import unittest2
 
 from ripozo.decorators import apimethod, translate, _apiclassmethod, \
-    classproperty, ClassPropertyDescriptor, manager_translate
+    classproperty, ClassPropertyDescriptor, manager_translate, cached_classproperty
 from ripozo.exceptions import TranslationException
 from ripozo.resources.fields.common import IntegerField
+from ripozo.resources.loader import get_current_loader
+from ripozo.resources.relationships import ListRelationship, Relationship
 from ripozo.resources.request import RequestContainer
 from ripozo.resources.resource_base import ResourceBase
 
@@ -65,6 +68,79 @@ class TestApiMethodDecorator(unittest2.TestCase):
         self.assertEqual(post1.call_count, 1)
         self.assertEqual(post2.call_count, 1)
 
+    def test_current_loader(self):
+        """
+        Tests that the loader of the request is the current
+        loader while the apimethod and processors run.
+        """
+        request = RequestContainer()
+        loaders = []
+
+        def processor(*args, **kwargs):
+            loaders.append(get_current_loader())
+
+        class Blah(object):
+            preprocessors = [processor]
+            postprocessors = [processor]
+
+            @apimethod()
+            def fake(cls, req):
+                processor()
+
+        loader = request.loader
+        Blah.fake(request)
+        self.assertListEqual(loaders, [loader] * 3)
+        self.assertIsNone(get_current_loader())
+
+    def test_loader_only_when_fetching(self):
+        """
+        Tests that a loader is only created for classes
+        that are related to a class with a fetching relationship.
+        """
+        loaders = []
+
+        class NoFetch(ResourceBase):
+            @apimethod()
+            def fake(cls, req):
+                loaders.append(get_current_loader())
+
+        class Fetched(ResourceBase):
+            pks = ('id',)
+
+        class Fetching(ResourceBase):
+            _relationships = (Relationship('fetched', relation='Fetched', fetch=True),)
+
+        class Parent(ResourceBase):
+            _relationships = (ListRelationship('children', relation='Fetching'),)
+
+            @apimethod()
+            def fake(cls, req):
+                loaders.append(get_current_loader())
+
+        request = RequestContainer()
+        NoFetch.fake(request)
+        self.assertListEqual(loaders, [None])
+        self.assertIsNone(request._loader)
+
+        Parent.fake(request)
+        self.assertIsNotNone(request._loader)
+        self.assertIs(loaders[1], request._loader)
+
+        # the result is cached per class
+        with mock.patch('ripozo.decorators._find_fetching') as find:
+            Parent.fake(RequestContainer())
+            self.assertEqual(find.call_count, 0)
+
+        # requests without a loader are supported
+        Parent.fake(object())
+        self.assertIsNone(loaders[-1])
+
+        # the cached result is discarded when the relationships change
+        Parent._relationships = ()
+        request = RequestContainer()
+        Parent.fake(request)
+        self.assertIsNone(request._loader)
+
     def test_wrapping_apimethod(self):
         """
         Tests wrapping an apimethod and calling it.
@@ -116,6 +192,32 @@ class TestApiMethodDecorator(unittest2.TestCase):
         func_resp = resp(str)
         self.assertEqual(mck.call_args_list[2][0][0], str)
 
+    def test_apiclassmethod_bound_cached(self):
+        """
+        Tests that the wrapper is created once per
+        class and does not keep the class alive.
+        """
+        class MyClass(object):
+            @_apiclassmethod
+            def fake(cls):
+                return cls
+
+        class SubClass(MyClass):
+            pass
+
+        self.assertIs(MyClass.fake, MyClass.fake)
+        self.assertIs(MyClass.fake, MyClass().fake)
+        self.assertIsNot(MyClass.fake, SubClass.fake)
+        self.assertEqual(MyClass.fake(), MyClass)
+        self.assertEqual(SubClass.fake(), SubClass)
+        self.assertEqual(SubClass().fake(), SubClass)
+
+        descriptor = MyClass.__dict__['fake']
+        self.assertEqual(len(descriptor._bound), 2)
+        del SubClass
+        gc.collect()
+        self.assertEqual(len(descriptor._bound), 1)
+
     def test_nested_apiclassmethod(self):
         """
         Tests that the _apiclassmethod decorator works
@@ -237,6 +339,55 @@ class TestApiMethodDecorator(unittest2.TestCase):
         self.assertEqual(getattr(f, 'hello'), 'another')
         self.assertEqual(getattr(Fake, 'hello'), 'another')
 
+    def test_cached_class_property(self):
+        """
+        Tests that the cached_classproperty is only
+        computed once per class and is recomputed when
+        a dependency is reassigned.
+        """
+        calls = []
+
+        class Fake(object):
+            x = 'hi'
+            y = 'unrelated'
+
+            @cached_classproperty('x')
+            def hello(cls):
+                calls.append(cls)
+                return cls.x, cls.__name__
+
+        class Fake2(Fake):
+            pass
+
+        self.assertEqual(Fake.hello, ('hi', 'Fake'))
+        self.assertEqual(Fake().hello, ('hi', 'Fake'))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(Fake2.hello, ('hi', 'Fake2'))
+        self.assertEqual(len(calls), 2)
+
+        Fake.y = 'changed'
+        self.assertEqual(Fake.hello, ('hi', 'Fake'))
+        self.assertEqual(len(calls), 2)
+
+        Fake.x = 'another'
+        self.assertEqual(Fake.hello, ('another', 'Fake'))
+        self.assertEqual(Fake2.hello, ('another', 'Fake2'))
+        self.assertEqual(len(calls), 4)
+
+    def test_translation_plan_compiled_once(self):
+        """
+        Tests that the translation plan of static
+        fields is only compiled once.
+        """
+        field = IntegerField('id')
+        decorator = translate(fields=[field], validate=True)
+        plan = decorator.translation_plan(None)
+        self.assertIs(plan, decorator.translation_plan(None))
+        self.assertTupleEqual(plan.fields, (field,))
+        self.assertTrue(plan.validate)
+        decorator.original_fields.append(IntegerField('other'))
+        self.assertEqual(len(decorator.translation_plan(None).fields), 2)
+
     def test_translate_failure(self):
         """
         Tests whether the translate decorator appropriately
@@ -303,3 +454,57 @@ class TestManagerTranslate(unittest2.TestCase):
         rsp = mt.fields(mck_manager)
         self.assertEqual([orig, v1, v3], rsp)
 
+
+    def test_fields_cached(self):
+        """
+        Tests that the fields are resolved once per manager
+        and again when the manager's fields change.
+        """
+        class Manager(object):
+            fields = ('id', 'name',)
+            create_fields = ('name',)
+            _field_validators = None
+            calls = []
+
+            @classproperty
+            def field_validators(cls):
+                cls.calls.append(1)
+                if cls._field_validators is None:
+                    cls._field_validators = {}
+                for name in cls.fields:
+                    cls._field_validators.setdefault(name, IntegerField(name))
+                return list(cls._field_validators.values())
+
+        mt = manager_translate(fields_attr='create_fields')
+        first = mt.fields(Manager)
+        self.assertListEqual([field.name for field in first], ['name'])
+        self.assertListEqual(mt.fields(Manager), first)
+        plan = mt.translation_plan(Manager)
+        self.assertIs(plan, mt.translation_plan(Manager))
+        self.assertEqual(len(Manager.calls), 1)
+
+        Manager.create_fields = ('name', 'id',)
+        self.assertEqual(len(mt.fields(Manager)), 2)
+        self.assertIsNot(plan, mt.translation_plan(Manager))
+        self.assertEqual(len(Manager.calls), 2)
+
+        Manager.fields = ('id', 'name', 'other',)
+        Manager.create_fields = ('name', 'other',)
+        self.assertListEqual(sorted(field.name for field in mt.fields(Manager)),
+                             ['name', 'other'])
+        self.assertEqual(len(Manager.calls), 3)
+
+        other_field = IntegerField('name')
+        Manager._field_validators = dict(name=other_field)
+        self.assertIn(other_field, mt.fields(Manager))
+        self.assertEqual(len(Manager.calls), 4)
+        mt.fields(Manager)
+        self.assertEqual(len(Manager.calls), 4)
+
+        # replacing a single validator in place
+        replaced = IntegerField('name', minimum=5)
+        Manager._field_validators['name'] = replaced
+        self.assertIn(replaced, mt.fields(Manager))
+        self.assertNotIn(other_field, mt.fields(Manager))
+        self.assertIsNot(plan, mt.translation_plan(Manager))
+        self.assertIn(replaced, mt.translation_plan(Manager).fields)
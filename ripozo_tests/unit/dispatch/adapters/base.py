@@ -7,7 +7,7 @@ import unittest2
 import json
 
 from ripozo import RequestContainer
-from ripozo.adapters.base import AdapterBase
+from ripozo.adapters.base import AdapterBase, ChunkedList, iter_json_chunks
 from ripozo.resources.relationships import Relationship, ListRelationship
 from ripozo.resources.resource_base import ResourceBase
 from ripozo.exceptions import RestException
@@ -94,6 +94,53 @@ class TestAdapterBase(unittest2.TestCase):
         self.assertEqual(status_code, 458)
         self.assertEqual(data['message'], 'blah blah')
 
+    def test_json_encoder(self):
+        """
+        Tests that the json_encoder can be overridden
+        per class and per instance.
+        """
+        class EncoderAdapter(TestAdapter):
+            json_encoder = staticmethod(lambda obj: 'class')
+
+        exc = RestException('blah blah', status_code=458)
+        self.assertEqual(EncoderAdapter.format_exception(exc)[0], 'class')
+        adapter = EncoderAdapter(ResourceBase())
+        self.assertEqual(adapter.json_encoder({}), 'class')
+        adapter = EncoderAdapter(ResourceBase(), json_encoder=lambda obj: 'instance')
+        self.assertEqual(adapter.json_encoder({}), 'instance')
+
+    def test_formatted_body_chunks(self):
+        """
+        Tests that the default implementation yields
+        the formatted body.
+        """
+        class BodyAdapter(TestAdapter):
+            formatted_body = '{}'
+
+        self.assertEqual(list(BodyAdapter(ResourceBase()).formatted_body_chunks()), ['{}'])
+
+    def test_iter_json_chunks(self):
+        """
+        Tests that chunked lists are encoded item by item
+        and joined into valid json.
+        """
+        obj = dict(a=ChunkedList(iter([dict(x=1), dict(y=ChunkedList([1, 2]))])),
+                   b=dict(c=ChunkedList([])), d=[1, 2])
+        chunks = list(iter_json_chunks(obj, json.dumps))
+        self.assertGreater(len(chunks), 5)
+        self.assertEqual(json.loads(''.join(chunks)),
+                         dict(a=[dict(x=1), dict(y=[1, 2])], b=dict(c=[]), d=[1, 2]))
+        self.assertEqual(list(iter_json_chunks(dict(x=[1]), json.dumps)), [json.dumps(dict(x=[1]))])
+
+    def test_iter_json_chunks_keys(self):
+        """
+        Tests that keys that are not strings are
+        converted like the stdlib json module does.
+        """
+        obj = {2: ChunkedList([1]), True: 'a', None: 'b', 'c': 'd'}
+        body = ''.join(iter_json_chunks(obj, json.dumps))
+        self.assertEqual(json.loads(body), {'2': [1], 'true': 'a', 'null': 'b', 'c': 'd'})
+
     def test_format_request(self):
         """Dumb test for format_request"""
         request = RequestContainer()
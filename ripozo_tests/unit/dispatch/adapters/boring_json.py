@@ -8,7 +8,7 @@ import json
 import six
 import unittest2
 
-from ripozo import ResourceBase
+from ripozo import ResourceBase, ListRelationship
 from ripozo.adapters import BasicJSONAdapter
 from ripozo.exceptions import RestException
 from ripozo.resources.request import RequestContainer
@@ -86,3 +86,23 @@ class TestBoringJSONAdapter(unittest2.TestCase):
         rel_dict = {}
         BasicJSONAdapter._append_relationships_to_list(rel_dict, relationships)
         self.assertDictEqual(dict(name=[dict(id=1)]), rel_dict)
+
+    def test_formatted_body_chunks(self):
+        """
+        Tests that the chunked body is equivalent
+        to the formatted body.
+        """
+        class ChunkChild(ResourceBase):
+            pks = ('id',)
+
+        class ChunkParent(ResourceBase):
+            pks = ('id',)
+            _relationships = (ListRelationship('children', relation='ChunkChild', embedded=True),)
+
+        def get_adapter():
+            children = [dict(id=i, value=i) for i in range(5)]
+            return BasicJSONAdapter(ChunkParent(properties=dict(id=1, name='x', children=children)))
+
+        chunks = list(get_adapter().formatted_body_chunks())
+        self.assertGreater(len(chunks), 5)
+        self.assertEqual(json.loads(''.join(chunks)), json.loads(get_adapter().formatted_body))
@@ -7,7 +7,7 @@ import json
 import six
 import unittest2
 
-from ripozo import ResourceBase
+from ripozo import ResourceBase, ListRelationship
 from ripozo.adapters import HalAdapter
 from ripozo.resources.constructor import ResourceMetaClass
 from ripozo.resources.request import RequestContainer
@@ -183,3 +183,26 @@ class TestHalAdapter(unittest2.TestCase):
         request = RequestContainer()
         response = HalAdapter.format_request(request)
         self.assertIs(response, request)
+
+    def test_formatted_body_chunks(self):
+        """
+        Tests that the chunked body is equivalent
+        to the formatted body.
+        """
+        class ChunkChild(ResourceBase):
+            pks = ('id',)
+
+        class ChunkParent(ResourceBase):
+            pks = ('id',)
+            _relationships = (ListRelationship('children', relation='ChunkChild', embedded=True),)
+
+        def get_adapter():
+            children = [dict(id=i, value=i) for i in range(5)]
+            return HalAdapter(ChunkParent(properties=dict(id=1, name='x', children=children)))
+
+        chunks = list(get_adapter().formatted_body_chunks())
+        self.assertGreater(len(chunks), 5)
+        self.assertEqual(json.loads(''.join(chunks)), json.loads(get_adapter().formatted_body))
+        adapter = HalAdapter(ChunkParent(properties=dict(id=1, children=[dict(value=1)])))
+        data = json.loads(''.join(adapter.formatted_body_chunks()))
+        self.assertNotIn('children', data['_embedded'])
@@ -116,6 +116,21 @@ class TestJSONAPIAdapter(unittest2.TestCase):
         req = RequestContainer(body_args=dict(data=dict(id=1)))
         self.assertRaises(JSONAPIFormatException, JSONAPIAdapter.format_request, req)
 
+    def test_format_request_raw_body(self):
+        """
+        Tests that a raw body is unwrapped when it
+        is decoded instead of by format_request.
+        """
+        req = RequestContainer(raw_body=b'{"data": {"attributes": {"id": 1}}}',
+                               content_type='application/vnd.api+json')
+        resp = JSONAPIAdapter.format_request(req)
+        self.assertIsNone(resp._body_args)
+        self.assertDictEqual(resp.body_args, dict(id=1))
+
+        req = JSONAPIAdapter.format_request(RequestContainer(raw_body=b'{"id": 1}',
+                                                             content_type='application/json'))
+        self.assertRaises(JSONAPIFormatException, getattr, req, 'body_args')
+
     def test_format_request_relationships(self):
         """
         Tests that relationships are appropriately reformatted
@@ -301,3 +316,23 @@ class TestJSONAPIAdapter(unittest2.TestCase):
         self.assertEqual(data['links'], dict(self='/my_resource'))
         self.assertEqual(data['id'], '')
         self.assertEqual(data['type'], 'my_resource')
+
+    def test_formatted_body_chunks(self):
+        """
+        Tests that the chunked body is equivalent
+        to the formatted body.
+        """
+        class ChunkChild(ResourceBase):
+            pks = ('id',)
+
+        class ChunkParent(ResourceBase):
+            pks = ('id',)
+            _relationships = (ListRelationship('children', relation='ChunkChild', embedded=True),)
+
+        def get_adapter():
+            children = [dict(id=i, value=i) for i in range(5)]
+            return JSONAPIAdapter(ChunkParent(properties=dict(id=1, name='x', children=children)))
+
+        chunks = list(get_adapter().formatted_body_chunks())
+        self.assertGreater(len(chunks), 5)
+        self.assertEqual(json.loads(''.join(chunks)), json.loads(get_adapter().formatted_body))
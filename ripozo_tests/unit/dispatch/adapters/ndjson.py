@@ -0,0 +1,159 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import json
+import types
+import unittest2
+
+from ripozo import ResourceBase, ListRelationship, Relationship, restmixins
+from ripozo.adapters import NDJSONAdapter
+from ripozo.exceptions import RestException
+from ripozo.resources.request import RequestContainer
+from ripozo_tests.helpers.inmemory_manager import InMemoryManager
+
+
+class TestNDJSONAdapter(unittest2.TestCase):
+    """
+    Tests the NDJSONAdapter
+    """
+
+    def get_list_resource(self, count=3):
+        class NDItem(ResourceBase):
+            pks = ('id',)
+
+        class NDList(ResourceBase):
+            _relationships = (ListRelationship('items', relation='NDItem', embedded=True),)
+
+        items = [dict(id=i, value='v{0}'.format(i)) for i in range(count)]
+        return NDList(properties=dict(items=items), no_pks=True)
+
+    def test_list_resource(self):
+        """
+        Tests that each item is written on its own line
+        """
+        adapter = NDJSONAdapter(self.get_list_resource())
+        chunks = adapter.formatted_body_chunks()
+        self.assertIsInstance(chunks, types.GeneratorType)
+        lines = list(chunks)
+        self.assertEqual(len(lines), 3)
+        for i, line in enumerate(lines):
+            self.assertTrue(line.endswith('\n'))
+            self.assertEqual(json.loads(line), dict(id=i, value='v{0}'.format(i)))
+        self.assertEqual(adapter.formatted_body, ''.join(lines))
+
+    def test_empty_list_resource(self):
+        """
+        Tests that an empty list writes nothing.
+        """
+        adapter = NDJSONAdapter(self.get_list_resource(count=0))
+        self.assertEqual(adapter.formatted_body, '')
+
+    def test_single_resource(self):
+        """
+        Tests that a resource that is not a list
+        is written as a single line.
+        """
+        class NDRelated(ResourceBase):
+            pks = ('id',)
+
+        class NDSingle(ResourceBase):
+            pks = ('id',)
+            _relationships = (Relationship('related', relation='NDRelated'),)
+
+        resource = NDSingle(properties=dict(id=1, name='x', related=dict(id=2)))
+        body = NDJSONAdapter(resource).formatted_body
+        self.assertEqual(body.count('\n'), 1)
+        self.assertEqual(json.loads(body), dict(id=1, name='x', related=[dict(id=2)]))
+
+    def test_crudl_resource(self):
+        """
+        Tests that the single item responses of a CRUDL
+        resource are written as one line and its list
+        responses as one line per item.
+        """
+        class NDManager(InMemoryManager):
+            fields = ('id', 'value',)
+
+        class NDThing(restmixins.CRUDL):
+            manager = NDManager()
+            pks = ('id',)
+
+        def encoder(obj):
+            return json.dumps(obj, default=str)  # the ids are uuids
+
+        created = NDThing.create(RequestContainer(body_args=dict(value='a')))
+        body = NDJSONAdapter(created, json_encoder=encoder).formatted_body
+        self.assertEqual(body.count('\n'), 1)
+        id_ = created.properties['id']
+        self.assertEqual(json.loads(body)['value'], 'a')
+
+        retrieved = NDThing.retrieve(RequestContainer(url_params=dict(id=id_)))
+        body = NDJSONAdapter(retrieved, json_encoder=encoder).formatted_body
+        self.assertEqual(body.count('\n'), 1)
+        self.assertEqual(json.loads(body)['value'], 'a')
+
+        NDThing.create(RequestContainer(body_args=dict(value='b')))
+        adapter = NDJSONAdapter(NDThing.retrieve_list(RequestContainer()), json_encoder=encoder)
+        body = adapter.formatted_body
+        self.assertListEqual(sorted(json.loads(line)['value'] for line in body.splitlines()),
+                             ['a', 'b'])
+
+    def test_empty_response(self):
+        """
+        Tests that a 204 has an empty body
+        """
+        adapter = NDJSONAdapter(ResourceBase(status_code=204))
+        self.assertEqual(adapter.formatted_body, '')
+
+    def test_format_exception(self):
+        """
+        Tests formatting exceptions
+        """
+        body, content_type, status_code = NDJSONAdapter.format_exception(
+            RestException('blah', status_code=400))
+        self.assertEqual(content_type, 'ndjson')
+        self.assertEqual(status_code, 400)
+        self.assertEqual(json.loads(body), dict(status=400, message='blah'))
+
+    def test_content_header(self):
+        """
+        Tests the content type header
+        """
+        adapter = NDJSONAdapter(ResourceBase())
+        self.assertEqual(adapter.extra_headers, {'Content-Type': 'application/x-ndjson'})
+
+    def test_pagination_links(self):
+        """
+        Tests that the links of a list resource (e.g. the
+        next page) are sent in the Link header.
+        """
+        class NDPageManager(InMemoryManager):
+            fields = ('id', 'value',)
+            paginate_by = 2
+
+        class NDPage(restmixins.CRUDL):
+            manager = NDPageManager()
+            pks = ('id',)
+
+        def encoder(obj):
+            return json.dumps(obj, default=str)  # the ids are uuids
+
+        for i in range(3):
+            NDPage.manager.create(dict(value='v{0}'.format(i)))
+        adapter = NDJSONAdapter(NDPage.retrieve_list(RequestContainer()),
+                                base_url='http://host', json_encoder=encoder)
+        self.assertEqual(len(adapter.formatted_body.splitlines()), 2)
+        link = adapter.extra_headers['Link']
+        self.assertTrue(link.startswith('<http://host/nd_page?'), link)
+        self.assertTrue(link.endswith('>; rel="next"'), link)
+        self.assertIn('pagination_pk=1', link)
+        self.assertNotIn('Link', NDJSONAdapter(ResourceBase(no_pks=True)).extra_headers)
+
+    def test_format_request(self):
+        """
+        Tests that the request is returned unchanged
+        """
+        request = RequestContainer()
+        self.assertIs(NDJSONAdapter.format_request(request), request)
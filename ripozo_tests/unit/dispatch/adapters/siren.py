@@ -8,13 +8,16 @@ import json
 import mock
 import six
 
+from ripozo.decorators import apimethod, translate, manager_translate
 from ripozo.adapters import SirenAdapter
 from ripozo.exceptions import RestException
 from ripozo.resources.relationships import Relationship, ListRelationship
 from ripozo.resources.request import RequestContainer
 from ripozo.resources.resource_base import ResourceBase
 from ripozo.resources.constants import input_categories
+from ripozo.resources.fields.common import StringField
 from ripozo_tests.helpers.hello_world_viewset import get_refreshed_helloworld_viewset
+from ripozo_tests.helpers.inmemory_manager import InMemoryManager
 from ripozo_tests.unit.dispatch.adapters.base import TestAdapterBase
 
 
@@ -248,3 +251,86 @@ class TestSirenAdapter(TestAdapterBase):
         request = RequestContainer()
         response = SirenAdapter.format_request(request)
         self.assertIs(response, request)
+
+    def test_formatted_body_chunks(self):
+        """
+        Tests that the chunked body is equivalent
+        to the formatted body.
+        """
+        class ChunkChild(ResourceBase):
+            pks = ('id',)
+
+        class ChunkParent(ResourceBase):
+            pks = ('id',)
+            _relationships = (ListRelationship('children', relation='ChunkChild', embedded=True),)
+
+        def get_adapter():
+            children = [dict(id=i, value=i) for i in range(5)]
+            return SirenAdapter(ChunkParent(properties=dict(id=1, name='x', children=children)))
+
+        chunks = list(get_adapter().formatted_body_chunks())
+        self.assertGreater(len(chunks), 5)
+        self.assertEqual(json.loads(''.join(chunks)), json.loads(get_adapter().formatted_body))
+        resource = ChunkParent(properties=dict(id=1), status_code=204)
+        self.assertEqual(list(SirenAdapter(resource).formatted_body_chunks()), [])
+
+    def test_actions_compiled_once(self):
+        """
+        Tests that the static part of the actions is compiled
+        once per resource class while the hrefs are filled
+        in for every resource.
+        """
+        class ActionResource(ResourceBase):
+            pks = ('id',)
+            manager = None
+
+            @apimethod(route='/action', methods=['POST'])
+            @translate(fields=[StringField('name', required=True)])
+            def do_action(cls, request):
+                pass
+
+        with mock.patch.object(SirenAdapter, 'generate_fields_for_endpoint_funct',
+                               return_value=[]) as generate_fields:
+            first = SirenAdapter(ActionResource(properties=dict(id=1)))._actions
+            second = SirenAdapter(ActionResource(properties=dict(id=2)))._actions
+            self.assertEqual(generate_fields.call_count, 1)
+            self.assertEqual(first[0]['href'], '/action_resource/1/action')
+            self.assertEqual(second[0]['href'], '/action_resource/2/action')
+            self.assertEqual(second[0]['method'], 'POST')
+            self.assertEqual(second[0]['title'], 'Do Action')
+
+            ActionResource.manager = object()
+            SirenAdapter(ActionResource(properties=dict(id=3)))._actions
+            self.assertEqual(generate_fields.call_count, 2)
+
+    def test_actions_manager_fields_changed(self):
+        """
+        Tests that the actions are recompiled when the fields
+        of the manager change and that the field dictionaries
+        of one response are not shared with another.
+        """
+        class SirenFieldsManager(InMemoryManager):
+            fields = ('id', 'name',)
+
+        class SirenFieldsResource(ResourceBase):
+            pks = ('id',)
+            manager = SirenFieldsManager()
+
+            @apimethod(methods=['POST'])
+            @manager_translate(fields_attr='fields')
+            def create(cls, request):
+                pass
+
+        def field_names():
+            actions = SirenAdapter(SirenFieldsResource(properties=dict(id=1)))._actions
+            return sorted(field['name'] for field in actions[0]['fields'])
+
+        self.assertListEqual(field_names(), ['id', 'name'])
+        SirenFieldsManager.fields = ('id', 'name', 'other',)
+        self.assertListEqual(field_names(), ['id', 'name', 'other'])
+
+        first = SirenAdapter(SirenFieldsResource(properties=dict(id=1)))._actions
+        name = first[0]['fields'][0]['name']
+        first[0]['fields'][0]['name'] = 'changed'
+        second = SirenAdapter(SirenFieldsResource(properties=dict(id=2)))._actions
+        self.assertEqual(second[0]['fields'][0]['name'], name)
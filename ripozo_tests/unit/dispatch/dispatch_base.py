@@ -9,9 +9,12 @@ import unittest2
 
 from ripozo import ResourceBase
 from ripozo.adapters import BasicJSONAdapter, HalAdapter, SirenAdapter
-from ripozo.dispatch_base import DispatcherBase
-from ripozo.exceptions import AdapterFormatAlreadyRegisteredException
+from ripozo.caching import ResponseCache
+from ripozo.decorators import apimethod
+from ripozo.dispatch_base import DispatcherBase, parse_accept_header
+from ripozo.exceptions import AdapterFormatAlreadyRegisteredException, RestException
 from ripozo.resources.constructor import ResourceMetaClass
+from ripozo.resources.request import RequestContainer
 from ripozo_tests.helpers.dispatcher import FakeDispatcher
 
 
@@ -48,6 +51,110 @@ class TestDispatchBase(unittest2.TestCase):
         self.assertEqual(adapter.call_count, 1)
         self.assertEqual(endpoint_func.call_count, 1)
 
+    def test_dispatch_json_encoder(self):
+        """
+        Tests that the dispatcher's json_encoder is
+        passed to the adapter only if it is set.
+        """
+        encoder = mock.Mock()
+        adapter = MagicMock()
+        adapter.formats = ['fake']
+        self.dispatcher.register_adapters(adapter)
+        self.dispatcher.dispatch(MagicMock(), 'fake', MagicMock())
+        self.assertNotIn('json_encoder', adapter.call_args[1])
+        dispatcher = FakeDispatcher(json_encoder=encoder)
+        dispatcher.register_adapters(adapter)
+        dispatcher.dispatch(MagicMock(), 'fake', MagicMock())
+        self.assertIs(adapter.call_args[1]['json_encoder'], encoder)
+
+    def test_dispatch_response_cache(self):
+        """
+        Tests that safe endpoints are served from the
+        response cache and other endpoints invalidate it.
+        """
+        calls = []
+
+        class CachedResource(ResourceBase):
+            pks = ('id',)
+
+            @apimethod(methods=['GET'])
+            def retrieve(cls, request):
+                calls.append('retrieve')
+                return cls(properties=dict(id=request.get('id'), count=len(calls)))
+
+            @apimethod(methods=['PATCH'])
+            def update(cls, request):
+                calls.append('update')
+                return cls(properties=dict(id=request.get('id')))
+
+        dispatcher = FakeDispatcher(response_cache=ResponseCache())
+        dispatcher.register_adapters(BasicJSONAdapter)
+        dispatcher.register_resources(CachedResource)
+        retrieve = dispatcher.routes['CachedResource__retrieve'][0]['endpoint_func']
+        update = dispatcher.routes['CachedResource__update'][0]['endpoint_func']
+
+        def get(**headers):
+            return dispatcher.dispatch(retrieve, [], RequestContainer(url_params=dict(id=1),
+                                                                      headers=headers))
+
+        first = get()
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('ETag', first.extra_headers)
+        self.assertIsInstance(first.resource, CachedResource)
+        second = get()
+        self.assertEqual(second.formatted_body, first.formatted_body)
+        self.assertIsNone(second.resource)
+        self.assertEqual(calls, ['retrieve'])
+
+        not_modified = get(**{'If-None-Match': first.etag})
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.formatted_body, '')
+        self.assertEqual(calls, ['retrieve'])
+
+        adapter = dispatcher.dispatch(update, [], RequestContainer(url_params=dict(id=1)))
+        self.assertIsInstance(adapter, BasicJSONAdapter)
+        third = get(**{'If-None-Match': first.etag})
+        self.assertEqual(third.status_code, 200)
+        self.assertNotEqual(third.etag, first.etag)
+        self.assertEqual(calls, ['retrieve', 'update', 'retrieve'])
+
+    def test_dispatch_response_cache_preprocessors(self):
+        """
+        Tests that the preprocessors run for cached responses
+        and that the responses are cached per Authorization header.
+        """
+        calls = []
+
+        def auth(cls, name, request, *args, **kwargs):
+            calls.append(name)
+            if request.headers.get('Authorization') not in ('ok', 'other'):
+                raise RestException('Unauthorized', status_code=401)
+
+        class AuthResource(ResourceBase):
+            pks = ('id',)
+            preprocessors = (auth,)
+
+            @apimethod(methods=['GET'])
+            def retrieve(cls, request):
+                return cls(properties=dict(id=1, user=request.headers['Authorization']))
+
+        dispatcher = FakeDispatcher(response_cache=ResponseCache())
+        dispatcher.register_adapters(BasicJSONAdapter)
+        dispatcher.register_resources(AuthResource)
+        retrieve = dispatcher.routes['AuthResource__retrieve'][0]['endpoint_func']
+
+        def get(**headers):
+            return dispatcher.dispatch(retrieve, [], RequestContainer(headers=headers))
+
+        first = get(Authorization='ok')
+        self.assertEqual(first.status_code, 200)
+        self.assertRaises(RestException, get)
+        self.assertEqual(calls, ['retrieve', 'retrieve'])
+        self.assertEqual(get(Authorization='ok').formatted_body, first.formatted_body)
+        self.assertEqual(calls, ['retrieve'] * 3)
+        other = get(Authorization='other')
+        self.assertNotEqual(other.formatted_body, first.formatted_body)
+
     def test_register_adapters(self):
         """Tests whether adapters are properly registered"""
         adapters = (SirenAdapter, HalAdapter, BasicJSONAdapter,)
@@ -127,6 +234,68 @@ class TestDispatchBase(unittest2.TestCase):
         adapter2 = disp.get_adapter_for_type(['application/hal+json', 'application/vnd.siren+json'])
         self.assertEqual(adapter2, HalAdapter)
 
+    def test_get_adapter_for_accept_header(self):
+        """
+        Tests that raw Accept headers are parsed
+        respecting the quality values and wildcards.
+        """
+        disp = FakeDispatcher()
+        disp.register_adapters(SirenAdapter, HalAdapter, BasicJSONAdapter)
+        self.assertEqual(disp.get_adapter_for_type('application/hal+json'), HalAdapter)
+        header = 'application/vnd.siren+json;q=0.5, application/hal+json'
+        self.assertEqual(disp.get_adapter_for_type(header), HalAdapter)
+        header = 'text/html, application/json;q=0.9, */*;q=0.8'
+        self.assertEqual(disp.get_adapter_for_type(header), BasicJSONAdapter)
+        self.assertEqual(disp.get_adapter_for_type('text/html, */*;q=0.1'), SirenAdapter)
+        self.assertEqual(disp.get_adapter_for_type('text/html'), SirenAdapter)
+        self.assertEqual(disp.get_adapter_for_type(''), SirenAdapter)
+        self.assertEqual(disp.get_adapter_for_type('application/*'), SirenAdapter)
+        header = 'application/vnd.siren+json;q=0, application/*'
+        self.assertNotEqual(disp.get_adapter_for_type(header), SirenAdapter)
+        header = 'application/hal+json;q=0, application/vnd.siren+json;q=0, application/*'
+        self.assertEqual(disp.get_adapter_for_type(header), BasicJSONAdapter)
+        header = 'application/vnd.siren+json;q=0, */*'
+        self.assertEqual(disp.get_adapter_for_type(header), HalAdapter)
+        header = 'application/vnd.siren+json;q=0, application/hal+json;q=0, */*'
+        self.assertEqual(disp.get_adapter_for_type(header), BasicJSONAdapter)
+
+        class TextAdapter(BasicJSONAdapter):
+            formats = ['text/plain']
+
+        disp.register_adapters(TextAdapter)
+        header = 'application/*;q=0, */*'
+        self.assertEqual(disp.get_adapter_for_type(header), TextAdapter)
+        header = 'application/*;q=0, application/hal+json, */*;q=0.5'
+        self.assertEqual(disp.get_adapter_for_type(header), HalAdapter)
+        header = 'text/*;q=0, application/json;q=0.1, text/plain;q=0.5'
+        self.assertEqual(disp.get_adapter_for_type(header), TextAdapter)
+
+    def test_get_adapter_for_accept_header_cached(self):
+        """
+        Tests that the negotiated adapter is cached per
+        header and that the cache is cleared when the
+        adapters change.
+        """
+        disp = FakeDispatcher()
+        disp.register_adapters(SirenAdapter)
+        header = 'application/hal+json, */*;q=0.1'
+        self.assertEqual(disp.get_adapter_for_type(header), SirenAdapter)
+        with mock.patch.object(disp, '_negotiate_adapter') as negotiate:
+            self.assertEqual(disp.get_adapter_for_type(header), SirenAdapter)
+            self.assertFalse(negotiate.called)
+        disp.register_adapters(HalAdapter)
+        self.assertEqual(disp.get_adapter_for_type(header), HalAdapter)
+        disp.default_adapter = BasicJSONAdapter
+        self.assertEqual(disp.get_adapter_for_type('text/html'), BasicJSONAdapter)
+
+    def test_parse_accept_header(self):
+        """
+        Tests parsing raw Accept headers.
+        """
+        parsed = parse_accept_header('text/html;level=1;q=0.5, Application/JSON,*/*; q=bad')
+        self.assertEqual(parsed, [('text/html', 0.5), ('application/json', 1.0), ('*/*', 0.0)])
+        self.assertEqual(parse_accept_header(''), [])
+
     def test_check_relationships(self):
         """
         Tests that warnings are raised when
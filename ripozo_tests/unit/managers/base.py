@@ -3,8 +3,10 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-from ripozo.manager_base import BaseManager
+from ripozo.exceptions import NotFoundException, ValidationException
+from ripozo.manager_base import BaseManager, Cursor
 
+import mock
 import six
 import unittest2
 
@@ -86,3 +88,118 @@ class TestBaseManager(unittest2.TestCase):
         m = FakeManager()
         self.assertEqual(m.paginate_by, m.get_pagination_count(dict())[0])
         self.assertEqual(1, m.get_pagination_count(dict(count=1))[0])
+        self.assertEqual(5, m.get_pagination_count(dict(count='5'))[0])
+        for invalid in ['a', '0', -1, None]:
+            self.assertRaises(ValidationException, m.get_pagination_count, dict(count=invalid))
+        m.max_paginate_by = 10
+        self.assertEqual(10, m.get_pagination_count(dict(count=10))[0])
+        self.assertRaises(ValidationException, m.get_pagination_count, dict(count=11))
+
+    def test_get_projection(self):
+        class M(FakeManager):
+            fields = ('id', 'name', 'value', 'related.id',)
+
+        m = M()
+        self.assertEqual(m.get_projection(dict(a=1)), (None, dict(a=1)))
+        self.assertEqual(m.get_projection(dict(fields='', a=1)), (None, dict(a=1)))
+        projection, filters = m.get_projection(dict(fields='name, value,name', a=1))
+        self.assertTupleEqual(projection, ('name', 'value',))
+        self.assertDictEqual(filters, dict(a=1))
+        projection, filters = m.get_projection(dict(fields=['related.id', 'id']))
+        self.assertTupleEqual(projection, ('related.id', 'id',))
+        self.assertRaises(ValidationException, m.get_projection, dict(fields='name,password'))
+        m.fields_query_arg = 'only'
+        self.assertEqual(m.get_projection(dict(fields='name')), (None, dict(fields='name')))
+        self.assertTupleEqual(m.get_projection(dict(only='name'))[0], ('name',))
+
+    def test_cursor_fields(self):
+        m = FakeManager()
+        self.assertTupleEqual(m.cursor_fields, ('id',))
+        m.order_by = ['name', 'id']
+        self.assertTupleEqual(m.cursor_fields, ('name', 'id',))
+        m.order_by = ['name']
+        m.cursor_pks = ('pk1', 'pk2',)
+        self.assertTupleEqual(m.cursor_fields, ('name', 'pk1', 'pk2',))
+
+    def test_encode_decode_cursor(self):
+        m = FakeManager()
+        m.order_by = ['name']
+        cursor = m.encode_cursor(dict(name='some/name?', id=3, other=1))
+        self.assertIsInstance(cursor, six.text_type)
+        self.assertNotIn('=', cursor)
+        self.assertNotIn('/', cursor)
+        self.assertEqual(m.decode_cursor(cursor), Cursor('next', ('some/name?', 3,)))
+        cursor = m.encode_cursor(dict(name='a', id=1), direction='previous')
+        self.assertEqual(m.decode_cursor(cursor), Cursor('previous', ('a', 1,)))
+
+    def test_decode_invalid_cursor(self):
+        m = FakeManager()
+        other = FakeManager()
+        other.order_by = ['name']
+        invalid = ['not a cursor', '!!!!', '', 'e30', other.encode_cursor(dict(name='a', id=1))]
+        for cursor in invalid:
+            self.assertRaises(ValidationException, m.decode_cursor, cursor)
+
+    def test_get_pagination_cursor(self):
+        m = FakeManager()
+        filters = dict(cursor=m.encode_cursor(dict(id=2)), name='a')
+        cursor, new_filters = m.get_pagination_cursor(filters)
+        self.assertEqual(cursor, Cursor('next', (2,)))
+        self.assertDictEqual(new_filters, dict(name='a'))
+        self.assertIn('cursor', filters)
+        self.assertEqual(m.get_pagination_cursor(dict(name='a')), (None, dict(name='a')))
+
+    def test_get_cursor_links(self):
+        m = FakeManager()
+        rows = [dict(id=1), dict(id=2)]
+        self.assertDictEqual(m.get_cursor_links([], 2, has_more=True), {})
+
+        # First page
+        links = m.get_cursor_links(rows, 2, has_more=True)
+        self.assertListEqual(list(links), ['next'])
+        self.assertEqual(links['next']['count'], 2)
+        self.assertEqual(m.decode_cursor(links['next']['cursor']), Cursor('next', (2,)))
+        self.assertDictEqual(m.get_cursor_links(rows, 2), {})
+
+        # Following a next cursor
+        links = m.get_cursor_links(rows, 2, cursor=Cursor('next', (0,)))
+        self.assertListEqual(list(links), ['previous'])
+        self.assertEqual(m.decode_cursor(links['previous']['cursor']), Cursor('previous', (1,)))
+
+        # Following a previous cursor
+        links = m.get_cursor_links(rows, 2, cursor=Cursor('previous', (3,)), has_more=True)
+        self.assertSetEqual(set(links), set(['next', 'previous']))
+        self.assertEqual(m.decode_cursor(links['next']['cursor']), Cursor('next', (2,)))
+        links = m.get_cursor_links(rows, 2, cursor=Cursor('previous', (3,)))
+        self.assertListEqual(list(links), ['next'])
+
+    def test_retrieve_many(self):
+        """
+        Tests that the default retrieve_many calls
+        retrieve for every item.
+        """
+        def retrieve(lookup_keys):
+            if lookup_keys['id'] == 2:
+                raise NotFoundException('Not found')
+            return dict(lookup_keys, name='a')
+
+        m = FakeManager()
+        with mock.patch.object(m, 'retrieve', side_effect=retrieve):
+            self.assertListEqual(m.retrieve_many([dict(id=1), dict(id=2), dict(id=3)]),
+                                 [dict(id=1, name='a'), None, dict(id=3, name='a')])
+
+    def test_bulk_defaults(self):
+        """
+        Tests that the default bulk methods call
+        the single object methods for every item.
+        """
+        m = FakeManager()
+        with mock.patch.object(m, 'create', side_effect=lambda values: dict(values, id=1)):
+            self.assertEqual(m.bulk_create([dict(a=1), dict(a=2)]),
+                             [dict(a=1, id=1), dict(a=2, id=1)])
+        with mock.patch.object(m, 'update', return_value=dict(a=3)) as update:
+            self.assertEqual(m.bulk_update([(dict(id=1), dict(a=3))]), [dict(a=3)])
+            update.assert_called_once_with(dict(id=1), dict(a=3))
+        with mock.patch.object(m, 'delete') as delete:
+            self.assertIsNone(m.bulk_delete([dict(id=1), dict(id=2)]))
+            self.assertEqual(delete.call_count, 2)
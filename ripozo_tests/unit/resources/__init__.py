@@ -1,3 +1,3 @@
 __author__ = 'Tim Martin'
 
-from ripozo_tests.unit.resources import fields, relationships, base, request, restmixins
\ No newline at end of file
+from ripozo_tests.unit.resources import fields, relationships, base, loader, request, restmixins
\ No newline at end of file
@@ -11,9 +11,11 @@ import six
 import unittest2
 
 from ripozo.decorators import apimethod
+from ripozo.exceptions import RestException
 from ripozo.resources.constructor import ResourceMetaClass
 from ripozo.resources.relationships import Relationship, ListRelationship
-from ripozo.resources.resource_base import ResourceBase, _get_apimethods
+from ripozo.resources.resource_base import ResourceBase, _get_apimethods, \
+    create_url, URLTemplate, _default_construction
 from ripozo_tests.helpers.inmemory_manager import InMemoryManager
 
 logger = logging.getLogger(__name__)
@@ -508,3 +510,277 @@ class TestResourceBase(unittest2.TestCase):
         self.assertEqual(res.url, '/api/resource2/<id>/<pk>/bla')
         res = Resource2(route_extension='bla', no_pks=True)
         self.assertEqual(res.url, '/api/resource2/bla')
+
+    def test_create_url(self):
+        """
+        Tests that create_url replaces only the
+        placeholders that have a value.
+        """
+        url = create_url('/api/<id>/<pk>/<id>', id=1, other='blah')
+        self.assertEqual(url, '/api/1/<pk>/1')
+        self.assertEqual(create_url('/api/resource'), '/api/resource')
+        self.assertEqual(create_url('/<id>', id='\\1'), '/\\1')
+
+    def test_url_template_compile(self):
+        """
+        Tests that url templates are only parsed once
+        and render the same as create_url
+        """
+        template = URLTemplate.compile('/api/<id>/child/<pk>')
+        self.assertIs(template, URLTemplate.compile('/api/<id>/child/<pk>'))
+        self.assertTupleEqual(template.placeholders, ('id', 'pk',))
+        self.assertEqual(template.render(dict(id=1, pk='a')), '/api/1/child/a')
+        self.assertEqual(template.render(dict(pk=None)), '/api/<id>/child/None')
+
+    def test_url_template_cache_bounded(self):
+        """
+        Tests that dynamic url strings do not grow
+        the template cache beyond its size.
+        """
+        for i in range(URLTemplate.cache_size + 10):
+            self.assertEqual(create_url('/dynamic/{0}/<id>'.format(i), id=1),
+                             '/dynamic/{0}/1'.format(i))
+        self.assertEqual(len(URLTemplate._compiled_templates), URLTemplate.cache_size)
+
+    def test_url_metadata_frozen(self):
+        """
+        Tests that the url metadata is stored as
+        plain class attributes when the class is created.
+        """
+        class MyResource(ResourceBase):
+            pks = ('id',)
+            namespace = '/api'
+
+        self.assertEqual(MyResource.__dict__['resource_name'], 'my_resource')
+        self.assertEqual(MyResource.__dict__['base_url_sans_pks'], '/api/my_resource')
+        self.assertEqual(MyResource.__dict__['base_url'], '/api/my_resource/<id>')
+
+    def test_url_metadata_recomputed(self):
+        """
+        Tests that assigning the namespace, pks, append_slash
+        or resource_name recomputes the url metadata for the
+        class and its subclasses.
+        """
+        class Parent(ResourceBase):
+            namespace = '/api'
+
+        class Child(Parent):
+            pks = ('id',)
+
+        Parent.namespace = '/other'
+        self.assertEqual(Parent.base_url, '/other/parent')
+        self.assertEqual(Child.base_url, '/other/child/<id>')
+
+        Child.pks = ('id', 'pk',)
+        self.assertEqual(Child.base_url, '/other/child/<id>/<pk>')
+
+        Child.append_slash = True
+        self.assertEqual(Child.base_url_sans_pks, '/other/child/')
+
+        Parent.resource_name = 'renamed'
+        self.assertEqual(Parent.base_url, '/other/renamed')
+        self.assertEqual(Child.resource_name, 'renamed')
+        self.assertEqual(ResourceMetaClass.registered_resource_classes[Parent], '/other/renamed')
+        self.assertEqual(ResourceMetaClass.registered_resource_classes[Child],
+                         '/other/renamed/<id>/<pk>/')
+
+        del Parent.resource_name
+        self.assertEqual(Parent.resource_name, 'parent')
+        self.assertEqual(Child.resource_name, 'child')
+
+    def test_url_metadata_patched(self):
+        """
+        Tests that patching the namespace restores
+        the original url metadata afterwards.
+        """
+        class MyResource(ResourceBase):
+            pass
+
+        with mock.patch.object(MyResource, 'namespace', '/api'):
+            self.assertEqual(MyResource.base_url, '/api/my_resource')
+        self.assertEqual(MyResource.base_url, '/my_resource')
+
+    def test_endpoint_dictionary_cached(self):
+        """
+        Tests that the endpoint dictionary is only generated
+        once and is read only.
+        """
+        class MyResource(ResourceBase):
+            @apimethod(methods=['GET'])
+            def hello(cls, request):
+                pass
+
+        endpoints = MyResource.endpoint_dictionary()
+        self.assertIs(endpoints, MyResource.endpoint_dictionary())
+        with mock.patch('ripozo.resources.resource_base._generate_endpoint_dict') as gen:
+            MyResource.endpoint_dictionary()
+            self.assertEqual(gen.call_count, 0)
+
+        with self.assertRaises(TypeError):
+            endpoints['another'] = []
+        with self.assertRaises(TypeError):
+            endpoints['hello'][0]['route'] = '/blah'
+        options = endpoints['hello'][0].copy()
+        options['route'] = '/blah'
+        self.assertEqual(endpoints['hello'][0]['route'], '/my_resource/')
+
+    def test_endpoint_dictionary_class_modified(self):
+        """
+        Tests that modifying the class or one of its
+        parents regenerates the endpoint dictionary.
+        """
+        class Parent(ResourceBase):
+            @apimethod(methods=['GET'])
+            def hello(cls, request):
+                pass
+
+        class Child(Parent):
+            pass
+
+        self.assertNotIn('goodbye', Child.endpoint_dictionary())
+
+        def goodbye(cls, request):
+            pass
+
+        Parent.goodbye = apimethod(methods=['DELETE'])(goodbye)
+        self.assertIn('goodbye', Parent.endpoint_dictionary())
+        self.assertIn('goodbye', Child.endpoint_dictionary())
+
+        Child.namespace = '/api'
+        self.assertEqual(Child.endpoint_dictionary()['hello'][0]['route'], '/api/child/')
+        self.assertEqual(Parent.endpoint_dictionary()['hello'][0]['route'], '/parent/')
+
+    def test_related_resources_lazy(self):
+        """
+        Tests that the related and linked resources are
+        not constructed until they or the properties are read.
+        """
+        class Related(ResourceBase):
+            pks = ('id',)
+
+        class MyResource(ResourceBase):
+            pks = ('id',)
+            _relationships = (Relationship('related', relation='Related'),)
+            _links = (Relationship('link', relation='Related'),)
+
+        props = dict(id=1, related=dict(id=2))
+        meta = dict(links=dict(link=dict(id=3)))
+        with mock.patch.object(Relationship, 'construct_resource') as construct:
+            res = MyResource(properties=props, meta=meta)
+            self.assertEqual(construct.call_count, 0)
+
+        res = MyResource(properties=props, meta=meta)
+        self.assertEqual(res.properties, dict(id=1))
+        self.assertEqual(len(res.related_resources), 1)
+        self.assertEqual(res.related_resources[0].resource.properties, dict(id=2))
+        self.assertEqual(len(res.linked_resources), 1)
+        self.assertEqual(res.linked_resources[0].resource.properties, dict(id=3))
+
+    def test_properties_before_init(self):
+        """
+        Tests that a subclass may set and read the properties
+        before calling ``ResourceBase.__init__``.
+        """
+        class Related(ResourceBase):
+            pks = ('id',)
+
+        class MyResource(ResourceBase):
+            pks = ('id',)
+            _relationships = (Relationship('related', relation='Related'),)
+
+            def __init__(self, **kwargs):
+                self.properties = dict(id=1, related=dict(id=2))
+                self.properties['extra'] = True
+                super(MyResource, self).__init__(properties=self.properties, **kwargs)
+
+        res = MyResource()
+        self.assertEqual(res.properties, dict(id=1, extra=True))
+        self.assertEqual(res.related_resources[0].resource.properties, dict(id=2))
+
+    def test_required_relationship_not_lazy(self):
+        """
+        Tests that a resource with a required relationship
+        constructs its related resources immediately.
+        """
+        class Related(ResourceBase):
+            pks = ('id',)
+
+        class MyResource(ResourceBase):
+            _relationships = (Relationship('related', relation='Related', required=True),)
+
+        self.assertRaises(RestException, MyResource, properties=dict(id=1))
+
+    def test_construct_many_lazy(self):
+        """
+        Tests that an iterable of properties is
+        constructed lazily.
+        """
+        class Lazy(ResourceBase):
+            pks = ('id',)
+
+        consumed = []
+
+        def rows():
+            for i in range(3):
+                consumed.append(i)
+                yield dict(id=i)
+
+        resources = Lazy._construct_many(rows())
+        self.assertIsInstance(resources, types.GeneratorType)
+        self.assertListEqual(consumed, [])
+        first = next(resources)
+        self.assertListEqual(consumed, [0])
+        self.assertEqual(first.url, '/lazy/0')
+        self.assertListEqual([res.properties for res in resources], [dict(id=1), dict(id=2)])
+        self.assertIsInstance(Lazy._construct_many((dict(id=1),)), list)
+
+    def test_default_construction(self):
+        """
+        Tests that classes using ``ResourceBase.__init__``
+        are detected (on python 2 as well) so that
+        ``_construct_many`` can skip ``__init__``.
+        """
+        class Default(ResourceBase):
+            pks = ('id',)
+
+        class CustomInit(ResourceBase):
+            def __init__(self, **kwargs):
+                super(CustomInit, self).__init__(**kwargs)
+
+        self.assertTrue(_default_construction(Default))
+        self.assertFalse(_default_construction(CustomInit))
+
+    def test_compact_instances(self):
+        """
+        Tests that resources declaring ``__slots__`` have no
+        instance ``__dict__`` and share immutable defaults
+        while other resources keep the previous behavior.
+        """
+        class Compact(ResourceBase):
+            __slots__ = ()
+            pks = ('id',)
+
+        class Regular(ResourceBase):
+            pks = ('id',)
+
+        self.assertTrue(Compact._compact_instances)
+        self.assertFalse(Regular._compact_instances)
+        first = Compact(properties=dict(id=1))
+        second = Compact(properties=dict(id=2))
+        self.assertFalse(hasattr(first, '__dict__'))
+        self.assertRaises(AttributeError, setattr, first, 'extra', 1)
+        self.assertIs(first.meta, second.meta)
+        self.assertEqual(dict(first.meta), {})
+        self.assertEqual(first.errors, ())
+        self.assertEqual(first.url, '/compact/1')
+
+        meta = dict(links=dict(next='x'))
+        third = Compact(properties=dict(id=3), meta=meta)
+        self.assertIs(third.meta, meta)
+
+        regular = Regular(properties=dict(id=1))
+        regular.extra = 1
+        self.assertEqual(regular.meta, {})
+        self.assertEqual(regular.errors, [])
+        self.assertEqual(regular.query_args, {})
+        self.assertIsNot(regular.meta, Regular(properties=dict(id=2)).meta)
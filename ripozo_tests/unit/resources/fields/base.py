@@ -7,7 +7,8 @@ import unittest2
 
 from ripozo.exceptions import ValidationException, TranslationException, RestException
 from ripozo.resources.constants import input_categories
-from ripozo.resources.fields.base import BaseField, translate_fields
+from ripozo.resources.fields.base import BaseField, translate_fields, TranslationPlan
+from ripozo.resources.fields.common import IntegerField
 from ripozo import RequestContainer
 from ripozo_tests.bases.field import FieldTestBase
 
@@ -102,6 +103,99 @@ class TestTranslateFields(unittest2.TestCase):
         req = RequestContainer(query_args=test_input, url_params=test_input, body_args=test_input)
         self.assertRaises(RestException, translate_fields, req, fields=[field], validate=True)
 
+    def test_translation_plan_equivalent(self):
+        """
+        Tests that applying a plan to a RequestContainer gives
+        the same result as translating through the public
+        get and set methods of the request.
+        """
+        class PublicRequest(RequestContainer):
+            pass
+
+        locations = [None, input_categories.URL_PARAMS, input_categories.QUERY_ARGS,
+                     input_categories.BODY_ARGS, 'fake']
+        requests = [dict(), dict(url_params=dict(a='1')), dict(query_args=dict(a='2')),
+                    dict(body_args=dict(a='3', b='4')),
+                    dict(url_params=dict(b='1'), query_args=dict(a='2'), body_args=dict(a='3'))]
+        for location in locations:
+            for skip_required in (False, True):
+                fields = [IntegerField('a', required=True, arg_type=location),
+                          IntegerField('b', arg_type=location)]
+                plan = TranslationPlan(fields, skip_required=skip_required, validate=True)
+                for kwargs in requests:
+                    fast = RequestContainer(**dict((k, v.copy()) for k, v in kwargs.items()))
+                    slow = PublicRequest(**dict((k, v.copy()) for k, v in kwargs.items()))
+                    try:
+                        plan.apply(slow)
+                    except Exception as exc:
+                        self.assertRaises(type(exc), plan.apply, fast)
+                    else:
+                        plan.apply(fast)
+                    self.assertDictEqual(fast.url_params, slow.url_params)
+                    self.assertDictEqual(fast.query_args, slow.query_args)
+                    self.assertDictEqual(fast.body_args, slow.body_args)
+
+    def test_translation_plan_no_copies(self):
+        """
+        Tests that the plan updates the dictionaries
+        of the request in place.
+        """
+        body = dict(a='1')
+        req = RequestContainer(body_args=body)
+        TranslationPlan([IntegerField('a')]).apply(req)
+        self.assertIs(req._body_args, body)
+        self.assertDictEqual(body, dict(a=1))
+
+    def test_translation_plan_raw_body(self):
+        """
+        Tests that the plan does not decode the raw body
+        unless a field is not in the url_params or query_args.
+        """
+        req = RequestContainer(url_params=dict(a='1'), raw_body=b'not json',
+                               content_type='application/json')
+        TranslationPlan([IntegerField('a', required=True)], validate=True).apply(req)
+        self.assertEqual(req.url_params['a'], 1)
+        self.assertIsNone(req._body_args)
+
+        req = RequestContainer(url_params=dict(a='1'), raw_body=b'{"b": "2"}',
+                               content_type='application/json')
+        TranslationPlan([IntegerField('a'), IntegerField('b')]).apply(req)
+        self.assertDictEqual(req.body_args, dict(b=2))
+
+    def test_translation_plan_locations(self):
+        """
+        Tests that a plan restricted to some locations only
+        reads those and does not decode the raw body.
+        """
+        class PublicRequest(RequestContainer):
+            pass
+
+        locations = (input_categories.URL_PARAMS, input_categories.QUERY_ARGS,)
+        fields = [IntegerField('a', required=True), IntegerField('b')]
+        plan = TranslationPlan(fields, validate=True, locations=locations)
+        for request_class in (RequestContainer, PublicRequest):
+            req = request_class(url_params=dict(a='1'), query_args=dict(b='2'),
+                                raw_body=b'not json', content_type='application/json')
+            plan.apply(req)
+            self.assertDictEqual(req.url_params, dict(a=1))
+            self.assertDictEqual(req.query_args, dict(b=2))
+            self.assertIsNone(req._body_args)
+
+            req = request_class(query_args=dict(b='2'), body_args=dict(a='1'))
+            self.assertRaises(ValidationException, plan.apply, req)
+            self.assertDictEqual(req.body_args, dict(a='1'))
+
+    def test_translate_fields_read_only(self):
+        """
+        Tests that translate_fields returns copies of the
+        arguments before the translation for read only requests.
+        """
+        req = RequestContainer(body_args=dict(a='1'), read_only=True)
+        url_params, query_args, body_args = translate_fields(req, fields=[IntegerField('a')])
+        self.assertDictEqual(body_args, dict(a='1'))
+        self.assertIsInstance(body_args, dict)
+        self.assertDictEqual(dict(req.body_args), dict(a=1))
+
     def test_validate_required(self):
         f = BaseField('f', required=True)
         self.assertRaises(ValidationException, f._validate_required, None)
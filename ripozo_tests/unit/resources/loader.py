@@ -0,0 +1,87 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from ripozo.resources.loader import BatchLoader, get_current_loader
+
+import mock
+import unittest2
+
+
+class TestBatchLoader(unittest2.TestCase):
+    """
+    Tests for the BatchLoader
+    """
+
+    def setUp(self):
+        self.manager = mock.MagicMock()
+        self.manager.retrieve_many.side_effect = lambda keys: [dict(k, name='a') for k in keys]
+
+    def test_load_batches_queued(self):
+        """
+        Tests that loading an object retrieves
+        every queued object at once.
+        """
+        loader = BatchLoader()
+        loader.queue(self.manager, dict(id=1))
+        loader.queue(self.manager, dict(id=2))
+        loader.queue(self.manager, dict(id=1))
+        self.assertDictEqual(loader.load(self.manager, dict(id=2)), dict(id=2, name='a'))
+        self.manager.retrieve_many.assert_called_once_with([dict(id=1), dict(id=2)])
+        self.assertDictEqual(loader.load(self.manager, dict(id=1)), dict(id=1, name='a'))
+        self.assertEqual(loader.batches, 1)
+
+    def test_identity_map(self):
+        """
+        Tests that loaded objects are not queued
+        or retrieved again.
+        """
+        loader = BatchLoader()
+        loader.load(self.manager, dict(id=1, other=2))
+        loader.queue(self.manager, dict(other=2, id=1))
+        loader.load(self.manager, dict(other=2, id=1))
+        self.assertEqual(self.manager.retrieve_many.call_count, 1)
+        loader.load(self.manager, dict(id=3))
+        self.manager.retrieve_many.assert_called_with([dict(id=3)])
+        self.assertEqual(loader.batches, 2)
+
+    def test_missing(self):
+        """
+        Tests that missing objects are loaded as None.
+        """
+        self.manager.retrieve_many.side_effect = lambda keys: [None]
+        loader = BatchLoader()
+        loader.queue(self.manager, dict(id=1))
+        self.assertIsNone(loader.load(self.manager, dict(id=2)))
+        self.assertIsNone(loader.load(self.manager, dict(id=1)))
+        self.assertEqual(self.manager.retrieve_many.call_count, 1)
+
+    def test_managers_batched_separately(self):
+        """
+        Tests that the objects of each manager
+        are retrieved separately.
+        """
+        other = mock.MagicMock()
+        other.retrieve_many.return_value = [dict(id=1)]
+        loader = BatchLoader()
+        loader.queue(self.manager, dict(id=1))
+        loader.load(other, dict(id=1))
+        self.assertEqual(self.manager.retrieve_many.call_count, 0)
+        other.retrieve_many.assert_called_once_with([dict(id=1)])
+
+    def test_current_loader(self):
+        """
+        Tests making the loader current.
+        """
+        self.assertIsNone(get_current_loader())
+        loader, other = BatchLoader(), BatchLoader()
+        with loader:
+            self.assertIs(get_current_loader(), loader)
+            with other:
+                self.assertIs(get_current_loader(), other)
+                with loader:
+                    self.assertIs(get_current_loader(), loader)
+                self.assertIs(get_current_loader(), other)
+            self.assertIs(get_current_loader(), loader)
+        self.assertIsNone(get_current_loader())
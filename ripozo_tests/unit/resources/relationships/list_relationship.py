@@ -3,9 +3,12 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from ripozo.resources.loader import BatchLoader
 from ripozo.resources.relationships.list_relationship import ListRelationship
+from ripozo.resources.relationships.relationship import Relationship
 from ripozo.resources.resource_base import ResourceBase
 
+import mock
 import unittest2
 
 
@@ -64,3 +67,152 @@ class TestListRelationship(unittest2.TestCase):
         part2 = lr.remove_child_resource_properties(post_props)
         self.assertEqual(part2, post_props)
         self.assertNotEqual(id(part2), id(post_props))
+
+    def test_construct_resource_batch(self):
+        """
+        Tests that the batch construction produces the same
+        resources as constructing each one individually.
+        """
+        class BatchChild(ResourceBase):
+            pks = ('id',)
+
+        class BatchResource(ResourceBase):
+            pks = ('id',)
+            _relationships = (Relationship('child', relation='BatchChild'),)
+
+        lr = ListRelationship('items', relation='BatchResource',
+                              embedded=True, query_args=('id',))
+        rows = [dict(id=i, child=dict(id=i + 10)) for i in range(5)]
+        expected = [BatchResource(properties=dict(id=i, child=dict(id=i + 10)),
+                                  query_args=('id',)) for i in range(5)]
+        res_list = lr.construct_resource(dict(items=rows))
+        self.assertEqual(len(res_list), 5)
+        for res, exp in zip(res_list, expected):
+            self.assertIsInstance(res, BatchResource)
+            self.assertEqual(res.properties, exp.properties)
+            self.assertEqual(res.url, exp.url)
+            self.assertEqual(res.meta, exp.meta)
+            self.assertEqual(res.errors, exp.errors)
+            self.assertEqual(res.status_code, exp.status_code)
+            self.assertEqual(len(res.related_resources), 1)
+            self.assertEqual(res.related_resources[0].resource.url,
+                             exp.related_resources[0].resource.url)
+
+    def test_construct_resource_custom_init(self):
+        """
+        Tests that classes with a custom constructor are
+        still constructed through the constructor.
+        """
+        class CustomInit(ResourceBase):
+            pks = ('id',)
+
+            def __init__(self, **kwargs):
+                super(CustomInit, self).__init__(**kwargs)
+                self.custom = True
+
+        lr = ListRelationship('items', relation='CustomInit')
+        res_list = lr.construct_resource(dict(items=[dict(id=1), dict(id=2)]))
+        self.assertEqual(len(res_list), 2)
+        for res in res_list:
+            self.assertTrue(res.custom)
+            self.assertEqual(res.related_resources, [])
+
+    def test_fetch_batched(self):
+        """
+        Tests that the fetching relationships of the items
+        in a list are retrieved in a single batch even
+        if the resources are constructed lazily.
+        """
+        class CustomerManager(object):
+            retrieve = mock.Mock()
+            retrieve_many = mock.Mock(side_effect=lambda keys_list: [
+                dict(keys, name='customer{0}'.format(keys['id'])) for keys in keys_list])
+
+        class Customer(ResourceBase):
+            pks = ('id',)
+            manager = CustomerManager()
+
+        class Order(ResourceBase):
+            pks = ('id',)
+            _relationships = (Relationship('customer', property_map=dict(customer_id='id'),
+                                           relation='Customer', fetch=True, embedded=True),)
+
+        lr = ListRelationship('orders', relation='Order', embedded=True)
+        orders = [dict(id=i, customer_id=i % 10) for i in range(100)]
+        loader = BatchLoader()
+        with loader:
+            res_list = lr.construct_resource(dict(orders=orders))
+        self.assertEqual(CustomerManager.retrieve_many.call_count, 0)
+        for order in res_list:
+            customer = order.related_resources[0].resource
+            customer_id = order.properties['id'] % 10
+            self.assertDictEqual(customer.properties,
+                                 dict(id=customer_id, name='customer{0}'.format(customer_id)))
+        CustomerManager.retrieve_many.assert_called_once_with([dict(id=i) for i in range(10)])
+        self.assertEqual(CustomerManager.retrieve.call_count, 0)
+        self.assertEqual(loader.batches, 1)
+
+    def test_fetch_list(self):
+        """
+        Tests that a fetching list relationship
+        retrieves every item in a single batch.
+        """
+        class ItemManager(object):
+            retrieve_many = mock.Mock(side_effect=lambda keys_list: [
+                dict(keys, name='item') for keys in keys_list])
+
+        class FetchedItem(ResourceBase):
+            pks = ('id',)
+            manager = ItemManager()
+
+        lr = ListRelationship('items', relation='FetchedItem', fetch=True)
+        with BatchLoader():
+            res_list = lr.construct_resource(dict(items=[dict(id=1), dict(id=2)]))
+        self.assertListEqual([res.properties for res in res_list],
+                             [dict(id=1, name='item'), dict(id=2, name='item')])
+        ItemManager.retrieve_many.assert_called_once_with([dict(id=1), dict(id=2)])
+
+    def test_construct_resource_lazy(self):
+        """
+        Tests that lazy iterables are constructed as they are
+        consumed and the fetched relationships are batched
+        ``batch_size`` items at a time.
+        """
+        class LazyManager(object):
+            retrieve_many = mock.Mock(side_effect=lambda keys_list: [
+                dict(keys, name='parent') for keys in keys_list])
+
+        class LazyParent(ResourceBase):
+            pks = ('id',)
+            manager = LazyManager()
+
+        class LazyChild(ResourceBase):
+            pks = ('id',)
+            _relationships = (Relationship('parent', property_map=dict(parent_id='id'),
+                                           relation='LazyParent', fetch=True),)
+
+        lr = ListRelationship('items', relation='LazyChild', embedded=True)
+        lr.batch_size = 2
+        consumed = []
+
+        def rows():
+            for i in range(5):
+                consumed.append(i)
+                yield dict(id=i, parent_id=i)
+
+        with BatchLoader() as loader:
+            res_list = lr.construct_resource(dict(items=rows()))
+        self.assertNotIsInstance(res_list, list)
+        self.assertListEqual(consumed, [])
+        iterator = iter(res_list)
+        first = next(iterator)
+        self.assertListEqual(consumed, [0, 1])
+        self.assertEqual(first.related_resources[0].resource.properties,
+                         dict(id=0, name='parent'))
+        LazyManager.retrieve_many.assert_called_once_with([dict(id=0), dict(id=1)])
+        for res in iterator:
+            self.assertEqual(res.related_resources[0].resource.properties['name'], 'parent')
+        self.assertListEqual(consumed, [0, 1, 2, 3, 4])
+        self.assertRaises(RuntimeError, iter, res_list)
+        self.assertEqual(loader.batches, 3)
+        LazyManager.retrieve_many.assert_called_with([dict(id=4)])
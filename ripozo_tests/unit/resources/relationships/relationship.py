@@ -3,12 +3,14 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-from ripozo.exceptions import RestException
+from ripozo.exceptions import NotFoundException, RestException
+from ripozo.resources.loader import BatchLoader
 from ripozo.resources.relationships.relationship import Relationship
 from ripozo.resources.resource_base import ResourceBase
 
 import mock
 import unittest2
+import warnings
 
 
 class TestRelationship(unittest2.TestCase):
@@ -158,3 +160,63 @@ class TestRelationship(unittest2.TestCase):
         ret = rel._map_pks(x)
         self.assertDictEqual(ret, dict(name='name'))
         self.assertDictEqual(x, dict(name='name'))
+
+    def test_fetch(self):
+        """
+        Tests that a fetching relationship retrieves the
+        properties of the related resource.
+        """
+        class FetchManager(object):
+            retrieve = mock.Mock(side_effect=lambda keys: dict(keys, name='fetched', value=1))
+            retrieve_many = mock.Mock(side_effect=lambda keys_list: [
+                dict(keys, name='batched') for keys in keys_list])
+
+        class Fetched(ResourceBase):
+            pks = ('id',)
+            manager = FetchManager()
+
+        r = Relationship('related', property_map=dict(related_id='id'),
+                         relation='Fetched', fetch=True)
+        resource = r.construct_resource(dict(related_id=1, related=dict(value=2)))
+        self.assertDictEqual(resource.properties, dict(id=1, name='fetched', value=2))
+        FetchManager.retrieve.assert_called_once_with(dict(id=1))
+
+        with BatchLoader() as loader:
+            resource = r.construct_resource(dict(related_id=2))
+            r.construct_resource(dict(related_id=2))
+        self.assertDictEqual(resource.properties, dict(id=2, name='batched'))
+        FetchManager.retrieve_many.assert_called_once_with([dict(id=2)])
+        self.assertEqual(loader.batches, 1)
+
+        # No pks, nothing to fetch
+        self.assertIsNone(r.construct_resource(dict()))
+        self.assertEqual(FetchManager.retrieve.call_count, 1)
+
+        FetchManager.retrieve.side_effect = NotFoundException('Not found')
+        resource = r.construct_resource(dict(related_id=3))
+        self.assertDictEqual(resource.properties, dict(id=3))
+
+    def test_relation_cached(self):
+        """
+        Tests that the relation is cached after the first
+        lookup and that the cache is discarded when the
+        registry entry is overwritten.
+        """
+        rel = Relationship('related', relation='LaterDefined')
+        self.assertRaises(KeyError, getattr, rel, 'relation')
+
+        class LaterDefined(ResourceBase):
+            pks = ('id',)
+
+        self.assertIs(rel.relation, LaterDefined)
+        with mock.patch.dict(rel._resource_meta_class.registered_names_map, clear=True):
+            # The cached class is used without another lookup
+            self.assertIs(rel.relation, LaterDefined)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+
+            class LaterDefined(ResourceBase):
+                pks = ('id',)
+
+        self.assertIs(rel.relation, LaterDefined)
@@ -3,9 +3,12 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from ripozo.exceptions import BodyParseException
 from ripozo.resources.constants.input_categories import QUERY_ARGS, BODY_ARGS, URL_PARAMS
-from ripozo.resources.request import RequestContainer
+from ripozo.resources.loader import BatchLoader
+from ripozo.resources.request import RequestContainer, decode_json_body
 
+import operator
 import unittest2
 
 
@@ -31,6 +34,15 @@ class TestRequestContainer(unittest2.TestCase):
         r = RequestContainer()
         self.assertIsInstance(getattr(r, name), dict)
 
+    def test_loader(self):
+        """
+        Tests that every request has its own loader.
+        """
+        r = RequestContainer()
+        self.assertIsInstance(r.loader, BatchLoader)
+        self.assertIs(r.loader, r.loader)
+        self.assertIsNot(r.loader, RequestContainer().loader)
+
     def test_url_params(self):
         self.dict_helper('url_params')
 
@@ -43,6 +55,139 @@ class TestRequestContainer(unittest2.TestCase):
     def test_headers(self):
         self.dict_helper('headers')
 
+    def test_read_only(self):
+        """
+        Tests that read only requests return views of
+        the dictionaries instead of copies.
+        """
+        for name in ('url_params', 'query_args', 'body_args', 'headers'):
+            d = dict(some='object')
+            r = RequestContainer(read_only=True, **{name: d})
+            view = getattr(r, name)
+            self.assertDictEqual(d, dict(view))
+            self.assertRaises(TypeError, operator.setitem, view, 'some', 'thing')
+            d['other'] = 'value'
+            self.assertEqual(getattr(r, name)['other'], 'value')
+
+            # An explicit copy is mutable
+            copy = view.copy()
+            copy['some'] = 'thing'
+            self.assertEqual(d['some'], 'object')
+
+            # Setting a view stores a copy
+            setattr(r, name, view)
+            if name != 'headers':
+                r.set('some', 'thing', location=name)
+            self.assertEqual(d['some'], 'object')
+            self.assertIsInstance(getattr(r, '_{0}'.format(name)), dict)
+
+    def test_read_only_class_attribute(self):
+        """
+        Tests that the class attribute sets the
+        default and the argument overrides it.
+        """
+        class ReadOnlyRequest(RequestContainer):
+            read_only = True
+
+        self.assertNotIsInstance(ReadOnlyRequest().body_args, dict)
+        self.assertIsInstance(ReadOnlyRequest(read_only=False).body_args, dict)
+        self.assertIsInstance(RequestContainer().body_args, dict)
+
+    def test_raw_body(self):
+        """
+        Tests that the raw body is decoded the
+        first time the body args are needed.
+        """
+        r = RequestContainer(raw_body=b'{"x": 1}', headers={'Content-Type': 'application/json'})
+        self.assertEqual(r.raw_body, b'{"x": 1}')
+        self.assertIsNone(r._body_args)
+        self.assertDictEqual(r.body_args, dict(x=1))
+        self.assertIs(r._body_args, r._body_args)
+
+        r = RequestContainer(raw_body=b'{"x": 1}', content_type='application/hal+json')
+        self.assertEqual(r.get('x'), 1)
+        self.assertEqual(r.content_type, 'application/hal+json')
+
+        # the headers of the caller are not modified
+        headers = {'Content-Type': 'text/plain'}
+        r = RequestContainer(raw_body=b'{"x": 1}', headers=headers, content_type='application/json')
+        self.assertEqual(r.content_type, 'application/json')
+        self.assertDictEqual(headers, {'Content-Type': 'text/plain'})
+
+        # body_args take precedence and empty bodies are not decoded
+        r = RequestContainer(body_args=dict(y=2), raw_body=b'{"x": 1}')
+        self.assertDictEqual(r.body_args, dict(y=2))
+        self.assertDictEqual(RequestContainer(raw_body=b'').body_args, {})
+
+        # Setting the body args replaces the raw body
+        r = RequestContainer(raw_body=b'not json', content_type='application/json')
+        r.body_args = dict(y=2)
+        self.assertDictEqual(r.body_args, dict(y=2))
+
+    def test_raw_body_charset(self):
+        """Tests that the charset of the content type is used"""
+        raw_body = '{"x": "\u00e9"}'.encode('latin-1')
+        r = RequestContainer(raw_body=raw_body,
+                             content_type='application/json; charset="latin-1"')
+        self.assertEqual(r.body_args['x'], '\u00e9')
+
+    def test_raw_body_invalid(self):
+        """
+        Tests that a 400 is raised for malformed bodies
+        and a 415 for unsupported content types.
+        """
+        for raw_body in (b'not json', b'[1, 2]', b'\xff'):
+            r = RequestContainer(raw_body=raw_body, content_type='application/json')
+            with self.assertRaises(BodyParseException) as exc:
+                r.body_args
+            self.assertEqual(exc.exception.status_code, 400)
+
+        for content_type in (None, 'text/csv'):
+            r = RequestContainer(raw_body=b'a,b', content_type=content_type)
+            with self.assertRaises(BodyParseException) as exc:
+                r.get('x')
+            self.assertEqual(exc.exception.status_code, 415)
+
+    def test_raw_body_not_decoded(self):
+        """
+        Tests that the body is only decoded if a parameter
+        is not in the url_params or query_args.
+        """
+        calls = []
+
+        def decoder(raw_body, charset):
+            calls.append(raw_body)
+            return decode_json_body(raw_body, charset)
+
+        class CustomRequest(RequestContainer):
+            body_decoders = {'text/custom': decoder}
+
+        r = CustomRequest(url_params=dict(x=1), query_args=dict(y=2),
+                          raw_body=b'{"z": 3}', content_type='text/custom')
+        self.assertIn('x', r)
+        self.assertIn('y', r)
+        self.assertEqual(r.get('x'), 1)
+        r.set('y', 3)
+        self.assertEqual(len(calls), 0)
+        self.assertIn('z', r)
+        self.assertNotIn('w', r)
+        self.assertEqual(r.get('z'), 3)
+        self.assertEqual(len(calls), 1)
+
+    def test_transform_body(self):
+        """
+        Tests that transforms are applied when the
+        body is decoded or immediately if it was.
+        """
+        r = RequestContainer(raw_body=b'{"x": 1}', content_type='application/json')
+        r.transform_body(lambda body: dict(body, y=2))
+        r.transform_body(lambda body: dict(body, z=3))
+        self.assertIsNone(r._body_args)
+        self.assertDictEqual(r.body_args, dict(x=1, y=2, z=3))
+
+        r.transform_body(lambda body: dict(w=4))
+        self.assertDictEqual(r.body_args, dict(w=4))
+
     def test_content_type(self):
         content_type = 'for real;'
         headers = {'Content-Type': content_type}
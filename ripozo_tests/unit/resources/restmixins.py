@@ -4,10 +4,18 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from ripozo import ResourceBase, apimethod, RequestContainer
+from ripozo.adapters import SirenAdapter, HalAdapter, JSONAPIAdapter, \
+    BasicJSONAdapter, NDJSONAdapter
+from ripozo.exceptions import ValidationException
 from ripozo.resources.constructor import ResourceMetaClass
+from ripozo.resources.fields.common import IntegerField, StringField
+from ripozo.resources.relationships import Relationship, ListRelationship
 from ripozo.resources.restmixins import Create, Retrieve, Update, \
-    Delete, RetrieveRetrieveList, AllOptionsResource
+    Delete, RetrieveRetrieveList, AllOptionsResource, CRUDL, BulkCreate, \
+    BulkUpdate, BulkDelete
+from ripozo_tests.helpers.inmemory_manager import InMemoryManager
 
+import json
 import mock
 import unittest2
 
@@ -166,3 +174,239 @@ class TestMixins(unittest2.TestCase):
                 found_fake_list = True
         self.assertTrue(found_fake)
         self.assertTrue(found_fake_list)
+
+    def test_links_cached(self):
+        """
+        Tests that the links and relationships of the
+        mixins are only constructed once per class and
+        are reconstructed when _links, _relationships or
+        the manager are changed.
+        """
+        class T1(CRUDL):
+            manager = self.get_fake_manager()
+
+        links = T1.links
+        self.assertIs(links, T1.links)
+        self.assertIs(links, T1().links)
+        relationships = T1.relationships
+        self.assertIs(relationships, T1.relationships)
+
+        class T2(T1):
+            pass
+
+        self.assertIsNot(links, T2.links)
+        self.assertEqual(T2.links[0]._relation, 'T2')
+
+        T1._links = (Relationship('another'),)
+        self.assertEqual(len(T1.links), len(links) + 1)
+        self.assertEqual(T1.links[0].name, 'another')
+
+        T1.manager = self.get_fake_manager()
+        self.assertIsNot(T1.links, links)
+
+        T1._relationships = (Relationship('related'),)
+        self.assertEqual(len(T1.relationships), 2)
+        self.assertEqual(T1.relationships[0].name, 'related')
+
+    def get_bulk_resource(self):
+        class BulkManager(InMemoryManager):
+            fields = ('id', 'name',)
+            create_fields = ('name',)
+            update_fields = ('name',)
+
+            @classmethod
+            def get_field_type(cls, name):
+                if name == 'id':
+                    return IntegerField('id')
+                return StringField(name, required=True)
+
+        class BulkResource(BulkCreate, BulkUpdate, BulkDelete):
+            manager = BulkManager()
+            pks = ('id',)
+
+        return BulkResource
+
+    def test_bulk_create(self):
+        """
+        Tests that every item is validated and the
+        manager's bulk_create is called once.
+        """
+        BulkResource = self.get_bulk_resource()
+        endpoints = BulkResource.endpoint_dictionary()
+        self.assertEqual(endpoints['bulk_create'][0]['route'], '/bulk_resource/bulk')
+        body = dict(bulk_resource=[dict(name='a'), dict(name='b')])
+        with mock.patch.object(BulkResource.manager, 'bulk_create',
+                               wraps=BulkResource.manager.bulk_create) as bulk_create:
+            response = BulkResource.bulk_create(RequestContainer(body_args=body))
+            self.assertEqual(bulk_create.call_count, 1)
+        self.assertEqual(response.status_code, 201)
+        created = response.properties['bulk_resource']
+        self.assertEqual([item['name'] for item in created], ['a', 'b'])
+        self.assertEqual(len(BulkResource.manager.queryset), 2)
+
+        body = dict(bulk_resource=[dict(name='a'), dict()])
+        self.assertRaises(ValidationException, BulkResource.bulk_create,
+                          RequestContainer(body_args=body))
+        self.assertRaises(ValidationException, BulkResource.bulk_create,
+                          RequestContainer(body_args=dict(bulk_resource='a')))
+        self.assertRaises(ValidationException, BulkResource.bulk_create,
+                          RequestContainer(body_args=dict(bulk_resource=['a'])))
+        self.assertEqual(len(BulkResource.manager.queryset), 2)
+
+    def test_bulk_update(self):
+        """
+        Tests that the pks are split from the updates
+        """
+        BulkResource = self.get_bulk_resource()
+        BulkResource.manager.queryset.update({1: dict(id=1, name='a'), 2: dict(id=2, name='b')})
+        body = dict(bulk_resource=[dict(id='1', name='c'), dict(id=2, name='d')])
+        response = BulkResource.bulk_update(RequestContainer(body_args=body))
+        self.assertEqual(response.properties['bulk_resource'],
+                         [dict(id=1, name='c'), dict(id=2, name='d')])
+        body = dict(bulk_resource=[dict(name='c')])
+        self.assertRaises(ValidationException, BulkResource.bulk_update,
+                          RequestContainer(body_args=body))
+
+    def test_bulk_delete(self):
+        """
+        Tests deleting multiple resources
+        """
+        BulkResource = self.get_bulk_resource()
+        BulkResource.manager.queryset.update({1: dict(id=1, name='a'), 2: dict(id=2, name='b')})
+        body = dict(bulk_resource=[dict(id=1), dict(id='2')])
+        response = BulkResource.bulk_delete(RequestContainer(body_args=body))
+        self.assertIsInstance(response, BulkResource)
+        self.assertEqual(BulkResource.manager.queryset, {})
+
+    def test_bulk_read_only(self):
+        """
+        Tests the bulk mixins when requests are read only.
+        """
+        BulkResource = self.get_bulk_resource()
+        BulkResource.manager.queryset.update({1: dict(id=1, name='a'), 2: dict(id=2, name='b')})
+        with mock.patch.object(RequestContainer, 'read_only', True):
+            body = dict(bulk_resource=[dict(name='c')])
+            response = BulkResource.bulk_create(RequestContainer(body_args=body))
+            self.assertEqual(response.properties['bulk_resource'][0]['name'], 'c')
+
+            body = dict(bulk_resource=[dict(id='1', name='d')])
+            response = BulkResource.bulk_update(RequestContainer(body_args=body))
+            self.assertEqual(response.properties['bulk_resource'], [dict(id=1, name='d')])
+            self.assertEqual(body, dict(bulk_resource=[dict(id='1', name='d')]))
+
+            body = dict(bulk_resource=[dict(id=1), dict(id='2')])
+            BulkResource.bulk_delete(RequestContainer(body_args=body))
+        self.assertEqual(len(BulkResource.manager.queryset), 1)
+
+    def get_projection_resource(self):
+        class ProjectionManager(InMemoryManager):
+            fields = ('id', 'name', 'value', 'secret',)
+            paginate_by = 1
+
+        class ProjectionResource(RetrieveRetrieveList):
+            manager = ProjectionManager()
+            pks = ('id',)
+
+        ProjectionResource.manager.queryset.update({
+            1: dict(id=1, name='a', value=1, secret='x'),
+            2: dict(id=2, name='b', value=2, secret='y')})
+        return ProjectionResource
+
+    def test_retrieve_projection(self):
+        """
+        Tests that only the requested fields and
+        the pks are returned.
+        """
+        ProjectionResource = self.get_projection_resource()
+        request = RequestContainer(url_params=dict(id=1), query_args=dict(fields='name'))
+        response = ProjectionResource.retrieve(request)
+        self.assertDictEqual(response.properties, dict(id=1, name='a'))
+        self.assertEqual(response.url, '/projection_resource/1')
+        request = RequestContainer(url_params=dict(id=1))
+        response = ProjectionResource.retrieve(request)
+        self.assertDictEqual(response.properties, dict(id=1, name='a', value=1, secret='x'))
+        request = RequestContainer(url_params=dict(id=1), query_args=dict(fields='password'))
+        self.assertRaises(ValidationException, ProjectionResource.retrieve, request)
+
+    def test_retrieve_list_projection(self):
+        """
+        Tests that the items contain only the requested
+        fields and that the pagination links keep them.
+        """
+        ProjectionResource = self.get_projection_resource()
+        request = RequestContainer(query_args=dict(fields='value,name'))
+        with mock.patch.object(ProjectionResource.manager, 'retrieve_list',
+                               wraps=ProjectionResource.manager.retrieve_list) as retrieve_list:
+            response = ProjectionResource.retrieve_list(request)
+            retrieve_list.assert_called_once_with({})
+        items = response.related_resources[0].resource
+        self.assertListEqual([item.properties for item in items], [dict(id=1, value=1, name='a')])
+        next_link = [link.resource for link in response.linked_resources if link.name == 'next'][0]
+        self.assertEqual(next_link.get_query_arg_dict()['fields'], 'value,name')
+
+    def test_projection_passed_to_manager(self):
+        """
+        Tests that the projection is passed to managers
+        that support projections.
+        """
+        ProjectionResource = self.get_projection_resource()
+        ProjectionResource.manager.supports_projection = True
+        manager = ProjectionResource.manager
+        request = RequestContainer(url_params=dict(id=1), query_args=dict(fields='name'))
+        with mock.patch.object(manager, 'retrieve', return_value=dict(id=1, name='a')) as retrieve:
+            ProjectionResource.retrieve(request)
+            retrieve.assert_called_once_with(dict(id=1), fields=('id', 'name',))
+        request = RequestContainer(query_args=dict(fields='name'))
+        with mock.patch.object(manager, 'retrieve_list', return_value=([], {})) as retrieve_list:
+            ProjectionResource.retrieve_list(request)
+            retrieve_list.assert_called_once_with({}, fields=('id', 'name',))
+
+    def test_retrieve_list_lazy_rows(self):
+        """
+        Tests that lazy rows from the manager are only consumed
+        while the response is formatted and that every adapter
+        formats them like a list.
+        """
+        consumed = []
+
+        class StreamingManager(InMemoryManager):
+            fields = ('id', 'name',)
+            stream = True
+
+            def retrieve_list(self, filters, *args, **kwargs):
+                rows = [dict(id=i, name='name{0}'.format(i)) for i in range(3)]
+                if not self.stream:
+                    return rows, dict(links=dict(next=dict(count=3)))
+
+                def generate():
+                    for row in rows:
+                        consumed.append(row['id'])
+                        yield row
+                return generate(), dict(links=dict(next=dict(count=3)))
+
+        class Streamed(RetrieveRetrieveList):
+            manager = StreamingManager()
+            pks = ('id',)
+            _relationships = (ListRelationship('streamed', relation='Streamed', embedded=True),)
+
+        for adapter_class in (SirenAdapter, HalAdapter, JSONAPIAdapter,
+                              BasicJSONAdapter, NDJSONAdapter):
+            del consumed[:]
+            Streamed.manager.stream = False
+            expected = adapter_class(Streamed.retrieve_list(RequestContainer())).formatted_body
+            Streamed.manager.stream = True
+            resource = Streamed.retrieve_list(RequestContainer())
+            chunks = adapter_class(resource).formatted_body_chunks()
+            self.assertListEqual(consumed, [])
+            body = ''.join(chunks)
+            self.assertListEqual(consumed, [0, 1, 2])
+            if adapter_class is NDJSONAdapter:
+                self.assertEqual(body, expected)
+            else:
+                self.assertEqual(json.loads(body), json.loads(expected))
+
+            # the lazy rows can not be formatted twice
+            adapter = adapter_class(Streamed.retrieve_list(RequestContainer()))
+            self.assertEqual(json.loads(adapter.formatted_body.splitlines()[0]),
+                             json.loads(expected.splitlines()[0]))
+            self.assertRaises(RuntimeError, getattr, adapter, 'formatted_body')
@@ -5,13 +5,16 @@ from __future__ import unicode_literals
 
 import datetime
 import decimal
+import json
 
 import mock
 import six
 import unittest2
 
 from ripozo.utilities import titlize_endpoint, join_url_parts, \
-    picky_processor, convert_to_underscore, make_json_safe, get_or_pop
+    picky_processor, convert_to_underscore, make_json_safe, get_or_pop, \
+    json_default, default_json_encoder, ReadOnlyDict, stdlib_json_encoder, \
+    OneShotIterable
 
 
 class UtilitiesTestCase(unittest2.TestCase):
@@ -164,4 +167,51 @@ class UtilitiesTestCase(unittest2.TestCase):
         val = get_or_pop(x, 'x', default=1, pop=True)
         self.assertEqual(val, 1)
 
+    def test_json_default(self):
+        """
+        Tests that the json default handler serializes
+        datetimes and decimals like make_json_safe.
+        """
+        now = datetime.datetime.now()
+        self.assertEqual(json_default(now), six.text_type(now))
+        self.assertEqual(json_default(decimal.Decimal('1.5')), 1.5)
+        self.assertEqual(json_default(ReadOnlyDict(dict(x=1))), dict(x=1))
+        self.assertEqual(json_default(set([1])), [1])
+        self.assertEqual(json_default(x for x in range(2)), [0, 1])
+        self.assertEqual(json_default(OneShotIterable(x for x in range(2))), [0, 1])
+        self.assertRaises(TypeError, json_default, object())
+
+    def test_one_shot_iterable(self):
+        """
+        Tests that a one shot iterable raises when
+        it is iterated over a second time.
+        """
+        iterable = OneShotIterable(x for x in range(3))
+        self.assertFalse(iterable.consumed)
+        self.assertListEqual(list(iterable), [0, 1, 2])
+        self.assertTrue(iterable.consumed)
+        self.assertRaises(RuntimeError, list, iterable)
 
+    def test_default_json_encoder(self):
+        """
+        Tests that the default json encoder produces json
+        equivalent to the standard library.
+        """
+        today = datetime.date(2016, 1, 1)
+        obj = dict(a=[1, 'two', None, True], b=dict(c=1.5), d=today,
+                   e=decimal.Decimal('2.5'), f=2 ** 70, g='\u00e9')
+        encoded = default_json_encoder(obj)
+        self.assertIsInstance(encoded, six.string_types)
+        expected = make_json_safe(obj.copy())
+        self.assertDictEqual(json.loads(encoded), expected)
+        self.assertRaises(TypeError, default_json_encoder, dict(x=object()))
+
+    def test_stdlib_json_encoder(self):
+        """
+        Tests that the standard library encoder produces
+        the same output as json.dumps.
+        """
+        obj = dict(a=float('nan'), b='\u00e9', c=[1, 2])
+        self.assertEqual(stdlib_json_encoder(obj), json.dumps(obj))
+        self.assertEqual(stdlib_json_encoder(dict(d=datetime.date(2016, 1, 1))),
+                         '{"d": "2016-01-01"}')